@@ -0,0 +1,92 @@
+"""Асинхронный список постов для ASGI.
+
+DRF не умеет асинхронные представления, поэтому самый частый запрос -
+анонимное чтение ленты в JSON с пагинацией 'uncounted' - обслуживается
+здесь через асинхронный ORM. Всё остальное (запись, JWT, поиск,
+браузерный API) уходит в PostViewSet в потоке.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+
+from api.pagination import UncountedLimitOffsetPagination
+from api.renderers import FastJSONRenderer
+from api.serializers import PostRowsSerializer
+from api.sparse import select_fields
+from api.views import PostViewSet
+from core.routers import use_primary
+from posts.caching import (
+    GLOBAL_SCOPE, aget_generations, not_modified, set_validators, validators,
+)
+from posts.models import Post
+
+post_viewset = sync_to_async(
+    PostViewSet.as_view({'get': 'list', 'post': 'create'})
+)
+
+
+def is_fast_list(request):
+    return (
+        request.method in ('GET', 'HEAD')
+        and settings.API_PAGINATION.get('posts') == 'uncounted'
+        and 'HTTP_AUTHORIZATION' not in request.META
+        and 'search' not in request.GET
+        and 'format' not in request.GET
+        and 'text/html' not in request.headers.get('Accept', '')
+    )
+
+
+async def list_posts(request, fields=None):
+    paginator = UncountedLimitOffsetPagination()
+    serializer = PostRowsSerializer({'request': request}, fields)
+    limit = paginator.get_limit(request)
+    rows = serializer.rows(Post.objects.all())
+    if limit is None:
+        return serializer.serialize([row async for row in rows])
+    paginator.request = request
+    paginator.limit = limit
+    paginator.offset = paginator.get_offset(request)
+    page = [
+        row async for row in
+        rows[paginator.offset:paginator.offset + limit + 1]
+    ]
+    paginator.has_next = len(page) > limit
+    data = serializer.serialize(page[:limit])
+    return paginator.get_paginated_response(data).data
+
+
+async def post_list(request):
+    if not is_fast_list(request):
+        return await post_viewset(request)
+    # Без аутентификаторов Request даёт анонимного пользователя, как
+    # PostViewSet для запроса без токена, поэтому и ETag у них общий.
+    request = Request(request, authenticators=())
+    try:
+        fields = select_fields(
+            request.query_params, PostRowsSerializer.columns
+        )
+    except ValidationError:
+        # Ответ 400 в формате DRF строит сам PostViewSet.
+        return await post_viewset(request._request)
+    etag = validators(
+        request,
+        await aget_generations([GLOBAL_SCOPE]),
+        'application/json',
+    )
+    response = not_modified(request, etag)
+    if response is None:
+        # См. posts.caching.conditional_page.
+        with use_primary():
+            rows = await list_posts(request, fields)
+        response = HttpResponse(
+            FastJSONRenderer().render(rows), content_type='application/json',
+        )
+    patch_vary_headers(response, ['Accept'])
+    return set_validators(response, etag)
+
+
+# Токены и сессии проверяет сам PostViewSet.
+post_list.csrf_exempt = True
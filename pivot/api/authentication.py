@@ -0,0 +1,94 @@
+"""JWT-аутентификация API без обращений к базе на каждый запрос.
+
+Проверенные токены хранятся в ограниченном LRU-кеше процесса: подпись
+повторно пришедшего токена не проверяется, а срок действия проверяется
+при каждом запросе. Пользователь берётся из кеша Django на
+API_USER_CACHE_TIMEOUT секунд. Сохранение и удаление пользователя (смена
+пароля, деактивация) сбрасывают его запись (api.signals).
+
+Выданный токен несёт отпечаток пароля и активности пользователя
+(USER_STATE_CLAIM). Токен, чей отпечаток расходится с пользователем из
+базы, отклоняется, а расхождение с кешированной копией заставляет
+перечитать пользователя. Поэтому с locmem-кешем, где сброс не доходит до
+других процессов, кешируются только пользователи токенов с отпечатком.
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.utils.crypto import salted_hmac
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from core.cache import is_shared
+
+USER_STATE_CLAIM = 'user_state'
+
+_tokens = OrderedDict()
+_lock = threading.Lock()
+
+
+def user_cache_key(user_id):
+    return f'api-user:{user_id}'
+
+
+def user_state(user):
+    return salted_hmac(
+        'api.authentication.user_state',
+        f'{user.password}:{user.is_active}',
+    ).hexdigest()[:16]
+
+
+def forget_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+def clear_token_cache():
+    with _lock:
+        _tokens.clear()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_validated_token(self, raw_token):
+        with _lock:
+            token = _tokens.get(raw_token)
+            if token is not None:
+                _tokens.move_to_end(raw_token)
+        if token is not None:
+            try:
+                token.check_exp(current_time=aware_utcnow())
+                return token
+            except TokenError:
+                # Ошибку в привычном формате построит проверка заново.
+                with _lock:
+                    _tokens.pop(raw_token, None)
+        token = super().get_validated_token(raw_token)
+        with _lock:
+            _tokens[raw_token] = token
+            while len(_tokens) > settings.API_TOKEN_CACHE_SIZE:
+                _tokens.popitem(last=False)
+        return token
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        state = validated_token.get(USER_STATE_CLAIM)
+        if user_id is None or not settings.API_USER_CACHE_TIMEOUT:
+            return self.load_user(validated_token, state)
+        if state is None and not is_shared(caches['default']):
+            return super().get_user(validated_token)
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None or state not in (None, user_state(user)):
+            user = self.load_user(validated_token, state)
+            cache.set(key, user, settings.API_USER_CACHE_TIMEOUT)
+        return user
+
+    def load_user(self, validated_token, state):
+        user = super().get_user(validated_token)
+        if state is not None and state != user_state(user):
+            # Пароль сменён после выдачи токена.
+            raise InvalidToken()
+        return user
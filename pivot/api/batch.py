@@ -0,0 +1,95 @@
+"""Пакетное создание объектов API: массив элементов за один запрос.
+
+Каждый элемент проверяется своим сериализатором за один проход по
+пакету, все годные элементы вставляются одним bulk_create в одной
+транзакции, а ответ содержит результат каждого элемента в порядке
+запроса. bulk_create не вызывает сигналов, поэтому post_save для новых
+записей отправляется вручную: счётчики, ленты, поиск, кеш страниц и
+журнал изменений обновляются так же, как при создании по одной.
+"""
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models.signals import post_save
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+
+def get_batch_items(request):
+    items = request.data
+    if not isinstance(items, list):
+        raise ValidationError(
+            {'non_field_errors': ['Expected a list of items.']}
+        )
+    if len(items) > settings.API_BATCH_MAX_SIZE:
+        raise ValidationError({'non_field_errors': [
+            f'No more than {settings.API_BATCH_MAX_SIZE} items per batch.'
+        ]})
+    return items
+
+
+def item_error(errors):
+    return {'status': status.HTTP_400_BAD_REQUEST, 'errors': errors}
+
+
+def bulk_create_with_signals(model, objects):
+    using = router.db_for_write(model)
+    with transaction.atomic(using=using):
+        model.objects.using(using).bulk_create(objects)
+        for obj in objects:
+            post_save.send(
+                sender=model, instance=obj, created=True,
+                update_fields=None, raw=False, using=using,
+            )
+    return objects
+
+
+class BatchCreateMixin:
+    """POST <список>/batch/ с массивом объектов в формате create()."""
+
+    def get_batch_save_kwargs(self):
+        """Поля, которые create() передал бы в serializer.save()."""
+        return {}
+
+    def get_batch_key(self, serializer):
+        """Ключ уникальности элемента внутри пакета или None."""
+        return None
+
+    def validate_batch(self, items):
+        results = [None] * len(items)
+        valid = []
+        seen = set()
+        for index, item in enumerate(items):
+            serializer = self.get_serializer(data=item)
+            if not serializer.is_valid():
+                results[index] = item_error(serializer.errors)
+                continue
+            key = self.get_batch_key(serializer)
+            if key is not None:
+                if key in seen:
+                    results[index] = item_error(
+                        {'non_field_errors': ['Duplicate item in batch.']}
+                    )
+                    continue
+                seen.add(key)
+            valid.append((index, serializer))
+        return results, valid
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request, *args, **kwargs):
+        items = get_batch_items(request)
+        extra = self.get_batch_save_kwargs()
+        results, valid = self.validate_batch(items)
+        model = self.get_serializer_class().Meta.model
+        objects = bulk_create_with_signals(model, [
+            model(**serializer.validated_data, **extra)
+            for _, serializer in valid
+        ])
+        for (index, serializer), obj in zip(valid, objects):
+            serializer.instance = obj
+            results[index] = {
+                'status': status.HTTP_201_CREATED,
+                'data': serializer.data,
+            }
+        return Response({'results': results})
@@ -0,0 +1,36 @@
+from core.routers import use_primary
+from posts.caching import (
+    get_generations, not_modified, set_validators, validators,
+)
+
+
+class ConditionalListMixin:
+    """Отвечает 304 на условный GET списка до сериализации.
+
+    Валидаторы строятся из поколений областей кеша страниц, которые
+    возвращает get_validator_scopes(), а также адреса, пользователя и
+    формата ответа.
+    """
+
+    def get_validator_scopes(self):
+        raise NotImplementedError
+
+    def conditional_response(self, request, respond):
+        etag = validators(
+            request,
+            get_generations(self.get_validator_scopes()),
+            request.accepted_media_type,
+        )
+        response = not_modified(request, etag)
+        if response is None:
+            # См. posts.caching.conditional_page.
+            with use_primary():
+                response = respond()
+        return set_validators(response, etag)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, lambda: super(ConditionalListMixin, self).list(
+                request, *args, **kwargs
+            ),
+        )
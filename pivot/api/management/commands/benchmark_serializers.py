@@ -0,0 +1,90 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api import renderers
+from api.serializers import PostRowsSerializer, PostSerializer
+from posts import benchmark
+from posts.models import Post
+
+
+def drf_page(request, size):
+    posts = Post.objects.with_feed_relations()[:size]
+    data = PostSerializer(posts, many=True, context={'request': request}).data
+    return JSONRenderer().render(data)
+
+
+def rows_page(request, size):
+    serializer = PostRowsSerializer({'request': request})
+    rows = serializer.rows(Post.objects.all())[:size]
+    return renderers.FastJSONRenderer().render(serializer.serialize(rows))
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает PostSerializer и PostRowsSerializer с FastJSONRenderer '
+        'на странице списка постов; ответы должны совпадать побайтно.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--posts', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        environment = override_settings(DEBUG=False)
+        environment.enable()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True
+        )
+        try:
+            benchmark.seed(
+                users=options['users'], posts=options['posts'],
+                groups=10, follows=5, comments=0,
+            )
+            request = Request(APIRequestFactory().get('/api/v1/posts/'))
+            results = {
+                name: self.measure(page, request, options)
+                for name, page in (('PostSerializer', drf_page),
+                                   ('PostRowsSerializer', rows_page))
+            }
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            environment.disable()
+        if results['PostSerializer'][0] != results['PostRowsSerializer'][0]:
+            raise CommandError('Ответы сериализаторов различаются')
+        orjson = 'orjson' if renderers.orjson else 'json'
+        self.stdout.write(
+            f"Страница {options['page_size']} постов, "
+            f"{len(results['PostSerializer'][0])} байт, рендерер {orjson}"
+        )
+        for name, (_, queries, timings) in results.items():
+            self.stdout.write(
+                f'{name:<20} запросов {queries} '
+                f'p50 {statistics.median(timings):8.2f} мс '
+                f'min {min(timings):8.2f} мс'
+            )
+        speedup = (
+            statistics.median(results['PostSerializer'][2])
+            / statistics.median(results['PostRowsSerializer'][2])
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Ускорение в {speedup:.1f} раза')
+        )
+
+    def measure(self, page, request, options):
+        with CaptureQueriesContext(connection) as context:
+            content = page(request, options['page_size'])
+        timings = []
+        for _ in range(options['repeat']):
+            started = time.perf_counter()
+            page(request, options['page_size'])
+            timings.append((time.perf_counter() - started) * 1000)
+        return content, len(context), timings
@@ -0,0 +1,98 @@
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.pagination import (
+    CursorPagination, LimitOffsetPagination, remove_query_param,
+    replace_query_param
+)
+from rest_framework.response import Response
+
+
+class KeysetPagination(CursorPagination):
+    """Курсорная пагинация по ключу (pub_date, id).
+
+    Порядок можно переопределить атрибутом cursor_ordering у вьюсета.
+    """
+    page_size = 10
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    ordering = ('-pub_date', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        return tuple(getattr(view, 'cursor_ordering', self.ordering))
+
+
+class UncountedLimitOffsetPagination(LimitOffsetPagination):
+    """limit/offset без COUNT(*).
+
+    Наличие следующей страницы определяется по одной лишней записи,
+    поэтому в ответе нет поля count.
+    """
+    template = 'rest_framework/pagination/previous_and_next.html'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+        objects = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(objects) > self.limit
+        return objects[:self.limit]
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties'].pop('count')
+        return response_schema
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(
+            url, self.offset_query_param, self.offset + self.limit
+        )
+
+    def get_previous_link(self):
+        if self.offset <= 0:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        if self.offset - self.limit <= 0:
+            return remove_query_param(url, self.offset_query_param)
+        return replace_query_param(
+            url, self.offset_query_param, self.offset - self.limit
+        )
+
+    def get_html_context(self):
+        return {
+            'previous_url': self.get_previous_link(),
+            'next_url': self.get_next_link(),
+        }
+
+
+PAGINATION_CLASSES = {
+    'limit_offset': LimitOffsetPagination,
+    'uncounted': UncountedLimitOffsetPagination,
+    'cursor': KeysetPagination,
+}
+
+
+class ConfigurablePaginationMixin:
+    """Берёт класс пагинации из settings.API_PAGINATION[pagination_scope]."""
+    pagination_scope = None
+
+    @property
+    def pagination_class(self):
+        mode = settings.API_PAGINATION.get(self.pagination_scope)
+        if mode is None:
+            return None
+        return PAGINATION_CLASSES[mode]
@@ -0,0 +1,39 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer на orjson, если он установлен.
+
+    Байты ответа те же, что у JSONRenderer: компактные разделители,
+    UTF-8 без экранирования и экранированные U+2028/U+2029. Значения,
+    которые orjson записал бы по-своему (даты, Decimal, ленивые строки),
+    отдаются кодировщику DRF. С отступом (indent) и без orjson работает
+    обычный JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        encoder = self.encoder_class()
+        ret = orjson.dumps(
+            data,
+            default=encoder.default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028')
+            ret = ret.replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -1,8 +1,13 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
+from api.authentication import USER_STATE_CLAIM, user_state
+from api.sparse import select_columns
+from posts.images import rendition_urls
 from posts.models import Post, Group, Comment, Follow
+from posts.uploads import BoundedImageField
 
 
 User = get_user_model()
@@ -13,12 +18,107 @@ class PostSerializer(serializers.ModelSerializer):
         slug_field='username',
         read_only=True,
     )
+    image = serializers.ImageField(
+        required=False,
+        max_length=100,
+        _DjangoImageField=BoundedImageField,
+    )
+    renditions = serializers.SerializerMethodField()
+
+    def get_renditions(self, obj):
+        urls = rendition_urls(obj.renditions)
+        request = self.context.get('request')
+        if request is None:
+            return urls
+        return {
+            width: {
+                extension: request.build_absolute_uri(url)
+                for extension, url in files.items()
+            }
+            for width, files in urls.items()
+        }
 
     class Meta:
-        fields = ('id', 'text', 'author', 'group', 'image', 'pub_date')
+        fields = ('id', 'text', 'author', 'group', 'image', 'renditions',
+                  'pub_date')
         model = Post
 
 
+class PostRowsSerializer:
+    """Быстрый вывод списков постов, совпадающий с PostSerializer.
+
+    Строки берутся через values() одним запросом вместе с именем автора
+    и превращаются в словари без полей и объектов моделей DRF. Только
+    для чтения: запись и детальный вывод остаются за PostSerializer.
+    fields ограничивает и поля ответа, и колонки запроса.
+    """
+    # Поле ответа -> колонки values(), из которых оно строится.
+    columns = {
+        'id': ('id',),
+        'text': ('text',),
+        'author': ('author__username',),
+        'group': ('group_id',),
+        'image': ('image',),
+        'renditions': ('renditions',),
+        'pub_date': ('pub_date',),
+    }
+    # Ключи сортировки и курсора нужны пагинации при любом наборе полей.
+    ordering_columns = ('id', 'pub_date')
+
+    def __init__(self, context=None, fields=None):
+        self.request = (context or {}).get('request')
+        self.storage = Post._meta.get_field('image').storage
+        self.pub_date = serializers.DateTimeField()
+        self.fields = list(fields or self.columns)
+        self.builders = [
+            (name, getattr(self, f'get_{name}')) for name in self.fields
+        ]
+
+    def rows(self, queryset):
+        return queryset.values(*select_columns(
+            self.fields, self.columns, self.ordering_columns
+        ))
+
+    def absolute(self, url):
+        if self.request is None:
+            return url
+        return self.request.build_absolute_uri(url)
+
+    def get_id(self, row):
+        return row['id']
+
+    def get_text(self, row):
+        return row['text']
+
+    def get_author(self, row):
+        return row['author__username']
+
+    def get_group(self, row):
+        return row['group_id']
+
+    def get_image(self, row):
+        image = row['image']
+        return self.absolute(self.storage.url(image)) if image else None
+
+    def get_renditions(self, row):
+        return {
+            width: {
+                extension: self.absolute(url)
+                for extension, url in files.items()
+            }
+            for width, files in rendition_urls(row['renditions']).items()
+        }
+
+    def get_pub_date(self, row):
+        return self.pub_date.to_representation(row['pub_date'])
+
+    def to_representation(self, row):
+        return {name: build(row) for name, build in self.builders}
+
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+
 class GroupSerializer(serializers.ModelSerializer):
     class Meta:
         fields = ('id', 'title', 'slug', 'description')
@@ -30,6 +130,7 @@ class CommentSerializer(serializers.ModelSerializer):
         slug_field='username',
         read_only=True,
     )
+    created = serializers.DateTimeField(source='pub_date', read_only=True)
 
     class Meta:
         fields = ('id', 'author', 'post', 'text', 'created')
@@ -44,12 +145,13 @@ class FollowSerializer(serializers.ModelSerializer):
         default=serializers.CurrentUserDefault(),
     )
     following = serializers.SlugRelatedField(
+        source='author',
         slug_field='username',
         queryset=User.objects.all(),
     )
 
     def validate(self, data):
-        if data.get('user') == data.get('following'):
+        if data.get('user') == data.get('author'):
             raise serializers.ValidationError('You can not follow youself')
         else:
             return data
@@ -64,3 +166,11 @@ class FollowSerializer(serializers.ModelSerializer):
                 fields=('user', 'following')
             )
         ]
+
+
+class UserStateTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token[USER_STATE_CLAIM] = user_state(user)
+        return token
@@ -0,0 +1,95 @@
+"""Выборочные поля ответа: ?fields=id,pub_date или ?omit=text,image.
+
+Набор полей сужает и вывод сериализатора, и список колонок запроса
+через only(), так что лёгкие клиенты не тянут из базы тексты и адреса
+картинок, которые им не нужны.
+"""
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def parse_names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def select_fields(query_params, available):
+    """Поля ответа в порядке available или None без fields и omit."""
+    if FIELDS_PARAM not in query_params and OMIT_PARAM not in query_params:
+        return None
+    errors = {}
+    selected = list(available)
+    omitted = set()
+    for param in (FIELDS_PARAM, OMIT_PARAM):
+        if param not in query_params:
+            continue
+        names = parse_names(query_params[param])
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            errors[param] = [f'Unknown fields: {", ".join(unknown)}.']
+        elif param == FIELDS_PARAM:
+            selected = [name for name in available if name in names]
+        else:
+            omitted.update(names)
+    selected = [name for name in selected if name not in omitted]
+    if not errors and not selected:
+        errors[FIELDS_PARAM] = ['At least one field must be selected.']
+    if errors:
+        raise ValidationError(errors)
+    return selected
+
+
+def select_columns(fields, columns, required=()):
+    """Колонки only()/values() для выбранных полей без повторов."""
+    selected = dict.fromkeys(required)
+    for name in fields:
+        selected.update(dict.fromkeys(columns[name]))
+    return list(selected)
+
+
+class SparseFieldsMixin:
+    """?fields= и ?omit= для чтения через вьюсет.
+
+    sparse_columns сопоставляет полю ответа колонки модели; колонки
+    через '__' берутся из связанной таблицы тем же запросом.
+    sparse_required - колонки, без которых не обойтись при любом наборе
+    полей: ключ и порядок пагинации.
+    """
+    sparse_columns = {}
+    sparse_required = ('id',)
+
+    def get_sparse_fields(self):
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = None
+            if self.request.method in ('GET', 'HEAD'):
+                self._sparse_fields = select_fields(
+                    self.request.query_params, self.sparse_columns
+                )
+        return self._sparse_fields
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        names = self.get_sparse_fields()
+        if names is not None:
+            fields = getattr(serializer, 'child', serializer).fields
+            for name in list(fields):
+                if name not in names:
+                    fields.pop(name)
+        return serializer
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        names = self.get_sparse_fields()
+        if names is None:
+            return queryset
+        columns = select_columns(
+            names, self.sparse_columns, self.sparse_required
+        )
+        queryset = queryset.select_related(None)
+        related = {
+            column.rsplit('__', 1)[0] for column in columns if '__' in column
+        }
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*columns)
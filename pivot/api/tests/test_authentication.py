@@ -0,0 +1,160 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from api import authentication
+from api.permissions import IsOwnerOrReadOnly
+from api.serializers import UserStateTokenObtainPairSerializer
+from posts.models import Post
+
+User = get_user_model()
+
+TEMP_CACHE_DIR = tempfile.mkdtemp()
+
+
+@override_settings(CACHES={'default': {
+    'BACKEND': 'core.cache.FileBasedCache',
+    'LOCATION': TEMP_CACHE_DIR,
+}})
+class CachedJWTAuthenticationTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_CACHE_DIR, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='reader')
+        cls.author = User.objects.create(username='author')
+        cls.post = Post.objects.create(text='Text', author=cls.author)
+
+    def setUp(self):
+        authentication.clear_token_cache()
+        self.addCleanup(authentication.clear_token_cache)
+        cache.clear()
+
+    def client_for(self, user, token=None):
+        if token is None:
+            token = UserStateTokenObtainPairSerializer.get_token(
+                user
+            ).access_token
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def user_queries(self, client, url='/api/v1/follow/'):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in queries
+                if 'FROM "auth_user"' in query['sql']]
+
+    def test_repeated_requests_skip_decode_and_user_query(self):
+        client = self.client_for(self.user)
+        validate = mock.patch.object(
+            JWTAuthentication, 'get_validated_token',
+            autospec=True, side_effect=JWTAuthentication.get_validated_token,
+        )
+        with validate as decoded:
+            self.assertEqual(len(self.user_queries(client)), 1)
+            self.assertEqual(self.user_queries(client), [],
+                             'Cached user should not be queried again')
+        self.assertEqual(decoded.call_count, 1,
+                         'Token signature should be verified once')
+
+    def test_issued_token_carries_user_state(self):
+        self.user.set_password('password')
+        self.user.save()
+        response = APIClient().post('/api/v1/auth/jwt/create/', {
+            'username': 'reader', 'password': 'password',
+        })
+        self.assertEqual(response.status_code, 200)
+        token = AccessToken(response.data['access'])
+        self.assertEqual(token[authentication.USER_STATE_CLAIM],
+                         authentication.user_state(self.user))
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'core.cache.LocMemCache',
+    }})
+    def test_process_local_cache_checks_user_state(self):
+        client = self.client_for(self.user)
+        self.user_queries(client)
+        self.assertEqual(self.user_queries(client), [],
+                         'Users should be cached in a per-process cache')
+        legacy = self.client_for(self.user, AccessToken.for_user(self.user))
+        self.user_queries(legacy)
+        self.assertEqual(len(self.user_queries(legacy)), 1,
+                         'Tokens without user state should not use it')
+
+        # Другой воркер сменил пароль: копия в этом процессе устарела.
+        stale = User.objects.get(pk=self.user.pk)
+        self.user.set_password('new-password')
+        self.user.save()
+        cache.set(authentication.user_cache_key(self.user.pk), stale)
+        self.assertEqual(len(self.user_queries(self.client_for(self.user))),
+                         1, 'A new token should reload a stale user')
+        self.assertEqual(client.get('/api/v1/follow/').status_code, 401)
+
+    def test_expired_cached_token_is_rejected(self):
+        client = self.client_for(self.user)
+        self.user_queries(client)
+        later = aware_utcnow() + timedelta(days=2)
+        with mock.patch.object(authentication, 'aware_utcnow',
+                               return_value=later), \
+                mock.patch('rest_framework_simplejwt.tokens.aware_utcnow',
+                           return_value=later):
+            response = client.get('/api/v1/follow/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data['code'], 'token_not_valid')
+
+    def test_deactivation_and_password_change_invalidate_user(self):
+        legacy = self.client_for(self.user, AccessToken.for_user(self.user))
+        self.user_queries(legacy)
+        self.user.first_name = 'Reader'
+        self.user.save()
+        self.assertEqual(len(self.user_queries(legacy)), 1,
+                         'Saving the user should drop the cached copy')
+        client = self.client_for(self.user)
+        self.user_queries(client)
+        self.user.set_password('new-password')
+        self.user.save()
+        self.assertEqual(client.get('/api/v1/follow/').status_code, 401,
+                         'Password change should revoke issued tokens')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(legacy.get('/api/v1/follow/').status_code, 401)
+
+    @override_settings(API_TOKEN_CACHE_SIZE=2)
+    def test_token_cache_is_bounded(self):
+        for _ in range(3):
+            self.user_queries(self.client_for(self.user))
+        self.assertEqual(len(authentication._tokens), 2)
+
+    def test_owner_check_uses_author_id(self):
+        post = Post.objects.only('author').get(pk=self.post.pk)
+        request = APIRequestFactory().patch('/')
+        permission = IsOwnerOrReadOnly()
+        with self.assertNumQueries(0):
+            request.user = self.user
+            self.assertFalse(
+                permission.has_object_permission(request, None, post)
+            )
+            request.user = self.author
+            self.assertTrue(
+                permission.has_object_permission(request, None, post)
+            )
+        response = self.client_for(self.user).patch(
+            f'/api/v1/posts/{self.post.pk}/', {'text': 'Mine'}
+        )
+        self.assertEqual(response.status_code, 403)
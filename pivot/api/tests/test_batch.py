@@ -0,0 +1,125 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from posts import changes
+from posts.models import Change, Follow, Group, Post, UserCounter
+
+User = get_user_model()
+
+
+class BatchApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='importer')
+        cls.author = User.objects.create(username='author')
+        cls.other = User.objects.create(username='other')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='',
+        )
+        cls.post = Post.objects.create(text='Text', author=cls.author)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def batch(self, url, items):
+        response = self.client.post(url, items, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return [result['status'] for result in response.data['results']], \
+            response.data['results']
+
+    def test_posts_batch(self):
+        cursor = changes.latest_cursor()
+        statuses, results = self.batch('/api/v1/posts/batch/', [
+            {'text': 'First', 'group': self.group.pk},
+            {'group': self.group.pk},
+            {'text': 'Second'},
+        ])
+        self.assertEqual(statuses, [201, 400, 201])
+        self.assertIn('text', results[1]['errors'])
+        self.assertEqual(results[0]['data']['author'], 'importer')
+        self.assertEqual(results[0]['data']['group'], self.group.pk)
+        created = Post.objects.filter(author=self.user)
+        self.assertEqual(
+            sorted(created.values_list('pk', flat=True)),
+            [results[0]['data']['id'], results[2]['data']['id']],
+        )
+        self.assertEqual(
+            UserCounter.objects.get(user=self.user).posts_count, 2,
+            'Signals should run for every created post',
+        )
+        self.assertEqual(len(changes.changes_since(cursor, 100)[0]), 2)
+
+    def test_comments_batch(self):
+        statuses, results = self.batch(
+            f'/api/v1/posts/{self.post.pk}/comments/batch/',
+            [{'text': 'One'}, {'text': 'Two'}, {'text': ''}],
+        )
+        self.assertEqual(statuses, [201, 201, 400])
+        self.assertEqual(results[0]['data']['post'], self.post.pk)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 2)
+        self.assertEqual(
+            self.client.post('/api/v1/posts/0/comments/batch/',
+                             [{'text': 'x'}], format='json').status_code,
+            404,
+        )
+
+    def test_follow_batch_and_unfollow(self):
+        Follow.objects.create(user=self.user, author=self.other)
+        statuses, _ = self.batch('/api/v1/follow/batch/', [
+            {'following': 'author'},
+            {'following': 'author'},
+            {'following': 'other'},
+            {'following': 'importer'},
+            {'following': 'missing'},
+        ])
+        self.assertEqual(statuses, [201, 400, 400, 400, 400])
+        self.assertEqual(UserCounter.objects.get(user=self.user)
+                         .following_count, 2)
+        with CaptureQueriesContext(connection) as queries:
+            statuses, _ = self.batch('/api/v1/follow/unfollow/', [
+                {'following': 'author'},
+                {'following': 'other'},
+                {'following': 'missing'},
+                'author',
+            ])
+        self.assertEqual(statuses, [204, 204, 404, 400])
+        follow_queries = [
+            query['sql'].split()[0] for query in queries
+            if 'FROM "posts_follow"' in query['sql']
+        ]
+        self.assertEqual(follow_queries, ['SELECT', 'DELETE'],
+                         'Unfollows should use one lookup and one DELETE')
+        self.assertFalse(Follow.objects.filter(user=self.user).exists())
+        self.assertEqual(UserCounter.objects.get(user=self.user)
+                         .following_count, 0)
+
+    def test_batch_is_one_insert(self):
+        items = [{'text': f'Post {number}'} for number in range(20)]
+        with CaptureQueriesContext(connection) as queries:
+            self.batch('/api/v1/posts/batch/', items)
+        inserts = [query['sql'] for query in queries
+                   if query['sql'].startswith('INSERT INTO "posts_post"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(
+            Change.objects.filter(kind=Change.POST).count(), 21
+        )
+
+    @override_settings(API_BATCH_MAX_SIZE=2)
+    def test_malformed_batches(self):
+        for items in ({'text': 'Not a list'}, [{'text': 'x'}] * 3):
+            with self.subTest(items=items):
+                response = self.client.post(
+                    '/api/v1/posts/batch/', items, format='json'
+                )
+                self.assertEqual(response.status_code, 400)
+
+    def test_batch_requires_authentication(self):
+        response = APIClient().post(
+            '/api/v1/posts/batch/', [{'text': 'x'}], format='json'
+        )
+        self.assertEqual(response.status_code, 401)
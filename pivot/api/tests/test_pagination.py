@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from posts.models import Comment, Follow, Post
+
+User = get_user_model()
+
+
+class ApiPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='testuser')
+        cls.post = Post.objects.create(text='Commented', author=cls.user)
+        Post.objects.bulk_create(
+            Post(text=f'Post number {number}', author=cls.user)
+            for number in range(14)
+        )
+        Comment.objects.bulk_create(
+            Comment(text=f'Comment {number}', author=cls.user, post=cls.post)
+            for number in range(3)
+        )
+        for number in range(3):
+            author = User.objects.create(username=f'author{number}')
+            Follow.objects.create(user=cls.user, author=author)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_default_limit_offset_keeps_count(self):
+        for url in ('/api/v1/posts/?limit=10', '/api/v1/feed/?limit=10'):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIn('count', response.data,
+                              'count is part of the existing list contract')
+
+    @override_settings(API_PAGINATION={'posts': 'uncounted'})
+    def test_uncounted_limit_offset_skips_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v1/posts/?limit=10&offset=10')
+        self.assertNotIn('count', response.data)
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIsNone(response.data['next'])
+        self.assertIn('limit=10', response.data['previous'])
+        self.assertFalse(
+            any('COUNT(' in query['sql'] for query in queries),
+            'Uncounted pagination should not run COUNT(*)',
+        )
+
+    @override_settings(API_PAGINATION={
+        'posts': 'cursor', 'comments': 'cursor', 'follow': 'cursor',
+    })
+    def test_cursor_pagination_per_viewset(self):
+        response = self.client.get('/api/v1/posts/?limit=10')
+        ids = [item['id'] for item in response.data['results']]
+        response = self.client.get(response.data['next'])
+        ids += [item['id'] for item in response.data['results']]
+        self.assertEqual(
+            ids,
+            list(Post.objects.order_by('-pub_date', '-id').values_list(
+                'id', flat=True
+            )),
+        )
+        self.assertIsNone(response.data['next'])
+
+        response = self.client.get(
+            f'/api/v1/posts/{self.post.pk}/comments/?limit=2'
+        )
+        self.assertEqual(
+            [item['text'] for item in response.data['results']],
+            ['Comment 0', 'Comment 1'],
+        )
+        response = self.client.get('/api/v1/follow/?limit=2')
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
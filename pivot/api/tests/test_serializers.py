@@ -0,0 +1,107 @@
+import datetime
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from api import renderers
+from api.renderers import FastJSONRenderer
+from api.serializers import PostRowsSerializer, PostSerializer
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostRowsSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='автор')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='',
+        )
+        texts = [
+            'Обычный пост',
+            'Кавычки " и \\ обратная черта',
+            'Разделители строк \u2028 и абзацев \u2029',
+            'Эмодзи 🐍 и управляющие \x01\t\n символы',
+        ]
+        for number, text in enumerate(texts):
+            Post.objects.create(
+                text=text,
+                author=cls.author,
+                group=cls.group if number % 2 else None,
+            )
+        Post.objects.filter(text=texts[0]).update(
+            image='posts/picture.jpg',
+            renditions={
+                '320': {'jpeg': 'renditions/p-320.jpg',
+                        'webp': 'renditions/p-320.webp'},
+                '640': {'jpeg': 'renditions/p-640.jpg'},
+            },
+            pub_date=timezone.now().replace(microsecond=123456),
+        )
+
+    def setUp(self):
+        self.request = Request(APIRequestFactory().get('/api/v1/posts/'))
+
+    def render_both(self):
+        context = {'request': self.request}
+        expected = JSONRenderer().render(PostSerializer(
+            Post.objects.with_feed_relations(), many=True, context=context,
+        ).data)
+        serializer = PostRowsSerializer(context)
+        fast = FastJSONRenderer().render(
+            serializer.serialize(serializer.rows(Post.objects.all()))
+        )
+        return expected, fast
+
+    def test_output_is_byte_identical(self):
+        expected, fast = self.render_both()
+        self.assertEqual(fast, expected)
+        self.assertIn(b'\\u2028', fast)
+        self.assertIn(b'http://testserver/media/renditions/p-320.webp', fast)
+
+    def test_output_is_byte_identical_without_orjson(self):
+        orjson, renderers.orjson = renderers.orjson, None
+        try:
+            expected, fast = self.render_both()
+        finally:
+            renderers.orjson = orjson
+        self.assertEqual(fast, expected)
+
+    @override_settings(API_PAGINATION={'posts': 'uncounted'})
+    def test_api_lists_use_one_query(self):
+        client = APIClient()
+        client.force_authenticate(self.author)
+        with self.assertNumQueries(1):
+            response = client.get('/api/v1/posts/?limit=10')
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertEqual(response.data['results'][0]['author'], 'автор')
+
+
+@skipUnless(renderers.orjson, 'orjson is not installed')
+class FastJSONRendererTests(TestCase):
+    def test_values_outside_json_match_drf_encoder(self):
+        data = {
+            'when': datetime.datetime(
+                2023, 5, 1, 12, 30, 15, 987654, tzinfo=datetime.timezone.utc
+            ),
+            'day': datetime.date(2023, 5, 1),
+            'amount': Decimal('1.50'),
+            1: [None, True, 2, 'три'],
+        }
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_indent_falls_back_to_json_renderer(self):
+        data = {'key': ['value']}
+        self.assertEqual(
+            FastJSONRenderer().render(data, 'application/json; indent=2'),
+            JSONRenderer().render(data, 'application/json; indent=2'),
+        )
@@ -0,0 +1,117 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class SparseFieldsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='testuser')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание',
+        )
+        cls.post = Post.objects.create(
+            text='Длинный текст поста', author=cls.user, group=cls.group,
+            image='posts/picture.jpg',
+        )
+        Comment.objects.create(text='Комментарий', author=cls.user,
+                               post=cls.post)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return json.loads(response.content), ' '.join(
+            query['sql'] for query in queries
+        )
+
+    def test_post_list_fields(self):
+        data, sql = self.get('/api/v1/posts/?limit=5&fields=pub_date,id')
+        self.assertEqual(list(data['results'][0]), ['id', 'pub_date'],
+                         'Fields should follow the serializer order')
+        self.assertNotIn('"text"', sql, 'Text column should not be read')
+        self.assertNotIn('"image"', sql, 'Image column should not be read')
+
+    def test_post_list_omit(self):
+        data, sql = self.get(
+            '/api/v1/posts/?limit=5&omit=text,image,renditions'
+        )
+        self.assertEqual(list(data['results'][0]),
+                         ['id', 'author', 'group', 'pub_date'])
+        self.assertIn('"username"', sql)
+        self.assertNotIn('"text"', sql)
+
+    def test_post_detail_fields(self):
+        data, sql = self.get(f'/api/v1/posts/{self.post.pk}/?fields=author')
+        self.assertEqual(data, {'author': 'testuser'})
+        self.assertNotIn('"text"', sql)
+        self.assertNotIn('"first_name"', sql)
+
+    def test_comment_fields(self):
+        data, sql = self.get(
+            f'/api/v1/posts/{self.post.pk}/comments/?fields=id,created'
+        )
+        self.assertEqual(list(data['results'][0]), ['id', 'created'])
+        self.assertNotIn('"text"', sql.split('posts_comment', 1)[1])
+
+    def test_group_fields(self):
+        data, sql = self.get('/api/v1/groups/?omit=description')
+        self.assertEqual(data[0], {
+            'id': self.group.pk, 'title': 'Группа', 'slug': 'group',
+        })
+        self.assertNotIn('"description"', sql)
+
+    def test_unknown_fields_are_rejected(self):
+        for url in ('/api/v1/posts/?fields=id,secret',
+                    '/api/v1/groups/?omit=secret',
+                    '/api/v1/posts/?fields=id&omit=id'):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 400)
+
+    def test_fields_change_etag(self):
+        full = self.client.get('/api/v1/posts/')
+        sparse = self.client.get('/api/v1/posts/?fields=id')
+        self.assertNotEqual(full['ETag'], sparse['ETag'])
+
+    def test_writes_ignore_fields(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            '/api/v1/posts/?fields=id', {'text': 'Новый пост'}
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('text', response.data)
+
+
+@override_settings(ROOT_URLCONF='pivot.asgi_urls')
+class AsyncSparseFieldsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='testuser')
+        Post.objects.create(text='Текст', author=cls.user)
+
+    async def test_async_list_fields(self):
+        response = await AsyncClient().get(
+            '/api/v1/posts/?limit=5&fields=id,author'
+        )
+        self.assertEqual(response.status_code, 200)
+        post = await Post.objects.afirst()
+        self.assertEqual(json.loads(response.content)['results'],
+                         [{'id': post.pk, 'author': 'testuser'}])
+
+    async def test_async_list_rejects_unknown_fields(self):
+        response = await AsyncClient().get(
+            '/api/v1/posts/?limit=5&fields=secret'
+        )
+        self.assertEqual(response.status_code, 400)
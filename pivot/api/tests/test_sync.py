@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from posts.models import Change, Comment, Post
+
+User = get_user_model()
+
+
+class SyncApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.post = Post.objects.create(text='Text', author=cls.author)
+        Post.objects.bulk_create(
+            Post(text=f'Old post {number}', author=cls.author)
+            for number in range(20)
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def sync(self, **params):
+        response = self.client.get('/api/v1/sync/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def test_cursor_without_changes(self):
+        data = self.sync()
+        self.assertEqual(data['posts'], [])
+        self.assertEqual(self.sync(cursor=data['cursor'])['cursor'],
+                         data['cursor'])
+
+    def test_changes_since_cursor(self):
+        cursor = self.sync()['cursor']
+        comment = Comment.objects.create(
+            text='Comment', author=self.author, post=self.post,
+        )
+        gone = Post.objects.create(text='Gone', author=self.author).pk
+        Post.objects.filter(pk=gone).delete()
+        self.post.text = 'Edited'
+        self.post.save()
+        with self.assertNumQueries(4):
+            data = self.sync(cursor=cursor)
+        self.assertEqual([post['id'] for post in data['posts']],
+                         [self.post.pk])
+        self.assertEqual(data['posts'][0]['text'], 'Edited')
+        self.assertEqual(data['comments'][0]['id'], comment.pk)
+        self.assertEqual(data['comments'][0]['author'], 'author')
+        self.assertEqual(data['deleted'], {'posts': [gone],
+                                           'comments': []})
+        self.assertFalse(data['has_more'])
+
+    def test_pages_through_changes(self):
+        cursor = self.sync()['cursor']
+        for number in range(3):
+            Post.objects.create(text=f'Post {number}', author=self.author)
+        data = self.sync(cursor=cursor, limit=2)
+        self.assertTrue(data['has_more'])
+        self.assertEqual(len(data['posts']), 2)
+        data = self.sync(cursor=data['cursor'], limit=2)
+        self.assertFalse(data['has_more'])
+        self.assertEqual(len(data['posts']), 1)
+
+    def test_expired_cursor(self):
+        Post.objects.create(text='New', author=self.author)
+        Change.objects.filter(
+            pk__lt=Change.objects.latest('pk').pk
+        ).delete()
+        response = self.client.get('/api/v1/sync/', {'cursor': 0})
+        self.assertEqual(response.status_code, 410)
+
+    def test_invalid_cursor(self):
+        for cursor in ('-1', 'abc'):
+            with self.subTest(cursor=cursor):
+                response = self.client.get('/api/v1/sync/',
+                                           {'cursor': cursor})
+                self.assertEqual(response.status_code, 400)
@@ -3,6 +3,8 @@ from rest_framework.routers import DefaultRouter
 from rest_framework.authtoken import views
 
 from .views import PostViewSet, CommentViewSet, GroupViewSet, FollowViewSet
+from .views import FeedViewSet, SyncView
+from . import async_views
 
 
 app_name = 'api'
@@ -16,11 +18,19 @@ router.register(
     basename='comments'
 )
 router.register('follow', FollowViewSet, basename='follow')
+router.register('feed', FeedViewSet, basename='feed')
 
 
 urlpatterns = [
     path('v1/api-token-auth/', views.obtain_auth_token),
     path('v1/auth/', include('djoser.urls')),
     path('v1/auth/', include('djoser.urls.jwt')),
+    path('v1/sync/', SyncView.as_view(), name='sync'),
     path('v1/', include(router.urls)),
 ]
+
+# Под ASGI список постов отдаёт асинхронное представление.
+async_urlpatterns = [
+    path('v1/posts/', async_views.post_list, name='posts-list'),
+    *urlpatterns,
+]
@@ -1,47 +1,145 @@
+from django.db import router
+from django.db.models.deletion import Collector
 from django.shortcuts import get_object_or_404
 from rest_framework import viewsets
 from rest_framework import permissions
 from rest_framework import mixins
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework import filters
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import replace_query_param
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from api.serializers import PostSerializer, GroupSerializer, CommentSerializer
+from api.serializers import PostRowsSerializer
 from api.serializers import FollowSerializer
-from posts.models import Post, Group, Follow
+from posts.caching import GLOBAL_SCOPE, follower_scope, post_scope
+from posts.changes import CursorExpired, changes_since, latest_cursor
+from posts.feed import get_feed
+from posts.models import Change, Comment, Post, Group, Follow
+from posts.search import search_posts
+from api.batch import BatchCreateMixin, get_batch_items, item_error
+from api.conditional import ConditionalListMixin
+from api.pagination import ConfigurablePaginationMixin
 from api.permissions import IsOwnerOrReadOnly
+from api.sparse import SparseFieldsMixin
 
 
-class PostViewSet(viewsets.ModelViewSet):
-    queryset = Post.objects.all()
+class PostRowsListMixin:
+    """Списки постов через PostRowsSerializer, без объектов моделей."""
+
+    def list(self, request, *args, **kwargs):
+        serializer = PostRowsSerializer(
+            self.get_serializer_context(), self.get_sparse_fields()
+        )
+        rows = serializer.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(rows))
+
+
+class PostViewSet(ConditionalListMixin, PostRowsListMixin, SparseFieldsMixin,
+                  BatchCreateMixin, ConfigurablePaginationMixin,
+                  viewsets.ModelViewSet):
+    queryset = Post.objects.with_feed_relations()
     serializer_class = PostSerializer
+    sparse_columns = PostRowsSerializer.columns
+    sparse_required = PostRowsSerializer.ordering_columns
     permission_classes = [
         IsOwnerOrReadOnly, permissions.IsAuthenticatedOrReadOnly]
-    pagination_class = LimitOffsetPagination
+    pagination_scope = 'posts'
+    search_page_size = 10
+    search_max_page_size = 100
+
+    def get_validator_scopes(self):
+        return [GLOBAL_SCOPE]
+
+    def list(self, request, *args, **kwargs):
+        query = request.query_params.get('search')
+        if query is None:
+            return super().list(request, *args, **kwargs)
+        return self.conditional_response(
+            request, lambda: self.search(request, query)
+        )
+
+    def search(self, request, query):
+        try:
+            limit = min(
+                int(request.query_params['limit']),
+                self.search_max_page_size,
+            )
+        except (KeyError, ValueError):
+            limit = self.search_page_size
+        page = search_posts(
+            query, request.query_params.get('cursor'), max(limit, 1)
+        )
+        next_link = None
+        if page.has_next():
+            next_link = replace_query_param(
+                request.build_absolute_uri(), 'cursor', page.next_cursor
+            )
+        serializer = self.get_serializer(page.object_list, many=True)
+        return Response({
+            'next': next_link,
+            'previous': None,
+            'results': serializer.data,
+        })
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    def get_batch_save_kwargs(self):
+        return {'author': self.request.user}
+
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalListMixin, SparseFieldsMixin,
+                     BatchCreateMixin, ConfigurablePaginationMixin,
+                     viewsets.ModelViewSet):
     serializer_class = CommentSerializer
+    sparse_columns = {
+        'id': ('id',),
+        'author': ('author__username',),
+        'post': ('post',),
+        'text': ('text',),
+        'created': ('pub_date',),
+    }
+    sparse_required = ('id', 'pub_date')
     permission_classes = [
         IsOwnerOrReadOnly, permissions.IsAuthenticatedOrReadOnly]
+    pagination_scope = 'comments'
+    cursor_ordering = ('pub_date', 'id')
+
+    def get_validator_scopes(self):
+        return [post_scope(self.kwargs['post_id'])]
 
     def get_queryset(self):
         post = get_object_or_404(Post, pk=self.kwargs['post_id'])
-        return post.comments
+        return post.comments.select_related('author')
 
     def perform_create(self, serializer):
+        serializer.save(**self.get_batch_save_kwargs())
+
+    def get_batch_save_kwargs(self):
         post = get_object_or_404(Post, pk=self.kwargs['post_id'])
-        serializer.save(author=self.request.user, post=post)
+        return {'author': self.request.user, 'post': post}
 
 
-class GroupViewSet(viewsets.ReadOnlyModelViewSet):
+class GroupViewSet(ConditionalListMixin, SparseFieldsMixin,
+                   viewsets.ReadOnlyModelViewSet):
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
+    sparse_columns = {
+        name: (name,) for name in GroupSerializer.Meta.fields
+    }
     permission_classes = [
         IsOwnerOrReadOnly, permissions.IsAuthenticatedOrReadOnly]
 
+    def get_validator_scopes(self):
+        return [GLOBAL_SCOPE]
+
 
 class RetrieveCreateViewSet(mixins.CreateModelMixin,
                             mixins.ListModelMixin,
@@ -49,14 +147,160 @@ class RetrieveCreateViewSet(mixins.CreateModelMixin,
     pass
 
 
-class FollowViewSet(RetrieveCreateViewSet):
+class FollowViewSet(ConditionalListMixin, BatchCreateMixin,
+                    ConfigurablePaginationMixin, RetrieveCreateViewSet):
     serializer_class = FollowSerializer
     permission_classes = [permissions.IsAuthenticated, ]
+    pagination_scope = 'follow'
+    cursor_ordering = ('-id',)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('following__username',)
 
+    def get_validator_scopes(self):
+        # Имена авторов меняются вместе с GLOBAL_SCOPE.
+        return [follower_scope(self.request.user.pk), GLOBAL_SCOPE]
+
     def get_queryset(self):
-        return Follow.objects.filter(user=self.request.user)
+        return Follow.objects.filter(
+            user=self.request.user
+        ).select_related('user', 'author')
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    def get_batch_key(self, serializer):
+        data = serializer.validated_data
+        return data['user'].pk, data['author'].pk
+
+    @action(detail=False, methods=['post'])
+    def unfollow(self, request):
+        """Снимает подписки из массива {"following": имя} одним DELETE."""
+        items = get_batch_items(request)
+        names = [
+            item.get('following') if isinstance(item, dict) else None
+            for item in items
+        ]
+        follows = {
+            follow.author.username: follow
+            for follow in self.get_queryset().filter(author__username__in=[
+                name for name in names if isinstance(name, str)
+            ])
+        }
+        results = []
+        deleted = []
+        for name in names:
+            if not isinstance(name, str):
+                results.append(item_error(
+                    {'following': ['This field is required.']}
+                ))
+            elif name in follows:
+                deleted.append(follows.pop(name))
+                results.append({'status': status.HTTP_204_NO_CONTENT})
+            else:
+                results.append({
+                    'status': status.HTTP_404_NOT_FOUND,
+                    'errors': {'following': ['Not following this author.']},
+                })
+        if deleted:
+            # Collector шлёт post_delete с уже загруженными авторами.
+            collector = Collector(using=router.db_for_write(Follow))
+            collector.collect(deleted)
+            collector.delete()
+        return Response({'results': results})
+
+
+class FeedViewSet(ConditionalListMixin,
+                  PostRowsListMixin,
+                  SparseFieldsMixin,
+                  ConfigurablePaginationMixin,
+                  mixins.ListModelMixin,
+                  viewsets.GenericViewSet):
+    serializer_class = PostSerializer
+    sparse_columns = PostRowsSerializer.columns
+    sparse_required = PostRowsSerializer.ordering_columns
+    permission_classes = [permissions.IsAuthenticated, ]
+    pagination_scope = 'feed'
+
+    def get_validator_scopes(self):
+        return [follower_scope(self.request.user.pk), GLOBAL_SCOPE]
+
+    def get_queryset(self):
+        return get_feed(self.request.user).with_feed_relations()
+
+
+class SyncView(APIView):
+    """Созданные, изменённые и удалённые посты и комментарии после курсора.
+
+    Без cursor отвечает только текущим курсором: клиент берёт его до
+    полной выгрузки, а затем запрашивает изменения после него. Ответ 410
+    значит, что журнал после курсора уже очищен и нужна полная выгрузка.
+    """
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    page_size = 500
+    max_page_size = 1000
+
+    def get_int_param(self, name, default):
+        value = self.request.query_params.get(name, default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            value = -1
+        if value < 0:
+            raise ValidationError(
+                {name: ['A non-negative integer is required.']}
+            )
+        return value
+
+    def get(self, request):
+        if 'cursor' not in request.query_params:
+            return Response(self.batch({}, latest_cursor(), False))
+        cursor = self.get_int_param('cursor', 0)
+        limit = min(
+            max(self.get_int_param('limit', self.page_size), 1),
+            self.max_page_size,
+        )
+        try:
+            changes, cursor, has_more = changes_since(cursor, limit)
+        except CursorExpired:
+            return Response(
+                {'detail': 'Cursor has expired, a full sync is required.'},
+                status=status.HTTP_410_GONE,
+            )
+        return Response(self.batch(changes, cursor, has_more))
+
+    def batch(self, changes, cursor, has_more):
+        upserts = {Change.POST: [], Change.COMMENT: []}
+        deleted = {Change.POST: set(), Change.COMMENT: set()}
+        for (kind, object_id), gone in changes.items():
+            if gone:
+                deleted[kind].add(object_id)
+            else:
+                upserts[kind].append(object_id)
+        serializer = PostRowsSerializer({'request': self.request})
+        posts = serializer.serialize(serializer.rows(
+            Post.objects.filter(pk__in=upserts[Change.POST]).order_by('id')
+        ))
+        comments = CommentSerializer(
+            Comment.objects.filter(
+                pk__in=upserts[Change.COMMENT]
+            ).select_related('author').only(
+                'post', 'text', 'pub_date', 'author__username'
+            ).order_by('id'),
+            many=True,
+        ).data
+        # Записи, удалённые после строки журнала, тоже считаются удалёнными.
+        for kind, found in ((Change.POST, posts),
+                            (Change.COMMENT, comments)):
+            deleted[kind].update(
+                set(upserts[kind]) - {item['id'] for item in found}
+            )
+        return {
+            'cursor': cursor,
+            'has_more': has_more,
+            'posts': posts,
+            'comments': comments,
+            'deleted': {
+                'posts': sorted(deleted[Change.POST]),
+                'comments': sorted(deleted[Change.COMMENT]),
+            },
+        }
@@ -0,0 +1,139 @@
+"""Кеш-бэкенды Django со счётчиками попаданий и промахов.
+
+Каждый процесс копит приращения у себя. С Redis он не чаще раза в
+CACHE_STATS_FLUSH_INTERVAL секунд прибавляет их (incr) к счётчикам в
+самом кеше, и статистика сводная по всем воркерам. У файлового кеша и
+DatabaseCache incr - это чтение и запись, одновременные прибавления
+терялись бы, поэтому с ними, как и с locmem, счётчики остаются
+счётчиками процесса.
+"""
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends import db, dummy, filebased, locmem, redis
+
+from .profiling import record_cache
+
+STATS_KEYS = {'hits': 'core:cache-stats:hits',
+              'misses': 'core:cache-stats:misses'}
+
+_pending = Counter()
+_flushed_at = 0.0
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def cache_stats():
+    cache = caches['default']
+    if not shares_stats(cache):
+        with _lock:
+            return {name: _pending[name] for name in STATS_KEYS}
+    cache.flush_stats()
+    values = cache._call(cache.get_many, list(STATS_KEYS.values()))
+    return {name: values.get(key, 0) for name, key in STATS_KEYS.items()}
+
+
+def reset_cache_stats():
+    global _flushed_at
+    with _lock:
+        _pending.clear()
+        _flushed_at = time.monotonic()
+    if shares_stats(caches['default']):
+        caches['default'].delete_many(list(STATS_KEYS.values()))
+
+
+def is_shared(cache):
+    """Видят ли записи этого кеша все процессы-воркеры."""
+    return not isinstance(cache, (locmem.LocMemCache, dummy.DummyCache))
+
+
+def shares_stats(cache):
+    """Сводятся ли тут счётчики всех воркеров (нужен атомарный incr)."""
+    return getattr(cache, 'atomic_incr', False) and is_shared(cache)
+
+
+def _record(hits, misses):
+    with _lock:
+        _pending['hits'] += hits
+        _pending['misses'] += misses
+        due = (time.monotonic() - _flushed_at
+               >= settings.CACHE_STATS_FLUSH_INTERVAL)
+    record_cache(hits, misses)
+    return due
+
+
+class StatsMixin:
+    """Считает попадания только во внешнем вызове get/get_many.
+
+    Бэкенды реализуют get через get_many и наоборот, поэтому вложенные
+    вызовы не учитываются повторно.
+    """
+    _missing = object()
+
+    def _outermost(self):
+        return not getattr(_local, 'depth', 0)
+
+    def _call(self, method, *args, **kwargs):
+        _local.depth = getattr(_local, 'depth', 0) + 1
+        try:
+            return method(*args, **kwargs)
+        finally:
+            _local.depth -= 1
+
+    def flush_stats(self):
+        """Переносит накопленные процессом приращения в общие счётчики."""
+        global _flushed_at
+        with _lock:
+            pending = dict(_pending)
+            _pending.clear()
+            _flushed_at = time.monotonic()
+        for name, value in pending.items():
+            if value:
+                self._call(self._add_stat, STATS_KEYS[name], value)
+
+    def _add_stat(self, key, value):
+        self.add(key, 0, None)
+        try:
+            self.incr(key, value)
+        except ValueError:
+            # Ключ вытеснили между add и incr.
+            self.set(key, value, None)
+
+    def _count(self, hits, misses):
+        if _record(hits, misses) and shares_stats(self):
+            self.flush_stats()
+
+    def get(self, key, default=None, version=None):
+        outermost = self._outermost()
+        value = self._call(super().get, key, self._missing, version)
+        found = value is not self._missing
+        if outermost:
+            self._count(int(found), int(not found))
+        return value if found else default
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        outermost = self._outermost()
+        values = self._call(super().get_many, keys, version)
+        if outermost:
+            self._count(len(values), len(keys) - len(values))
+        return values
+
+
+class LocMemCache(StatsMixin, locmem.LocMemCache):
+    pass
+
+
+class FileBasedCache(StatsMixin, filebased.FileBasedCache):
+    pass
+
+
+class DatabaseCache(StatsMixin, db.DatabaseCache):
+    pass
+
+
+class RedisCache(StatsMixin, redis.RedisCache):
+    atomic_incr = True
@@ -1,8 +1,12 @@
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 
 
 def year(request):
-    """Добавляет переменную с текущим годом."""
+    """Добавляет переменную с текущим годом.
+
+    Год считается, только если шаблон его выводит.
+    """
     return {
-        'year': timezone.now().year,
+        'year': SimpleLazyObject(lambda: timezone.now().year),
     }
@@ -0,0 +1,30 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.replication import sync_replicas
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite на реплики из '
+        'DATABASE_REPLICA_PATHS; с --interval делает это постоянно, '
+        'изображая отставание репликации.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help='Повторять копирование через столько секунд.',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('Реплики не настроены: DATABASE_REPLICA_PATHS')
+        while True:
+            replicas = sync_replicas()
+            self.stdout.write(f'Скопировано на {", ".join(replicas)}')
+            if options['interval'] is None:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = (
+        'Компилирует все шаблоны проекта: проверка перед выкладкой и '
+        'оценка времени прогрева воркера.'
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        names = warm_templates()
+        elapsed = (time.perf_counter() - started) * 1000
+        if options['verbosity'] > 1:
+            for name in names:
+                self.stdout.write(name)
+        self.stdout.write(self.style.SUCCESS(
+            f'Скомпилировано шаблонов: {len(names)} за {elapsed:.1f} мс'
+        ))
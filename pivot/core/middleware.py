@@ -0,0 +1,146 @@
+import random
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+from . import profiling, routers
+
+
+class ProfilingMiddleware:
+    """Замеряет каждый запрос и отдаёт итог в заголовке Server-Timing.
+
+    Сводка по представлениям копится в процессе и доступна staff по
+    /metrics/profiling/. Доля PROFILING_SAMPLE_RATE запросов проходит
+    под cProfile; профиль сохраняется, если запрос дольше
+    PROFILING_SLOW_REQUEST_MS.
+
+    Работает и под WSGI, и под ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.PROFILING_ENABLED:
+            return self.get_response(request)
+        profile, token, profiler = self.start()
+        try:
+            with self.wrap_connections(profile):
+                response = self.get_response(request)
+        finally:
+            self.stop(token, profiler)
+        return self.finish(profile, profiler, response)
+
+    async def __acall__(self, request):
+        if not settings.PROFILING_ENABLED:
+            return await self.get_response(request)
+        profile, token, profiler = self.start()
+        try:
+            with self.wrap_connections(profile):
+                response = await self.get_response(request)
+        finally:
+            self.stop(token, profiler)
+        return self.finish(profile, profiler, response)
+
+    def start(self):
+        profile, token = profiling.start_profile()
+        profiler = None
+        if random.random() < settings.PROFILING_SAMPLE_RATE:
+            profiler = profiling.start_cprofile()
+        return profile, token, profiler
+
+    def wrap_connections(self, profile):
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(
+                connections[alias].execute_wrapper(profile.execute_wrapper)
+            )
+        return stack
+
+    def stop(self, token, profiler):
+        if profiler is not None:
+            profiler.disable()
+        profiling.finish_profile(token)
+
+    def finish(self, profile, profiler, response):
+        total_ms = profile.elapsed_ms()
+        view_name = profile.view_name or 'unresolved'
+        slow = profiling.record_request(view_name, profile, total_ms)
+        if slow and profiler is not None:
+            profiling.record_cprofile(view_name, profiler, total_ms)
+        response['Server-Timing'] = profile.server_timing(total_ms)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = profiling.current_profile()
+        if profile is not None:
+            profile.view_name = request.resolver_match.view_name
+
+
+class ReplicaPinningMiddleware:
+    """Обеспечивает чтение своих записей при чтении с реплик.
+
+    Запросы, кроме GET, HEAD и OPTIONS, целиком работают с основной
+    базой. После любой записи ставится cookie, и следующие
+    PRIMARY_PIN_SECONDS секунд чтения этого клиента тоже идут в основную
+    базу. Без настроенных реплик ничего не делает.
+    """
+    sync_capable = True
+    async_capable = True
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        state, token = routers.start_routing(self.use_primary(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.finish_routing(token)
+        return self.pin(state, response)
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+        state, token = routers.start_routing(self.use_primary(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            routers.finish_routing(token)
+        return self.pin(state, response)
+
+    def use_primary(self, request):
+        if request.method not in self.safe_methods:
+            return True
+        try:
+            pinned_until = float(request.COOKIES[routers.PIN_COOKIE])
+        except (KeyError, ValueError):
+            return False
+        return pinned_until > time.time()
+
+    def pin(self, state, response):
+        if state.wrote:
+            response.set_cookie(
+                routers.PIN_COOKIE,
+                str(int(time.time()) + settings.PRIMARY_PIN_SECONDS),
+                max_age=settings.PRIMARY_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
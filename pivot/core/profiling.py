@@ -0,0 +1,198 @@
+"""Лёгкое профилирование запросов: SQL, шаблоны, кеш и общее время."""
+import contextvars
+import cProfile
+import io
+import logging
+import pstats
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import (
+    DjangoTemplates, Template, reraise,
+)
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar('request_profile', default=None)
+_lock = threading.Lock()
+_views = {}
+_slow_queries = deque()
+_profiles = deque()
+
+AGGREGATE_FIELDS = (
+    'requests', 'total_ms', 'max_ms', 'queries', 'db_ms', 'template_ms',
+    'cache_hits', 'cache_misses', 'slow',
+)
+
+
+class RequestProfile:
+    """Замеры одного запроса; доступны через current_profile()."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.view_name = None
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.queries += 1
+            self.db_ms += elapsed
+            if elapsed >= settings.PROFILING_SLOW_QUERY_MS:
+                record_slow_query(self.view_name, sql, elapsed)
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self, total_ms):
+        return ', '.join((
+            f'db;dur={self.db_ms:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template_ms:.1f}',
+            f'cache;desc="hits={self.cache_hits} '
+            f'misses={self.cache_misses}"',
+            f'total;dur={total_ms:.1f}',
+        ))
+
+
+def current_profile():
+    return _current.get()
+
+
+def start_profile():
+    profile = RequestProfile()
+    return profile, _current.set(profile)
+
+
+def finish_profile(token):
+    _current.reset(token)
+
+
+def record_cache(hits, misses):
+    profile = _current.get()
+    if profile is not None:
+        profile.cache_hits += hits
+        profile.cache_misses += misses
+
+
+def record_slow_query(view_name, sql, elapsed_ms):
+    logger.warning('Медленный запрос %.1f мс в %s: %s',
+                   elapsed_ms, view_name, sql)
+    with _lock:
+        _slow_queries.append({
+            'view': view_name,
+            'sql': sql,
+            'ms': round(elapsed_ms, 1),
+        })
+        while len(_slow_queries) > settings.PROFILING_KEEP_SLOW_QUERIES:
+            _slow_queries.popleft()
+
+
+def record_request(view_name, profile, total_ms):
+    slow = total_ms >= settings.PROFILING_SLOW_REQUEST_MS
+    with _lock:
+        stats = _views.setdefault(
+            view_name, dict.fromkeys(AGGREGATE_FIELDS, 0)
+        )
+        stats['requests'] += 1
+        stats['total_ms'] += total_ms
+        stats['max_ms'] = max(stats['max_ms'], total_ms)
+        stats['queries'] += profile.queries
+        stats['db_ms'] += profile.db_ms
+        stats['template_ms'] += profile.template_ms
+        stats['cache_hits'] += profile.cache_hits
+        stats['cache_misses'] += profile.cache_misses
+        stats['slow'] += slow
+    return slow
+
+
+def record_cprofile(view_name, profiler, total_ms):
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats('cumulative').print_stats(
+        settings.PROFILING_PROFILE_LINES
+    )
+    with _lock:
+        _profiles.append({
+            'view': view_name,
+            'ms': round(total_ms, 1),
+            'stats': stream.getvalue(),
+        })
+        while len(_profiles) > settings.PROFILING_KEEP_PROFILES:
+            _profiles.popleft()
+
+
+def start_cprofile():
+    """Профилировщик для выборки запросов или None, если уже занят."""
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return None
+    return profiler
+
+
+def profiling_stats():
+    with _lock:
+        views = {}
+        for view_name, stats in _views.items():
+            views[view_name] = {
+                key: round(value, 1) if isinstance(value, float) else value
+                for key, value in stats.items()
+            }
+            views[view_name]['avg_ms'] = round(
+                stats['total_ms'] / stats['requests'], 1
+            )
+        return {
+            'views': views,
+            'slow_queries': list(_slow_queries),
+            'profiles': list(_profiles),
+        }
+
+
+def reset_profiling_stats():
+    with _lock:
+        _views.clear()
+        _slow_queries.clear()
+        _profiles.clear()
+
+
+class ProfiledTemplate(Template):
+    def render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            profile = _current.get()
+            if profile is not None:
+                profile.template_ms += (
+                    (time.perf_counter() - started) * 1000
+                )
+
+
+class ProfiledDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates, который учитывает время отрисовки шаблонов.
+
+    Вложенные шаблоны (include, extends) отрисовываются самим движком
+    и в общее время входят один раз.
+    """
+
+    def from_string(self, template_code):
+        return ProfiledTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return ProfiledTemplate(
+                self.engine.get_template(template_name), self
+            )
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -0,0 +1,28 @@
+"""Замена репликации для локальной работы с репликами SQLite.
+
+Копирует основную базу в файлы реплик через backup API SQLite: копия
+согласована, даже если в основную базу в это время пишут.
+"""
+import sqlite3
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def copy_database(source, target):
+    primary = sqlite3.connect(source)
+    replica = sqlite3.connect(target)
+    try:
+        primary.backup(replica)
+    finally:
+        replica.close()
+        primary.close()
+
+
+def sync_replicas():
+    """Переносит текущее состояние основной базы на все реплики."""
+    source = connections[DEFAULT_DB_ALIAS].settings_dict['NAME']
+    for alias in settings.DATABASE_REPLICAS:
+        connections[alias].close()
+        copy_database(source, connections[alias].settings_dict['NAME'])
+    return list(settings.DATABASE_REPLICAS)
@@ -0,0 +1,99 @@
+"""Чтение с реплик, запись в основную базу.
+
+С реплик читают только запросы, прошедшие через
+ReplicaPinningMiddleware: миграции, команды и фоновые задачи читают
+основную базу, чтобы не пересчитывать данные по отстающей копии.
+Пока идёт запрос, в контексте лежит RoutingState: после первой записи
+и на весь запрос, который не только читает, чтения уходят в основную
+базу. ReplicaPinningMiddleware после записи ставит cookie, и ещё
+PRIMARY_PIN_SECONDS секунд чтения пользователя тоже идут в основную
+базу, пока реплики догоняют её. Страницы с ETag и из кеша страниц
+строятся по основной базе (posts.caching.conditional_page).
+"""
+import contextvars
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'pin_primary'
+# Кеш в базе (CACHE_PROFILE=db) хранит поколения страниц и должен
+# читаться оттуда же, куда пишется.
+PRIMARY_ONLY_APPS = {'django_cache'}
+
+_state = contextvars.ContextVar('routing_state', default=None)
+
+
+class RoutingState:
+    def __init__(self, primary=False):
+        self.primary = primary
+        self.wrote = False
+
+
+def start_routing(primary=False):
+    state = RoutingState(primary)
+    return state, _state.set(state)
+
+
+def finish_routing(token):
+    _state.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Все чтения внутри блока идут в основную базу.
+
+    Внутри запроса меняется его же RoutingState, так что записи в блоке
+    по-прежнему ставят cookie PIN_COOKIE.
+    """
+    state = _state.get()
+    if state is None:
+        state, token = start_routing(primary=True)
+        try:
+            yield state
+        finally:
+            finish_routing(token)
+        return
+    primary, state.primary = state.primary, True
+    try:
+        yield state
+    finally:
+        state.primary = primary
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        state = _state.get()
+        if (
+            not replicas
+            or state is None
+            or state.primary
+            or state.wrote
+            or model._meta.app_label in PRIMARY_ONLY_APPS
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        # Запись в кеш страниц не меняет данные, которые читают с реплик.
+        if (
+            state is not None
+            and model._meta.app_label not in PRIMARY_ONLY_APPS
+        ):
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схему на реплики переносит репликация.
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
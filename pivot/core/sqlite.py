@@ -0,0 +1,15 @@
+"""Настройка соединений SQLite из профиля SQLITE_PROFILE."""
+from django.conf import settings
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Выполняет SQLITE_PRAGMAS на каждом новом соединении с SQLite.
+
+    journal_mode=WAL сохраняется в самом файле базы, остальные прагмы
+    действуют только на это соединение.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
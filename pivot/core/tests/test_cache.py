@@ -0,0 +1,122 @@
+import shutil
+import tempfile
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.cache import (
+    STATS_KEYS, cache_stats, is_shared, reset_cache_stats, shares_stats,
+)
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+User = get_user_model()
+
+TEMP_CACHE_DIR = tempfile.mkdtemp()
+
+
+class CacheProfilesTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_CACHE_DIR, ignore_errors=True)
+
+    def setUp(self):
+        reset_cache_stats()
+
+    def assert_shared(self):
+        """Два экземпляра бэкенда, как в двух воркерах, видят одни данные."""
+        first = caches.create_connection('default')
+        second = caches.create_connection('default')
+        first.clear()
+        first.set('key', 'value')
+        self.assertEqual(second.get('key'), 'value')
+        self.assertIsNone(second.get('missing'))
+        self.assertEqual(second.get_many(['key', 'missing']), {'key': 'value'})
+        self.assertEqual(cache_stats(), {'hits': 2, 'misses': 2})
+        self.assertTrue(is_shared(first))
+
+    def test_locmem_counts_hits_and_misses(self):
+        cache = caches.create_connection('default')
+        cache.set('key', 'value')
+        cache.get('key')
+        cache.get('missing')
+        cache.get_many(['key', 'missing', 'other'])
+        self.assertEqual(cache_stats(), {'hits': 2, 'misses': 3})
+        self.assertFalse(is_shared(cache))
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'core.cache.FileBasedCache',
+        'LOCATION': TEMP_CACHE_DIR,
+    }})
+    def test_file_cache_is_shared(self):
+        self.assert_shared()
+
+    @skipUnless(fakeredis, 'fakeredis is not installed')
+    @override_settings(CACHE_STATS_FLUSH_INTERVAL=0)
+    def test_redis_keeps_stats_for_all_workers(self):
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'core.cache.RedisCache',
+            'LOCATION': 'redis://localhost:6379/1',
+            'OPTIONS': {
+                'connection_class': fakeredis.FakeConnection,
+                'server': fakeredis.FakeServer(),
+            },
+        }}):
+            reset_cache_stats()
+            caches.create_connection('default').get('missing')
+            other_worker = caches.create_connection('default')
+            self.assertEqual(other_worker.get(STATS_KEYS['misses']), 1)
+            self.assertEqual(cache_stats(), {'hits': 1, 'misses': 1})
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'core.cache.FileBasedCache',
+        'LOCATION': TEMP_CACHE_DIR,
+    }}, CACHE_STATS_FLUSH_INTERVAL=0)
+    def test_non_atomic_incr_keeps_stats_in_process(self):
+        cache = caches.create_connection('default')
+        cache.clear()
+        cache.get('missing')
+        self.assertFalse(shares_stats(cache))
+        self.assertIsNone(cache._call(cache.get, STATS_KEYS['misses']),
+                          'get+set incr would lose concurrent increments')
+        self.assertEqual(cache_stats(), {'hits': 0, 'misses': 1})
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'core.cache.DatabaseCache',
+        'LOCATION': 'pivot_cache',
+    }})
+    def test_db_cache_is_shared(self):
+        call_command('createcachetable', verbosity=0)
+        self.assert_shared()
+
+    @skipUnless(fakeredis, 'fakeredis is not installed')
+    def test_redis_cache_is_shared(self):
+        server = fakeredis.FakeServer()
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'core.cache.RedisCache',
+            'LOCATION': 'redis://localhost:6379/1',
+            'OPTIONS': {
+                'connection_class': fakeredis.FakeConnection,
+                'server': server,
+            },
+        }}):
+            self.assert_shared()
+
+    def test_cache_stats_view_is_for_staff(self):
+        url = reverse('core:cache_stats')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        staff = User.objects.create(
+            username='staff', is_staff=True
+        )
+        self.client.force_login(staff)
+        response = self.client.get(url)
+        self.assertEqual(response.json(),
+                         {'hits': 0, 'misses': 0, 'shared': False})
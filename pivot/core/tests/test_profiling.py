@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.profiling import profiling_stats, reset_profiling_stats
+from posts.models import Post
+
+User = get_user_model()
+
+
+class ProfilingMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='testuser')
+        Post.objects.create(text='Тестовый пост', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        reset_profiling_stats()
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('posts:index'))
+        timing = response['Server-Timing']
+        for metric in ('db;dur=', 'queries"', 'tpl;dur=', 'cache;desc=',
+                       'total;dur='):
+            self.assertIn(metric, timing)
+        self.assertIn('misses=', timing)
+
+    def test_requests_are_aggregated_per_view(self):
+        with self.assertNumQueries(2):
+            self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'))
+        stats = profiling_stats()['views']['posts:index']
+        self.assertEqual(stats['requests'], 2)
+        # Второй ответ берётся из кеша страниц и в базу не ходит.
+        self.assertEqual(stats['queries'], 2)
+        self.assertGreater(stats['template_ms'], 0)
+        self.assertGreaterEqual(stats['cache_hits'], 1)
+
+    @override_settings(PROFILING_SLOW_QUERY_MS=0)
+    def test_slow_queries_are_kept(self):
+        with self.assertLogs('core.profiling', 'WARNING'):
+            self.client.get(reverse('posts:index'))
+        slow_queries = profiling_stats()['slow_queries']
+        self.assertEqual(slow_queries[0]['view'], 'posts:index')
+        self.assertIn('SELECT', slow_queries[0]['sql'])
+
+    @override_settings(PROFILING_SAMPLE_RATE=1, PROFILING_SLOW_REQUEST_MS=0)
+    def test_slow_sampled_requests_are_profiled(self):
+        self.client.get(reverse('posts:index'))
+        profiles = profiling_stats()['profiles']
+        self.assertEqual(profiles[0]['view'], 'posts:index')
+        self.assertIn('cumulative', profiles[0]['stats'])
+
+    @override_settings(PROFILING_ENABLED=False)
+    def test_disabled(self):
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(profiling_stats()['views'], {})
+
+    def test_profiling_view_is_for_staff(self):
+        url = reverse('core:profiling')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        staff = User.objects.create(username='staff', is_staff=True)
+        self.client.force_login(staff)
+        self.client.get(reverse('posts:index'))
+        response = self.client.post(url)
+        self.assertIn('posts:index', response.json()['views'])
+        self.assertNotIn('posts:index', profiling_stats()['views'])
@@ -0,0 +1,221 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections, router
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory, SimpleTestCase, TestCase, override_settings,
+)
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.middleware import ReplicaPinningMiddleware
+from core.replication import copy_database
+from core.routers import (
+    PIN_COOKIE, finish_routing, start_routing, use_primary,
+)
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        token = start_routing()[1]
+        self.addCleanup(finish_routing, token)
+
+    def test_reads_go_to_replicas(self):
+        self.assertIn(Post.objects.all().db, ('replica1', 'replica2'))
+        self.assertEqual(router.db_for_write(Post), 'default')
+
+    def test_reads_use_primary_when_asked(self):
+        with use_primary():
+            self.assertEqual(Post.objects.all().db, 'default')
+
+    def test_database_cache_uses_primary(self):
+        from django.core.cache.backends.db import DatabaseCache
+
+        cache = DatabaseCache('pivot_cache', {})
+        self.assertEqual(router.db_for_read(cache.cache_model_class),
+                         'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        self.assertEqual(Post.objects.all().db, 'default')
+
+    def test_migrations_skip_replicas(self):
+        self.assertFalse(router.allow_migrate('replica1', 'posts'))
+        self.assertTrue(router.allow_migrate('default', 'posts'))
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'], PRIMARY_PIN_SECONDS=5)
+class ReplicaPinningMiddlewareTests(SimpleTestCase):
+    factory = RequestFactory()
+
+    def handle(self, request, write=False):
+        """Прогоняет запрос через middleware и запоминает базы чтения."""
+        reads = []
+
+        def view(request):
+            reads.append(Post.objects.all().db)
+            if write:
+                router.db_for_write(Post)
+                reads.append(Post.objects.all().db)
+            return HttpResponse()
+
+        response = ReplicaPinningMiddleware(view)(request)
+        return reads, response
+
+    def test_safe_request_reads_replica(self):
+        reads, response = self.handle(self.factory.get('/'))
+        self.assertEqual(reads, ['replica1'])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_unsafe_request_uses_primary_and_pins(self):
+        reads, response = self.handle(self.factory.post('/'), write=True)
+        self.assertEqual(reads, ['default', 'default'])
+        cookie = response.cookies[PIN_COOKIE]
+        self.assertEqual(cookie['max-age'], 5)
+        self.assertGreater(float(cookie.value), time.time())
+
+    def test_write_during_get_switches_to_primary(self):
+        reads, response = self.handle(self.factory.get('/'), write=True)
+        self.assertEqual(reads, ['replica1', 'default'])
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+    def test_cache_write_during_get_keeps_replica(self):
+        from django.core.cache.backends.db import DatabaseCache
+
+        cache_model = DatabaseCache('pivot_cache', {}).cache_model_class
+        reads = []
+
+        def view(request):
+            router.db_for_write(cache_model)
+            reads.append(Post.objects.all().db)
+            return HttpResponse()
+
+        response = ReplicaPinningMiddleware(view)(self.factory.get('/'))
+        self.assertEqual(reads, ['replica1'],
+                         'Cache writes should not switch reads to primary')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_write_inside_use_primary_still_pins(self):
+        reads = []
+
+        def view(request):
+            with use_primary():
+                reads.append(Post.objects.all().db)
+                router.db_for_write(Post)
+            reads.append(Post.objects.all().db)
+            return HttpResponse()
+
+        response = ReplicaPinningMiddleware(view)(self.factory.get('/'))
+        self.assertEqual(reads, ['default', 'default'])
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+    def test_pin_cookie_reads_primary_until_it_expires(self):
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE] = str(int(time.time()) + 5)
+        self.assertEqual(self.handle(request)[0], ['default'])
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE] = str(int(time.time()) - 1)
+        self.assertEqual(self.handle(request)[0], ['replica1'])
+
+    def test_reads_outside_requests_use_primary(self):
+        self.handle(self.factory.get('/'))
+        self.assertEqual(Post.objects.all().db, 'default')
+
+
+class ReplicationTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.primary = os.path.join(self.directory, 'primary.sqlite3')
+        self.replica = os.path.join(self.directory, 'replica.sqlite3')
+
+    def query(self, path, sql):
+        connection = sqlite3.connect(path)
+        try:
+            with connection:
+                return connection.execute(sql).fetchall()
+        finally:
+            connection.close()
+
+    def test_copy_database_brings_replica_up_to_date(self):
+        self.query(self.primary, 'CREATE TABLE post (text TEXT)')
+        self.query(self.primary, "INSERT INTO post VALUES ('first')")
+        copy_database(self.primary, self.replica)
+        self.query(self.primary, "INSERT INTO post VALUES ('second')")
+        self.assertEqual(
+            self.query(self.replica, 'SELECT text FROM post'),
+            [('first',)],
+            'Replica should lag until the next sync',
+        )
+        copy_database(self.primary, self.replica)
+        self.assertEqual(
+            len(self.query(self.replica, 'SELECT text FROM post')), 2
+        )
+
+
+@override_settings(DATABASE_REPLICAS=['lagging'])
+class LaggingReplicaPagesTests(TestCase):
+    """Реплика - отдельный файл со снимком базы до создания данных."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        replica = sqlite3.connect(os.path.join(cls.directory, 'replica'))
+        connections['default'].ensure_connection()
+        connections['default'].connection.backup(replica)
+        replica.close()
+        super().setUpClass()
+        connections.settings['lagging'] = {
+            **connections['default'].settings_dict,
+            'NAME': os.path.join(cls.directory, 'replica'),
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['lagging'].close()
+        del connections['lagging']
+        del connections.settings['lagging']
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.post = Post.objects.create(text='Свежий пост', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_replica_lags(self):
+        response = self.client.get(reverse('posts:search'), {'q': 'Свежий'})
+        self.assertEqual(len(response.context['page_obj']), 0,
+                         'Uncached reads should come from the replica')
+
+    def test_cached_pages_are_built_from_primary(self):
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), 'Свежий пост')
+        client = APIClient()
+        client.force_authenticate(self.author)
+        response = client.get('/api/v1/posts/?limit=10')
+        self.assertEqual([post['id'] for post in response.json()['results']],
+                         [self.post.pk])
+
+
+@override_settings(ROOT_URLCONF='pivot.asgi_urls')
+class AsyncLaggingReplicaPagesTests(LaggingReplicaPagesTests):
+    pass
@@ -0,0 +1,41 @@
+import os
+import shutil
+import tempfile
+
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, override_settings
+
+
+class SqliteProfileTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        settings_dict = {
+            **connection.settings_dict,
+            'NAME': os.path.join(directory, 'db.sqlite3'),
+        }
+        self.wrapper = DatabaseWrapper(settings_dict, alias='profile_test')
+        self.addCleanup(self.wrapper.close)
+
+    def pragma(self, name):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS={
+        'journal_mode': 'WAL',
+        'busy_timeout': 10_000,
+        'synchronous': 'NORMAL',
+        'cache_size': -1024,
+    })
+    def test_pragmas_applied_to_new_connections(self):
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('busy_timeout'), 10_000)
+        # NORMAL
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('cache_size'), -1024)
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_default_profile_keeps_sqlite_defaults(self):
+        self.assertEqual(self.pragma('journal_mode'), 'delete')
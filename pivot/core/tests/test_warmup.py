@@ -0,0 +1,30 @@
+from django.template import engines
+from django.test import RequestFactory, SimpleTestCase
+from django.utils import timezone
+from django.utils.functional import empty
+
+from core.context_proccessors.year import year
+from core.warmup import warm_templates, warm_up
+
+
+class WarmUpTests(SimpleTestCase):
+    def test_project_templates_are_compiled_and_cached(self):
+        names = warm_templates()
+        for name in ('base.html', 'posts/index.html',
+                     'includes/paginator.html', 'core/404.html'):
+            self.assertIn(name, names)
+        loader = engines.all()[0].engine.template_loaders[0]
+        self.assertEqual(
+            type(loader).__module__, 'django.template.loaders.cached',
+        )
+        self.assertIn('posts/index.html', loader.get_template_cache)
+
+    def test_warm_up_returns_template_names(self):
+        self.assertEqual(warm_up(), warm_templates())
+
+
+class YearContextProcessorTests(SimpleTestCase):
+    def test_year_is_computed_on_use(self):
+        value = year(RequestFactory().get('/'))['year']
+        self.assertIs(value._wrapped, empty, 'Year should be lazy')
+        self.assertEqual(str(value), str(timezone.now().year))
@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'core'
+
+urlpatterns = [
+    path('cache/', views.cache_stats_view, name='cache_stats'),
+    path('profiling/', views.profiling_view, name='profiling'),
+]
@@ -1,5 +1,11 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.cache import caches
+from django.http import JsonResponse
 from django.shortcuts import render
 
+from .cache import cache_stats, shares_stats
+from .profiling import profiling_stats, reset_profiling_stats
+
 
 def page_not_found(request, exception):
     return render(request, 'core/404.html', {'path': request.path}, status=404)
@@ -7,3 +13,19 @@ def page_not_found(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+@staff_member_required
+def cache_stats_view(request):
+    # shared=false: счётчики только этого процесса (см. core.cache).
+    stats = cache_stats()
+    stats['shared'] = shares_stats(caches['default'])
+    return JsonResponse(stats)
+
+
+@staff_member_required
+def profiling_view(request):
+    stats = profiling_stats()
+    if request.method == 'POST':
+        reset_profiling_stats()
+    return JsonResponse(stats)
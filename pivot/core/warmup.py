@@ -0,0 +1,44 @@
+"""Прогрев воркера: компиляция шаблонов проекта и таблиц URL.
+
+Кеширующий загрузчик компилирует шаблон при первом обращении, а
+резолвер импортирует представления при первом reverse(); без прогрева
+эту цену платит первый запрос в каждом воркере. warm_up() вызывается
+при старте из pivot.wsgi и pivot.asgi.
+"""
+import os
+
+from django.template import engines
+from django.urls import get_resolver
+
+
+def template_names(directory):
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.endswith(('.html', '.txt')):
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, directory).replace(os.sep, '/')
+
+
+def warm_templates():
+    """Компилирует все шаблоны из DIRS; возвращает их имена."""
+    names = []
+    for engine in engines.all():
+        for directory in getattr(engine, 'dirs', ()):
+            for name in template_names(directory):
+                engine.get_template(name)
+                names.append(name)
+    return names
+
+
+def warm_urls(resolver=None):
+    """Импортирует представления и строит таблицы reverse() всех
+    пространств имён."""
+    resolver = resolver or get_resolver()
+    resolver.reverse_dict
+    for _, namespace_resolver in resolver.namespace_dict.values():
+        warm_urls(namespace_resolver)
+
+
+def warm_up():
+    warm_urls()
+    return warm_templates()
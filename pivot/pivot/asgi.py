@@ -11,6 +11,11 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from core.warmup import warm_up
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pivot.settings')
+os.environ.setdefault('DJANGO_ROOT_URLCONF', 'pivot.asgi_urls')
 
 application = get_asgi_application()
+
+warm_up()
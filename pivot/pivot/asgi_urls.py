@@ -0,0 +1,8 @@
+"""Маршруты для ASGI: страницы только для чтения и список постов API
+обслуживаются асинхронными представлениями.
+
+Выбирается в pivot.asgi через переменную окружения DJANGO_ROOT_URLCONF.
+"""
+from pivot.urls import build_urlpatterns, handler403, handler404  # noqa
+
+urlpatterns = build_urlpatterns(asynchronous=True)
@@ -61,6 +61,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ProfilingMiddleware',
+    'core.middleware.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -75,22 +77,34 @@ INTERNAL_IPS = [
     '127.0.0.1',
 ]
 
+# Шаблоны приложений (и панели отладки) загружаются app_directories
+# в явном списке loaders, APP_DIRS для этого не нужен.
+SILENCED_SYSTEM_CHECKS = ['debug_toolbar.W006']
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
-ROOT_URLCONF = 'pivot.urls'
+# Под ASGI (pivot/asgi.py) подключаются асинхронные представления.
+ROOT_URLCONF = os.getenv('DJANGO_ROOT_URLCONF', 'pivot.urls')
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.profiling.ProfiledDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Скомпилированные шаблоны живут в памяти процесса;
+            # при старте их заранее загружает core.warmup.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -108,13 +122,63 @@ WSGI_APPLICATION = 'pivot.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Профили SQLite выбираются переменной окружения SQLITE_PROFILE.
+# PRAGMAS выполняются на каждом новом соединении (core.sqlite).
+# default - настройки SQLite как есть, новое соединение на запрос;
+# tuned - WAL (чтения не ждут записи), ожидание блокировки до
+# busy_timeout мс вместо "database is locked", synchronous=NORMAL
+# (в WAL без риска повредить базу), кеш страниц и mmap побольше,
+# соединения живут CONN_MAX_AGE секунд.
+SQLITE_PROFILES = {
+    'default': {
+        'CONN_MAX_AGE': 0,
+        'PRAGMAS': {},
+    },
+    'tuned': {
+        'CONN_MAX_AGE': 60,
+        'PRAGMAS': {
+            'journal_mode': 'WAL',
+            'busy_timeout': 10_000,
+            'synchronous': 'NORMAL',
+            'mmap_size': 256 * 1024 * 1024,
+            # Отрицательное значение - в КБ, то есть 64 МБ.
+            'cache_size': -64 * 1024,
+            'temp_store': 'MEMORY',
+        },
+    },
+}
+SQLITE_PROFILE = os.getenv('SQLITE_PROFILE', 'tuned')
+SQLITE_PRAGMAS = SQLITE_PROFILES[SQLITE_PROFILE]['PRAGMAS']
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': SQLITE_PROFILES[SQLITE_PROFILE]['CONN_MAX_AGE'],
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Реплики только для чтения: пути к файлам SQLite через запятую в
+# DATABASE_REPLICA_PATHS. Локально их наполняет manage.py sync_replicas.
+DATABASE_REPLICAS = []
+for number, path in enumerate(
+    filter(None, os.getenv('DATABASE_REPLICA_PATHS', '').split(',')), 1
+):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': path,
+        'CONN_MAX_AGE': SQLITE_PROFILES[SQLITE_PROFILE]['CONN_MAX_AGE'],
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Сколько секунд после записи чтения клиента идут в основную базу.
+PRIMARY_PIN_SECONDS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -168,24 +232,143 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
 
+    # JWTAuthentication с кешем проверенных токенов и пользователей.
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
+    ],
+
+    # Тот же JSON, что у JSONRenderer, но через orjson, если он есть.
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
 }
 
 
+# Пагинация списков API: 'limit_offset', 'uncounted' (limit/offset без
+# COUNT(*)), 'cursor' (по ключу (pub_date, id)) или None.
+# 'uncounted' и 'cursor' убирают из ответа поле count, поэтому для постов
+# и ленты включаются явно, по умолчанию - прежний limit/offset.
+API_PAGINATION = {
+    'posts': 'limit_offset',
+    'feed': 'limit_offset',
+    'comments': 'cursor',
+    'follow': None,
+}
+
+# Наибольшее число элементов в пакетных запросах API (.../batch/).
+API_BATCH_MAX_SIZE = 500
+
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_OBTAIN_SERIALIZER': (
+        'api.serializers.UserStateTokenObtainPairSerializer'
+    ),
 }
 
+# Сколько проверенных JWT помнит процесс и сколько секунд пользователь
+# API живёт в кеше; сохранение пользователя сбрасывает его запись.
+# В общем кеше (профили file, db, redis) сброс виден всем воркерам сразу.
+# С locmem он доходит только до своего процесса: другие воркеры до
+# API_USER_CACHE_TIMEOUT секунд принимают старые токены сменившего пароль
+# или деактивированного пользователя (новые токены с другим отпечатком
+# перечитывают его из базы). 0 - читать пользователя на каждый запрос.
+API_TOKEN_CACHE_SIZE = 1024
+API_USER_CACHE_TIMEOUT = 60
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Страницы для анонимных пользователей инвалидируются сменой поколений
+# (posts.caching); таймаут лишь ограничивает срок жизни записи.
+POSTS_PAGE_CACHE_TIMEOUT = 60 * 60
+
+# Профили кеша выбираются переменной окружения CACHE_PROFILE.
+# locmem - отдельный кеш в каждом процессе (для разработки);
+# file и db - общий для всех воркеров кеш на диске или в SQLite
+# (для db нужно выполнить manage.py createcachetable);
+# redis - общий кеш на сервере Redis по адресу REDIS_URL.
+CACHE_PROFILES = {
+    'locmem': {
+        'BACKEND': 'core.cache.LocMemCache',
+    },
+    'file': {
+        'BACKEND': 'core.cache.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+    },
+    'db': {
+        'BACKEND': 'core.cache.DatabaseCache',
+        'LOCATION': 'pivot_cache',
+    },
+    'redis': {
+        'BACKEND': 'core.cache.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+    },
+}
+CACHE_PROFILE = os.getenv('CACHE_PROFILE', 'locmem')
+# Как часто процесс переносит свои попадания и промахи в общие счётчики
+# /metrics/cache/. Сводятся они только в redis (атомарный incr), с
+# остальными профилями это счётчики одного процесса.
+CACHE_STATS_FLUSH_INTERVAL = 10
+
 CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
-}
\ No newline at end of file
+    'default': CACHE_PROFILES[CACHE_PROFILE],
+}
+
+# Профилирование запросов (core.middleware.ProfilingMiddleware): заголовок
+# Server-Timing и сводка по представлениям на /metrics/profiling/.
+# Запросы к базе дольше PROFILING_SLOW_QUERY_MS пишутся в лог,
+# из PROFILING_SAMPLE_RATE запросов под cProfile сохраняются профили тех,
+# что дольше PROFILING_SLOW_REQUEST_MS.
+PROFILING_ENABLED = True
+PROFILING_SAMPLE_RATE = 0.01
+PROFILING_SLOW_REQUEST_MS = 500
+PROFILING_SLOW_QUERY_MS = 100
+PROFILING_KEEP_SLOW_QUERIES = 50
+PROFILING_KEEP_PROFILES = 20
+PROFILING_PROFILE_LINES = 40
+
+# Лента подписок: посты авторов с числом подписчиков не меньше
+# FEED_FANOUT_FOLLOWERS_LIMIT не раскладываются по лентам при записи,
+# а подмешиваются при чтении.
+FEED_FANOUT_FOLLOWERS_LIMIT = 1000
+FEED_BACKFILL_SIZE = 200
+
+# Постраничный вывод лент по курсору (pub_date, id) вместо номеров страниц.
+# Передача ?cursor= включает его и при выключенной настройке.
+POSTS_KEYSET_PAGINATION = False
+POSTS_KEYSET_APPROXIMATE_COUNT = True
+COUNT_CACHE_TIMEOUT = 60
+
+# Уменьшенные копии картинок постов строятся пулом процессов после
+# сохранения поста; при POST_IMAGE_RENDITIONS_ASYNC = False - сразу.
+POST_IMAGE_RENDITION_WIDTHS = (360, 960)
+POST_IMAGE_RENDITION_FORMATS = ('webp', 'jpeg')
+POST_IMAGE_WORKERS = 2
+POST_IMAGE_RENDITIONS_ASYNC = True
+
+# Загрузки картинок: небольшие файлы держатся в памяти, остальные
+# потоково пишутся во временный файл не больше
+# POST_IMAGE_MAX_UPLOAD_SIZE байт. Картинки крупнее
+# POST_IMAGE_MAX_DIMENSION по большей стороне уменьшаются в воркере.
+FILE_UPLOAD_MAX_MEMORY_SIZE = 512 * 1024
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'posts.uploads.LimitedTemporaryFileUploadHandler',
+]
+POST_IMAGE_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+POST_IMAGE_MAX_PIXELS = 40_000_000
+POST_IMAGE_MAX_DIMENSION = 2560
+POST_IMAGE_DOWNSCALE_TIMEOUT = 30
+
+# Журнал изменений для /api/v1/sync/: строки старше
+# CHANGE_LOG_RETENTION_DAYS дней удаляет manage.py prune_changes.
+CHANGE_LOG_RETENTION_DAYS = 30
+
+# Базовые замеры manage.py benchmark: число запросов, задержка и память
+# для каждого маршрута на синтетическом наборе данных.
+BENCHMARK_BASELINE = BASE_DIR / 'benchmarks' / 'baseline.json'
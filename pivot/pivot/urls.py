@@ -13,6 +13,8 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from importlib import import_module
+
 from django.contrib import admin
 from django.urls import path, include
 from django.conf.urls.static import static
@@ -21,20 +23,37 @@ from django.conf import settings
 handler404 = 'core.views.page_not_found'
 handler403 = 'core.views.csrf_failure'
 
-urlpatterns = [
-    path('api/', include('api.urls')),
-    path('about/', include('about.urls', namespace='about')),
-    path('admin/', admin.site.urls),
-    path('auth/', include('users.urls')),
-    path('auth/', include('django.contrib.auth.urls')),
-    path('', include('posts.urls', namespace='posts')),
-]
 
-if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
-    )
+def build_urlpatterns(asynchronous=False):
+    """Маршруты проекта; asynchronous=True подключает асинхронные
+    представления из async_urlpatterns приложений (см. pivot.asgi_urls).
+    """
+    api_urls = import_module('api.urls')
+    posts_urls = import_module('posts.urls')
+    if asynchronous:
+        api = (api_urls.async_urlpatterns, api_urls.app_name)
+        posts = (posts_urls.async_urlpatterns, posts_urls.app_name)
+    else:
+        api, posts = api_urls, posts_urls
+    patterns = [
+        path('api/', include(api)),
+        path('about/', include('about.urls', namespace='about')),
+        path('admin/', admin.site.urls),
+        path('metrics/', include('core.urls')),
+        path('auth/', include('users.urls')),
+        path('auth/', include('django.contrib.auth.urls')),
+        path('', include(posts, namespace='posts')),
+    ]
+
+    if settings.DEBUG:
+        patterns += static(
+            settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
+        )
+
+        import debug_toolbar
+
+        patterns += (path('__debug__/', include(debug_toolbar.urls)),)
+    return patterns
 
-    import debug_toolbar
 
-    urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
+urlpatterns = build_urlpatterns()
@@ -0,0 +1,116 @@
+"""Асинхронные версии страниц только для чтения.
+
+Подключаются через pivot.asgi_urls, когда проект работает под ASGI.
+Запросы и контексты страниц берутся из posts.views, здесь они только
+выполняются через асинхронный ORM, а шаблоны отрисовываются по уже
+загруженным объектам.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404
+from django.shortcuts import render
+
+from .caching import (
+    GLOBAL_SCOPE, aload_user, author_scope, cached_page, group_scope,
+    post_scope,
+)
+from .counters import recount_user
+from .feed import aget_feed
+from .models import Group, Post, UserCounter
+from .pagination import KeysetPaginator
+from .views import (
+    POSTS_PER_PAGE, add_page_range, comments_context, comments_paginator,
+    detail_posts, follow_context, following_query, get_paginator,
+    group_context, index_context, post_author_username, post_detail_context,
+    profile_authors, profile_context,
+)
+
+
+async def aget_object_or_404(queryset, **kwargs):
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404
+
+
+async def aget_user_counter(user):
+    try:
+        return user.counter
+    except UserCounter.DoesNotExist:
+        return await sync_to_async(recount_user)(user.pk)
+
+
+async def aget_page_object(request, objects, posts_per_page, count=None):
+    paginator = get_paginator(request, objects, posts_per_page)
+    if isinstance(paginator, KeysetPaginator):
+        return await paginator.aget_page(request.GET.get('cursor'))
+    paginator.count = await objects.acount() if count is None else count
+    page_obj = paginator.get_page(request.GET.get('page'))
+    page_obj.object_list = [obj async for obj in page_obj.object_list]
+    return add_page_range(paginator, page_obj)
+
+
+async def apost_detail_scopes(post_id):
+    username = await post_author_username(post_id).afirst()
+    return [post_scope(post_id), author_scope(username)]
+
+
+async def aget_comments_page(post_id, cursor=None):
+    return await comments_paginator(post_id).aget_page(cursor)
+
+
+@cached_page(lambda: [GLOBAL_SCOPE])
+async def index(request):
+    post_list = Post.objects.with_feed_relations()
+    page_obj = await aget_page_object(request, post_list, POSTS_PER_PAGE)
+    return render(request, 'posts/index.html', index_context(page_obj))
+
+
+@cached_page(lambda slug: [group_scope(slug)])
+async def group_posts(request, slug):
+    group = await aget_object_or_404(Group.objects, slug=slug)
+    posts = group.posts.with_feed_relations()
+    page_obj = await aget_page_object(request, posts, POSTS_PER_PAGE)
+    return render(request, 'posts/group_list.html',
+                  group_context(group, page_obj))
+
+
+@cached_page(lambda username: [author_scope(username)])
+async def profile(request, username):
+    author = await aget_object_or_404(profile_authors(), username=username)
+    posts = author.posts.with_feed_relations()
+    posts_number = (await aget_user_counter(author)).posts_count
+    page_obj = await aget_page_object(
+        request, posts, POSTS_PER_PAGE, count=posts_number
+    )
+    following = (request.user.is_authenticated
+                 and await following_query(request.user, author).aexists())
+    context = profile_context(author, page_obj, posts_number, following)
+    return render(request, 'posts/profile.html', context)
+
+
+@cached_page(apost_detail_scopes)
+async def post_detail(request, post_id):
+    post = await aget_object_or_404(detail_posts(), pk=post_id)
+    comments = await aget_comments_page(post.pk)
+    author_posts_number = (await aget_user_counter(post.author)).posts_count
+    context = post_detail_context(post, comments, author_posts_number)
+    return render(request, 'posts/post_detail.html', context)
+
+
+@cached_page(lambda post_id: [post_scope(post_id)])
+async def post_comments(request, post_id):
+    comments = await aget_comments_page(post_id, request.GET.get('cursor'))
+    if not comments and not await Post.objects.filter(pk=post_id).aexists():
+        raise Http404
+    return render(request, 'includes/comments.html',
+                  comments_context(post_id, comments))
+
+
+async def follow_index(request):
+    user = await aload_user(request)
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+    posts = (await aget_feed(user)).with_feed_relations()
+    page_obj = await aget_page_object(request, posts, POSTS_PER_PAGE)
+    return render(request, 'posts/follow.html', follow_context(page_obj))
@@ -0,0 +1,519 @@
+"""Замеры запросов, задержки и памяти для всех маршрутов posts и api."""
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from urllib.parse import urlencode
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from posts import changes, counters, feed, search
+from posts.models import Change, Comment, Follow, Group, Post
+from posts.views import get_comments_page
+
+User = get_user_model()
+
+PASSWORD = 'benchmark-password'
+WORDS = (
+    'кот', 'собака', 'погода', 'город', 'утро', 'книга', 'музыка', 'кофе',
+    'дорога', 'море', 'лес', 'работа', 'друг', 'вечер', 'фильм', 'снег',
+)
+SYNC_TAIL = 100
+BATCH_SIZE = 20
+URLCONFS = {'posts': 'posts.urls', 'api': 'api.urls'}
+# Маршруты, которые без почты и одноразовых токенов не вызвать;
+# api-token-auth требует rest_framework.authtoken в INSTALLED_APPS.
+SKIPPED = {
+    'api:v1/api-token-auth/',
+    'api:v1/auth/user-activation',
+    'api:v1/auth/user-resend-activation',
+    'api:v1/auth/user-reset-password',
+    'api:v1/auth/user-reset-password-confirm',
+    'api:v1/auth/user-reset-username',
+    'api:v1/auth/user-reset-username-confirm',
+    'api:v1/auth/user-set-password',
+    'api:v1/auth/user-set-username',
+}
+# Задержки и память в базовых замерах хранятся в долях этого маршрута,
+# чтобы не зависеть от скорости машины.
+REFERENCE_ROUTE = 'api:v1/api-root'
+# Относительный допуск и минимальный шум, ниже которого рост не считается.
+METRIC_TOLERANCE = {
+    'p50': (0.5, 1.5),
+    'p95': (0.5, 4.0),
+    'peak': (0.25, 2.0),
+}
+
+
+def _zipf_weights(size, exponent=1.1):
+    return [1 / rank ** exponent for rank in range(1, size + 1)]
+
+
+def seed(users=10_000, posts=100_000, groups=50, follows=20,
+         comments=100_000, random_seed=1):
+    """Наполняет базу данными с перекосом подписок в сторону топ-авторов."""
+    rng = random.Random(random_seed)
+    User.objects.bulk_create(
+        (User(username=f'user{number}', password='!')
+         for number in range(users)),
+        batch_size=1000,
+    )
+    user_ids = list(
+        User.objects.filter(username__startswith='user')
+        .order_by('pk').values_list('pk', flat=True)
+    )
+    Group.objects.bulk_create(
+        Group(
+            title=f'Группа {number}',
+            slug=f'group{number}',
+            description='Группа для замеров',
+        )
+        for number in range(groups)
+    )
+    group_ids = list(Group.objects.values_list('pk', flat=True))
+    weights = _zipf_weights(len(user_ids))
+    authors = rng.choices(user_ids, weights, k=posts)
+    Post.objects.bulk_create(
+        (
+            Post(
+                author_id=author_id,
+                group_id=rng.choice(group_ids) if rng.random() < 0.7
+                else None,
+                text=' '.join(rng.choices(WORDS, k=rng.randint(5, 40))),
+            )
+            for author_id in authors
+        ),
+        batch_size=1000,
+    )
+    pairs = set()
+    for user_id in user_ids:
+        for author_id in rng.choices(user_ids, weights, k=follows):
+            if author_id != user_id:
+                pairs.add((user_id, author_id))
+    Follow.objects.bulk_create(
+        (Follow(user_id=user_id, author_id=author_id)
+         for user_id, author_id in pairs),
+        batch_size=1000,
+    )
+    post_ids = list(Post.objects.values_list('pk', flat=True))
+    post_weights = _zipf_weights(len(post_ids), exponent=0.8)
+    Comment.objects.bulk_create(
+        (
+            Comment(
+                post_id=post_id,
+                author_id=rng.choice(user_ids),
+                text=' '.join(rng.choices(WORDS, k=8)),
+            )
+            for post_id in rng.choices(post_ids, post_weights, k=comments)
+        ),
+        batch_size=1000,
+    )
+    counters.reconcile()
+    feed.rebuild_feeds()
+    search.rebuild_index()
+    # Хвост журнала изменений, как после недавних правок.
+    changes.record(Change.POST, post_ids[-SYNC_TAIL:])
+    changes.record(Change.COMMENT, Comment.objects.order_by(
+        '-pk'
+    ).values_list('pk', flat=True)[:SYNC_TAIL])
+
+
+def build_context():
+    """Самые тяжёлые объекты набора: на них и меряем маршруты."""
+    reader = User.objects.annotate(
+        total=Count('follower')
+    ).order_by('-total', 'pk').first()
+    reader.set_password(PASSWORD)
+    reader.save(update_fields=['password'])
+    author = User.objects.annotate(
+        total=Count('following')
+    ).order_by('-total', 'pk').first()
+    post = Post.objects.select_related('author').order_by(
+        '-comments_count', 'pk'
+    ).first()
+    group = Group.objects.annotate(
+        total=Count('posts')
+    ).order_by('-total', 'pk').first()
+    stranger = User.objects.exclude(
+        pk__in=Follow.objects.filter(user=reader).values('author')
+    ).exclude(pk=reader.pk).order_by(
+        'counter__followers_count', 'pk'
+    ).first()
+    refresh = RefreshToken.for_user(reader)
+    return {
+        'reader': reader,
+        'author': author,
+        'post': post,
+        'comment': post.comments.order_by('pk').first(),
+        'comments_cursor': get_comments_page(post.pk).next_cursor,
+        'group': group,
+        'stranger': stranger,
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+        'word': WORDS[0],
+        'sync_cursor': max(changes.latest_cursor() - 2 * SYNC_TAIL, 0),
+    }
+
+
+def _follow_stranger(ctx):
+    Follow.objects.get_or_create(user=ctx['reader'], author=ctx['stranger'])
+
+
+def _unfollow_stranger(ctx):
+    Follow.objects.filter(
+        user=ctx['reader'], author=ctx['stranger']
+    ).delete()
+
+
+def _post_path(name, ctx):
+    return reverse(name, kwargs={'post_id': ctx['post'].pk})
+
+
+# Ключ маршрута -> (метод, клиент, путь, данные, подготовка).
+ROUTES = {
+    'posts:index': (
+        'get', 'guest', lambda ctx: reverse('posts:index'), None, None,
+    ),
+    'posts:group_list': (
+        'get', 'guest',
+        lambda ctx: reverse(
+            'posts:group_list', kwargs={'slug': ctx['group'].slug}
+        ),
+        None, None,
+    ),
+    'posts:profile': (
+        'get', 'guest',
+        lambda ctx: reverse(
+            'posts:profile', kwargs={'username': ctx['author'].username}
+        ),
+        None, None,
+    ),
+    'posts:post_detail': (
+        'get', 'guest', lambda ctx: _post_path('posts:post_detail', ctx),
+        None, None,
+    ),
+    'posts:post_edit': (
+        'get', 'author', lambda ctx: _post_path('posts:post_edit', ctx),
+        None, None,
+    ),
+    'posts:post_create': (
+        'get', 'reader', lambda ctx: reverse('posts:post_create'),
+        None, None,
+    ),
+    'posts:post_comments': (
+        'get', 'guest',
+        lambda ctx: _post_path('posts:post_comments', ctx) + (
+            f"?cursor={ctx['comments_cursor']}"
+            if ctx['comments_cursor'] else ''
+        ),
+        None, None,
+    ),
+    'posts:add_comment': (
+        'post', 'reader', lambda ctx: _post_path('posts:add_comment', ctx),
+        lambda ctx: {'text': 'Комментарий для замеров'}, None,
+    ),
+    'posts:follow_index': (
+        'get', 'reader', lambda ctx: reverse('posts:follow_index'),
+        None, None,
+    ),
+    'posts:search': (
+        'get', 'guest',
+        lambda ctx: (
+            f"{reverse('posts:search')}?{urlencode({'q': ctx['word']})}"
+        ),
+        None, None,
+    ),
+    'posts:profile_follow': (
+        'get', 'reader',
+        lambda ctx: reverse(
+            'posts:profile_follow',
+            kwargs={'username': ctx['stranger'].username},
+        ),
+        None, _unfollow_stranger,
+    ),
+    'posts:profile_unfollow': (
+        'get', 'reader',
+        lambda ctx: reverse(
+            'posts:profile_unfollow',
+            kwargs={'username': ctx['stranger'].username},
+        ),
+        None, _follow_stranger,
+    ),
+    'api:v1/auth/user-list': (
+        'get', 'api', lambda ctx: reverse('api:user-list'), None, None,
+    ),
+    'api:v1/auth/user-me': (
+        'get', 'api', lambda ctx: reverse('api:user-me'), None, None,
+    ),
+    'api:v1/auth/user-detail': (
+        'get', 'api',
+        lambda ctx: reverse(
+            'api:user-detail', kwargs={'id': ctx['reader'].pk}
+        ),
+        None, None,
+    ),
+    'api:v1/auth/api-root': (
+        'get', 'api', lambda ctx: '/api/v1/auth/', None, None,
+    ),
+    'api:v1/auth/jwt-create': (
+        'post', 'api_guest', lambda ctx: '/api/v1/auth/jwt/create/',
+        lambda ctx: {
+            'username': ctx['reader'].username, 'password': PASSWORD,
+        },
+        None,
+    ),
+    'api:v1/auth/jwt-refresh': (
+        'post', 'api_guest', lambda ctx: '/api/v1/auth/jwt/refresh/',
+        lambda ctx: {'refresh': ctx['refresh']}, None,
+    ),
+    'api:v1/auth/jwt-verify': (
+        'post', 'api_guest', lambda ctx: '/api/v1/auth/jwt/verify/',
+        lambda ctx: {'token': ctx['access']}, None,
+    ),
+    'api:v1/posts-list': (
+        'get', 'api', lambda ctx: '/api/v1/posts/?limit=10', None, None,
+    ),
+    'api:v1/posts-detail': (
+        'get', 'api', lambda ctx: f"/api/v1/posts/{ctx['post'].pk}/",
+        None, None,
+    ),
+    'api:v1/groups-list': (
+        'get', 'api', lambda ctx: '/api/v1/groups/', None, None,
+    ),
+    'api:v1/groups-detail': (
+        'get', 'api', lambda ctx: f"/api/v1/groups/{ctx['group'].pk}/",
+        None, None,
+    ),
+    'api:v1/comments-list': (
+        'get', 'api',
+        lambda ctx: f"/api/v1/posts/{ctx['post'].pk}/comments/",
+        None, None,
+    ),
+    'api:v1/comments-detail': (
+        'get', 'api',
+        lambda ctx: (
+            f"/api/v1/posts/{ctx['post'].pk}/comments/{ctx['comment'].pk}/"
+        ),
+        None, None,
+    ),
+    'api:v1/follow-list': (
+        'get', 'api', lambda ctx: '/api/v1/follow/', None, None,
+    ),
+    'api:v1/feed-list': (
+        'get', 'api', lambda ctx: '/api/v1/feed/?limit=10', None, None,
+    ),
+    'api:v1/api-root': (
+        'get', 'api', lambda ctx: '/api/v1/', None, None,
+    ),
+    'api:v1/posts-batch': (
+        'post', 'api', lambda ctx: '/api/v1/posts/batch/',
+        lambda ctx: [
+            {'text': f'Пост для замеров {number}'}
+            for number in range(BATCH_SIZE)
+        ],
+        None,
+    ),
+    'api:v1/comments-batch': (
+        'post', 'api',
+        lambda ctx: f"/api/v1/posts/{ctx['post'].pk}/comments/batch/",
+        lambda ctx: [
+            {'text': f'Комментарий для замеров {number}'}
+            for number in range(BATCH_SIZE)
+        ],
+        None,
+    ),
+    'api:v1/follow-batch': (
+        'post', 'api', lambda ctx: '/api/v1/follow/batch/',
+        lambda ctx: [{'following': ctx['stranger'].username}],
+        _unfollow_stranger,
+    ),
+    'api:v1/follow-unfollow': (
+        'post', 'api', lambda ctx: '/api/v1/follow/unfollow/',
+        lambda ctx: [{'following': ctx['stranger'].username}],
+        _follow_stranger,
+    ),
+    'api:sync': (
+        'get', 'api',
+        lambda ctx: f"/api/v1/sync/?cursor={ctx['sync_cursor']}",
+        None, None,
+    ),
+}
+
+
+def _walk(patterns, prefix=''):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _walk(
+                pattern.url_patterns, prefix + str(pattern.pattern)
+            )
+        elif '(?P<format>' not in str(pattern.pattern):
+            yield prefix, pattern
+
+
+def route_keys():
+    """Ключи всех маршрутов posts.urls и api.urls без суффиксов формата."""
+    keys = []
+    for app, urlconf in URLCONFS.items():
+        for prefix, pattern in _walk(get_resolver(urlconf).url_patterns):
+            if pattern.name is None:
+                keys.append(f'{app}:{prefix}{pattern.pattern}')
+            elif app == 'posts':
+                keys.append(f'{app}:{pattern.name}')
+            else:
+                keys.append(f'{app}:{prefix}{pattern.name}')
+    return keys
+
+
+def _clients(ctx):
+    reader = Client()
+    reader.force_login(ctx['reader'])
+    author = Client()
+    author.force_login(ctx['post'].author)
+    api = APIClient()
+    # Пакетные запросы передают массивы, их не закодировать в multipart.
+    api.default_format = 'json'
+    api.credentials(HTTP_AUTHORIZATION=f"Bearer {ctx['access']}")
+    return {
+        'guest': Client(),
+        'reader': reader,
+        'author': author,
+        'api': api,
+        'api_guest': APIClient(),
+    }
+
+
+def _percentile(samples, percent):
+    ordered = sorted(samples)
+    index = round(percent / 100 * (len(ordered) - 1))
+    return ordered[index]
+
+
+def measure(ctx, key, clients, repeat):
+    """Прогоняет маршрут repeat раз с холодным кешем страниц."""
+    method, client_name, path, data, prepare = ROUTES[key]
+    client = clients[client_name]
+    url = path(ctx)
+    payload = data(ctx) if data else None
+
+    def call():
+        if prepare:
+            prepare(ctx)
+        cache.clear()
+        started = time.perf_counter()
+        response = getattr(client, method)(url, payload)
+        return response, (time.perf_counter() - started) * 1000
+
+    if prepare:
+        prepare(ctx)
+    cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, payload)
+    # Журнал запросов очищается в начале каждого следующего запроса.
+    queries = len(context)
+    timings = [call()[1] for _ in range(repeat)]
+    tracemalloc.start()
+    try:
+        call()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'status': response.status_code,
+        'queries': queries,
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(_percentile(timings, 95), 2),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def run(ctx, repeat=20, keys=None):
+    clients = _clients(ctx)
+    return {
+        key: measure(ctx, key, clients, repeat)
+        for key in (keys or ROUTES)
+    }
+
+
+def uncovered_routes():
+    return sorted(set(route_keys()) - set(ROUTES) - SKIPPED)
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as baseline:
+        return json.load(baseline)
+
+
+def normalise(results):
+    """Замеры в долях эталонного маршрута, как в базовых замерах."""
+    reference = results[REFERENCE_ROUTE]
+    return {
+        key: {
+            'status': result['status'],
+            'queries': result['queries'],
+            'p50': round(result['p50_ms'] / reference['p50_ms'], 1),
+            'p95': round(result['p95_ms'] / reference['p50_ms'], 1),
+            'peak': round(result['peak_kb'] / reference['peak_kb'], 1),
+        }
+        for key, result in results.items()
+    }
+
+
+def save_baseline(path, results):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as baseline:
+        json.dump(normalise(results), baseline, indent=2, sort_keys=True)
+        baseline.write('\n')
+
+
+def compare(results, baseline,
+            metrics=('status', 'queries', *METRIC_TOLERANCE)):
+    """Список расхождений с базовыми замерами.
+
+    Число запросов должно совпадать: уменьшение тоже требует обновить
+    базовые замеры, иначе следующий рост до старого значения пройдёт.
+    """
+    if any(metric in METRIC_TOLERANCE for metric in metrics):
+        results = normalise(results)
+    problems = []
+    for key, current in sorted(results.items()):
+        expected = baseline.get(key)
+        if expected is None:
+            problems.append(f'{key}: нет в базовых замерах')
+            continue
+        if 'status' in metrics and current['status'] != expected['status']:
+            problems.append(
+                f"{key}: статус {current['status']} "
+                f"вместо {expected['status']}"
+            )
+        if 'queries' in metrics and current['queries'] != expected['queries']:
+            hint = (
+                '' if current['queries'] > expected['queries']
+                else ', обновите базовые замеры'
+            )
+            problems.append(
+                f"{key}: запросов {current['queries']} "
+                f"вместо {expected['queries']}{hint}"
+            )
+        for metric, (ratio, floor) in METRIC_TOLERANCE.items():
+            if metric not in metrics:
+                continue
+            limit = max(
+                expected[metric] * (1 + ratio), expected[metric] + floor
+            )
+            if current[metric] > limit:
+                problems.append(
+                    f'{key}: {metric} {current[metric]} '
+                    f'при базовом {expected[metric]}'
+                )
+    return problems
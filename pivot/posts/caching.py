@@ -0,0 +1,260 @@
+import hashlib
+import inspect
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+from core.routers import use_primary
+
+from .models import Group
+
+GLOBAL_SCOPE = 'global'
+# Входит в поколения любой страницы: меняется, когда производные данные
+# пересчитываются целиком (bulk.rebuild_denormalized).
+ALL_SCOPE = 'all'
+
+
+def group_scope(slug):
+    return f'group:{slug}'
+
+
+def author_scope(username):
+    return f'author:{username}'
+
+
+def post_scope(post_id):
+    return f'post:{post_id}'
+
+
+def follower_scope(user_id):
+    return f'follower:{user_id}'
+
+
+def _generation_key(scope):
+    return f'posts:generation:{scope}'
+
+
+def get_generations(scopes):
+    """Возвращает поколения областей, заводя недостающие.
+
+    Новое поколение берётся из текущего времени, поэтому вытесненный из
+    кеша счётчик не может вернуться к уже использованному значению.
+    """
+    keys = [_generation_key(scope) for scope in (*scopes, ALL_SCOPE)]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, time.time_ns(), None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+async def aget_generations(scopes):
+    keys = [_generation_key(scope) for scope in (*scopes, ALL_SCOPE)]
+    generations = await cache.aget_many(keys)
+    for key in keys:
+        if key not in generations:
+            await cache.aadd(key, time.time_ns(), None)
+            generations[key] = await cache.aget(key)
+    return [generations[key] for key in keys]
+
+
+def bump(*scopes):
+    """Инвалидирует все страницы, построенные по данным областей."""
+    now = time.time_ns()
+    cache.set_many(
+        {_generation_key(scope): now for scope in scopes},
+        None,
+    )
+
+
+def bump_post_scopes(post):
+    group_ids = {post.group_id, getattr(post, '_initial_group_id', None)}
+    group_ids.discard(None)
+    slugs = Group.objects.filter(pk__in=group_ids).values_list(
+        'slug', flat=True
+    )
+    bump(
+        GLOBAL_SCOPE,
+        post_scope(post.pk),
+        author_scope(post.author.username),
+        *(group_scope(slug) for slug in slugs),
+    )
+
+
+def page_generations(request, get_scopes, *args, **kwargs):
+    """Поколения областей страницы, один раз на запрос."""
+    if not hasattr(request, '_page_generations'):
+        scopes = get_scopes(*args, **kwargs)
+        request._page_generations = get_generations(scopes)
+    return request._page_generations
+
+
+async def apage_generations(request, get_scopes, *args, **kwargs):
+    """page_generations для асинхронных представлений.
+
+    get_scopes может быть и корутиной, если областям нужна база.
+    """
+    if not hasattr(request, '_page_generations'):
+        scopes = get_scopes(*args, **kwargs)
+        if inspect.isawaitable(scopes):
+            scopes = await scopes
+        request._page_generations = await aget_generations(scopes)
+    return request._page_generations
+
+
+async def aload_user(request):
+    """Загружает request.user вне цикла событий.
+
+    Ленивый пользователь ходит в сессию и базу синхронно, а в Django 4.2
+    у запроса ещё нет auser().
+    """
+    await sync_to_async(lambda: request.user.pk)()
+    return request.user
+
+
+def validators(request, generations, *extra):
+    """ETag по поколениям областей, адресу и пользователю.
+
+    Для вошедшего пользователя в ETag входит и CSRF-cookie: вход и выход
+    меняют токен, и закешированная браузером страница с формой не должна
+    отправлять устаревший csrfmiddlewaretoken. Last-Modified не отдаётся:
+    с точностью до секунды он не различает изменения внутри одной секунды
+    и дал бы ложный 304.
+    """
+    parts = [request.get_full_path(), request.user.pk, *extra, *generations]
+    if request.user.is_authenticated:
+        parts.append(request.COOKIES.get(settings.CSRF_COOKIE_NAME))
+    etag = hashlib.md5('|'.join(map(str, parts)).encode()).hexdigest()
+    return quote_etag(etag)
+
+
+def not_modified(request, etag):
+    """Ответ 304 или None, если у клиента устаревшая копия."""
+    return get_conditional_response(request, etag=etag)
+
+
+def set_validators(response, etag):
+    if response.status_code == 200:
+        response.headers.setdefault('ETag', etag)
+    return response
+
+
+def conditional_page(get_scopes):
+    """Отвечает 304 на If-None-Match без отрисовки.
+
+    Валидаторы строятся из поколений тех же областей, что и в
+    cache_anonymous, поэтому запросов к базе не требуют. Страница под
+    этими поколениями (и в кеше анонимных страниц) строится по основной
+    базе: отстающая реплика закрепила бы старые данные под новым ETag
+    до следующего изменения.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view(request, *args, **kwargs)
+                await aload_user(request)
+                etag = validators(
+                    request,
+                    await apage_generations(
+                        request, get_scopes, *args, **kwargs
+                    ),
+                )
+                response = not_modified(request, etag)
+                if response is None:
+                    with use_primary():
+                        response = await view(request, *args, **kwargs)
+                return set_validators(response, etag)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            etag = validators(
+                request,
+                page_generations(request, get_scopes, *args, **kwargs),
+            )
+            response = not_modified(request, etag)
+            if response is None:
+                with use_primary():
+                    response = view(request, *args, **kwargs)
+            return set_validators(response, etag)
+        return wrapper
+    return decorator
+
+
+def _page_key(request, view, generations):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    generations = '.'.join(map(str, generations))
+    return f'posts:page:{view.__name__}:{path}:{generations}'
+
+
+def cache_anonymous(get_scopes):
+    """Кеширует страницу для анонимных пользователей.
+
+    get_scopes получает аргументы представления и возвращает области,
+    от которых зависит страница. Ключ кеша включает их поколения, так
+    что изменение данных сразу делает старые записи недостижимыми.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                user = await aload_user(request)
+                if request.method != 'GET' or user.is_authenticated:
+                    return await view(request, *args, **kwargs)
+                key = _page_key(request, view, await apage_generations(
+                    request, get_scopes, *args, **kwargs
+                ))
+                cached = await cache.aget(key)
+                if cached is not None:
+                    content, content_type = cached
+                    return HttpResponse(content, content_type=content_type)
+                response = await view(request, *args, **kwargs)
+                if response.status_code == 200:
+                    await cache.aset(
+                        key,
+                        (response.content, response['Content-Type']),
+                        settings.POSTS_PAGE_CACHE_TIMEOUT,
+                    )
+                return response
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            key = _page_key(request, view, page_generations(
+                request, get_scopes, *args, **kwargs
+            ))
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(
+                    key,
+                    (response.content, response['Content-Type']),
+                    settings.POSTS_PAGE_CACHE_TIMEOUT,
+                )
+            return response
+        return wrapper
+    return decorator
+
+
+def cached_page(get_scopes):
+    """conditional_page и cache_anonymous с общими областями."""
+    def decorator(view):
+        return conditional_page(get_scopes)(cache_anonymous(get_scopes)(view))
+    return decorator
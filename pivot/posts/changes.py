@@ -0,0 +1,71 @@
+"""Журнал изменений постов и комментариев для синхронизации клиентов.
+
+Сигналы пишут в Change строку на каждое создание, правку и удаление, а
+id строки служит клиенту монотонным курсором: SQLite выдаёт
+AUTOINCREMENT-ключи по порядку записи и не использует их повторно.
+Клиент запрашивает изменения после своего курсора и получает только
+их, а не страницы ленты целиком. Старые строки удаляет prune; клиенту,
+чей курсор старше оставшегося журнала, нужна полная синхронизация.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Change
+
+
+class CursorExpired(Exception):
+    """Часть изменений после курсора уже удалена из журнала."""
+
+
+def record(kind, object_ids, deleted=False):
+    Change.objects.bulk_create(
+        Change(kind=kind, object_id=object_id, deleted=deleted)
+        for object_id in object_ids
+    )
+
+
+def latest_cursor():
+    return Change.objects.aggregate(latest=Max('id'))['latest'] or 0
+
+
+def changes_since(cursor, limit):
+    """Изменения после cursor, не больше limit строк журнала.
+
+    Возвращает словарь {(вид, id записи): удалена ли}, где несколько
+    правок одной записи схлопнуты в последнюю, новый курсор и признак
+    того, что в журнале есть ещё изменения.
+    """
+    oldest = Change.objects.order_by('id').values_list(
+        'id', flat=True
+    ).first()
+    if oldest is not None and cursor < oldest - 1:
+        raise CursorExpired
+    rows = list(
+        Change.objects.filter(id__gt=cursor).order_by('id').values_list(
+            'id', 'kind', 'object_id', 'deleted'
+        )[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    latest = {}
+    for _, kind, object_id, deleted in rows:
+        latest[kind, object_id] = deleted
+    return latest, rows[-1][0] if rows else cursor, has_more
+
+
+def prune(days=None, now=None):
+    """Удаляет строки старше CHANGE_LOG_RETENTION_DAYS дней.
+
+    Последняя строка остаётся всегда: по ней changes_since отличает
+    устаревший курсор от пустого журнала.
+    """
+    if days is None:
+        days = settings.CHANGE_LOG_RETENTION_DAYS
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    deleted, _ = Change.objects.filter(
+        created__lt=cutoff, id__lt=latest_cursor()
+    ).delete()
+    return deleted
@@ -0,0 +1,89 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Follow, Post, UserCounter
+
+User = get_user_model()
+
+
+def _count_subquery(queryset, field):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')}).order_by().values(
+                field
+            ).annotate(total=Count('pk')).values('total')
+        ),
+        Value(0),
+    )
+
+
+USER_COUNTERS = {
+    'posts_count': (Post.objects.all(), 'author'),
+    'followers_count': (Follow.objects.all(), 'author'),
+    'following_count': (Follow.objects.all(), 'user'),
+}
+
+
+def recount_user(user_id):
+    """Пересчитывает счётчики пользователя агрегатными запросами."""
+    counts = User.objects.filter(pk=user_id).annotate(**{
+        name: _count_subquery(queryset, field)
+        for name, (queryset, field) in USER_COUNTERS.items()
+    }).values(*USER_COUNTERS).first()
+    if counts is None:
+        return None
+    counter, _ = UserCounter.objects.update_or_create(
+        user_id=user_id, defaults=counts
+    )
+    return counter
+
+
+def get_user_counter(user):
+    try:
+        return user.counter
+    except UserCounter.DoesNotExist:
+        return recount_user(user.pk)
+
+
+def change_user_counter(user_id, field, delta):
+    updated = UserCounter.objects.filter(user_id=user_id).update(
+        **{field: F(field) + delta}
+    )
+    if not updated and delta > 0:
+        # Строки ещё нет: пересчёт уже учитывает только что
+        # сохранённый объект.
+        recount_user(user_id)
+
+
+def change_comments_count(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comments_count=F('comments_count') + delta
+    )
+
+
+def reconcile():
+    """Исправляет расхождения счётчиков и возвращает их число по полям."""
+    UserCounter.objects.bulk_create(
+        (UserCounter(user_id=pk)
+         for pk in User.objects.values_list('pk', flat=True).iterator()),
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+    drift = {}
+    for name, (queryset, field) in USER_COUNTERS.items():
+        actual = _count_subquery(queryset, field)
+        drifted = UserCounter.objects.annotate(actual=actual).exclude(
+            **{name: F('actual')}
+        )
+        drift[name] = drifted.count()
+        if drift[name]:
+            UserCounter.objects.update(**{name: actual})
+    actual = _count_subquery(Comment.objects.all(), 'post')
+    drifted = Post.objects.annotate(actual=actual).exclude(
+        comments_count=F('actual')
+    )
+    drift['comments_count'] = drifted.count()
+    if drift['comments_count']:
+        Post.objects.update(comments_count=actual)
+    return drift
@@ -0,0 +1,126 @@
+"""Конкурентные чтения и запись комментариев на файловой базе SQLite.
+
+Каждый профиль из SQLITE_PROFILES получает свежую базу во временном
+файле: тестовая база SQLite по умолчанию живёт в памяти, а блокировки
+и журнал WAL проявляются только на диске.
+"""
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import (
+    DEFAULT_DB_ALIAS, OperationalError, connection, connections,
+)
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from posts import benchmark
+
+
+def _worker(ctx, operations, write_share, seed, cookie):
+    client = Client()
+    client.cookies[settings.SESSION_COOKIE_NAME] = cookie
+    rng = random.Random(seed)
+    reads, writes, errors = [], [], 0
+    detail = reverse('posts:post_detail', kwargs={'post_id': ctx['post'].pk})
+    comment = reverse('posts:add_comment', kwargs={
+        'post_id': ctx['post'].pk,
+    })
+    try:
+        for number in range(operations):
+            write = rng.random() < write_share
+            started = time.perf_counter()
+            try:
+                if write:
+                    client.post(comment, {'text': f'Комментарий {number}'})
+                else:
+                    client.get(detail)
+            except OperationalError:
+                errors += 1
+                continue
+            elapsed = (time.perf_counter() - started) * 1000
+            (writes if write else reads).append(elapsed)
+    finally:
+        connections.close_all()
+    return reads, writes, errors
+
+
+def _percentile(samples, percent):
+    if not samples:
+        return 0.0
+    return benchmark._percentile(samples, percent)
+
+
+def measure(ctx, workers, operations, write_share):
+    """Запускает workers потоков по operations запросов в каждом."""
+    client = Client()
+    client.force_login(ctx['reader'])
+    cookie = client.cookies[settings.SESSION_COOKIE_NAME].value
+    # Потоки не должны делить соединение основного потока.
+    connection.close()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        started = time.perf_counter()
+        results = list(pool.map(
+            lambda seed: _worker(
+                ctx, operations, write_share, seed, cookie
+            ),
+            range(workers),
+        ))
+        elapsed = time.perf_counter() - started
+    reads = [ms for result in results for ms in result[0]]
+    writes = [ms for result in results for ms in result[1]]
+    return {
+        'requests_per_s': round((len(reads) + len(writes)) / elapsed, 1),
+        'reads': len(reads),
+        'writes': len(writes),
+        'errors': sum(result[2] for result in results),
+        'read_p50_ms': round(statistics.median(reads or [0]), 2),
+        'read_p95_ms': round(_percentile(reads, 95), 2),
+        'write_p50_ms': round(statistics.median(writes or [0]), 2),
+        'write_p95_ms': round(_percentile(writes, 95), 2),
+    }
+
+
+def _set_conn_max_age(value):
+    # Соединения потоков создаются из этих словарей.
+    connections.settings[DEFAULT_DB_ALIAS]['CONN_MAX_AGE'] = value
+    connection.settings_dict['CONN_MAX_AGE'] = value
+
+
+def run_profile(profile, seed_options, workers=16, operations=50,
+                write_share=0.3):
+    """Замер профиля SQLITE_PROFILES[profile] на новой базе в файле."""
+    options = settings.SQLITE_PROFILES[profile]
+    directory = tempfile.mkdtemp()
+    test_settings = connection.settings_dict['TEST']
+    old_test_name = test_settings.get('NAME')
+    old_conn_max_age = connection.settings_dict['CONN_MAX_AGE']
+    test_settings['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+    connections.close_all()
+    with override_settings(SQLITE_PRAGMAS=options['PRAGMAS']):
+        _set_conn_max_age(options['CONN_MAX_AGE'])
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True
+        )
+        try:
+            benchmark.seed(**seed_options)
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                journal_mode = cursor.fetchone()[0]
+            result = measure(
+                benchmark.build_context(), workers, operations, write_share
+            )
+            result['journal_mode'] = journal_mode
+            return result
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            _set_conn_max_age(old_conn_max_age)
+            test_settings['NAME'] = old_test_name
+            shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.db.models import Q
+
+from .models import FeedEntry, Follow, Post, UserCounter
+
+FEED_BATCH_SIZE = 500
+
+
+def fanout_limit():
+    return getattr(settings, 'FEED_FANOUT_FOLLOWERS_LIMIT', 1000)
+
+
+def backfill_size():
+    return getattr(settings, 'FEED_BACKFILL_SIZE', 200)
+
+
+def followers_count(author_id):
+    count = UserCounter.objects.filter(user_id=author_id).values_list(
+        'followers_count', flat=True
+    ).first()
+    return count or 0
+
+
+def is_popular(author_id):
+    """Популярным авторам посты в ленты не раскладываются."""
+    return followers_count(author_id) >= fanout_limit()
+
+
+def _create_entries(entries):
+    FeedEntry.objects.bulk_create(
+        entries,
+        batch_size=FEED_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def fan_out_post(post):
+    """Раскладывает новый пост по лентам подписчиков автора."""
+    if is_popular(post.author_id):
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    _create_entries(
+        FeedEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+        for user_id in followers.iterator()
+    )
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту подписчика последние посты автора."""
+    posts = Post.objects.filter(
+        author_id=author_id
+    ).values_list('pk', 'pub_date')[:backfill_size()]
+    _create_entries(
+        FeedEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+        for post_id, pub_date in posts
+    )
+
+
+def on_follow(follow):
+    if not is_popular(follow.author_id):
+        backfill(follow.user_id, follow.author_id)
+
+
+def on_unfollow(follow):
+    FeedEntry.objects.filter(
+        user_id=follow.user_id,
+        post__author_id=follow.author_id,
+    ).delete()
+    if followers_count(follow.author_id) == fanout_limit() - 1:
+        # Автор перестал быть популярным: его посты снова раскладываются
+        # при записи, поэтому дозаполняем ленты всех подписчиков.
+        followers = Follow.objects.filter(
+            author_id=follow.author_id
+        ).values_list('user_id', flat=True)
+        for user_id in followers.iterator():
+            backfill(user_id, follow.author_id)
+
+
+def popular_authors(user):
+    return Follow.objects.filter(
+        user=user,
+        author__counter__followers_count__gte=fanout_limit(),
+    ).values_list('author_id', flat=True)
+
+
+def _feed_queryset(user, popular):
+    if not popular:
+        return Post.objects.filter(feed_entries__user=user).order_by(
+            '-feed_entries__pub_date', '-feed_entries__post_id'
+        )
+    entries = FeedEntry.objects.filter(user=user).values('post_id')
+    return Post.objects.filter(
+        Q(pk__in=entries) | Q(author_id__in=popular)
+    ).order_by('-pub_date', '-pk')
+
+
+def get_feed(user):
+    """Посты ленты подписок пользователя, от новых к старым."""
+    return _feed_queryset(user, list(popular_authors(user)))
+
+
+async def aget_feed(user):
+    return _feed_queryset(
+        user, [author_id async for author_id in popular_authors(user)]
+    )
+
+
+def rebuild_feeds():
+    """Полностью перестраивает ленты по текущим подпискам."""
+    FeedEntry.objects.all().delete()
+    follows = Follow.objects.values_list('user_id', 'author_id')
+    for user_id, author_id in follows.iterator():
+        if not is_popular(author_id):
+            backfill(user_id, author_id)
@@ -0,0 +1,155 @@
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image
+
+from . import changes
+from .caching import bump_post_scopes
+from .models import Change, Post
+from .renditions import build_renditions, downscale
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.POST_IMAGE_WORKERS,
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _executor
+
+
+def rendition_args(name):
+    return (
+        str(settings.MEDIA_ROOT),
+        name,
+        settings.POST_IMAGE_RENDITION_WIDTHS,
+        settings.POST_IMAGE_RENDITION_FORMATS,
+    )
+
+
+def store_renditions(post_id, name, renditions):
+    updated = Post.objects.filter(pk=post_id, image=name).update(
+        renditions=renditions
+    )
+    if updated:
+        bump_post_scopes(
+            Post.objects.select_related('author').get(pk=post_id)
+        )
+        changes.record(Change.POST, [post_id])
+    else:
+        # Картинку успели заменить или пост удалён: копии не нужны.
+        delete_rendition_files(renditions)
+
+
+def _delete_files(names):
+    for name in names:
+        default_storage.delete(name)
+
+
+def delete_rendition_files(renditions):
+    """Удаляет файлы копий после фиксации транзакции."""
+    names = [name for files in renditions.values() for name in files.values()]
+    if names:
+        transaction.on_commit(partial(_delete_files, names))
+
+
+def reset_renditions(post):
+    """Сбрасывает копии прежней картинки поста и удаляет их файлы.
+
+    Копии читаются из базы: в загруженном раньше объекте их может ещё
+    не быть.
+    """
+    post.renditions = {}
+    renditions = Post.objects.filter(pk=post.pk).values_list(
+        'renditions', flat=True
+    ).first()
+    if renditions:
+        Post.objects.filter(pk=post.pk).update(renditions={})
+        delete_rendition_files(renditions)
+
+
+def _renditions_done(post_id, name, future):
+    # Вызывается в служебном потоке пула: соединение с БД своё.
+    try:
+        store_renditions(post_id, name, future.result())
+    except Exception:
+        logger.exception('Could not build renditions for %s', name)
+    finally:
+        close_old_connections()
+
+
+def build_now(post_id, name):
+    store_renditions(post_id, name, build_renditions(*rendition_args(name)))
+
+
+def enqueue(post_id, name):
+    if not settings.POST_IMAGE_RENDITIONS_ASYNC:
+        build_now(post_id, name)
+        return
+    future = get_executor().submit(build_renditions, *rendition_args(name))
+    future.add_done_callback(partial(_renditions_done, post_id, name))
+
+
+def schedule_renditions(post):
+    """Ставит картинку поста в очередь после фиксации транзакции."""
+    transaction.on_commit(partial(enqueue, post.pk, post.image.name))
+
+
+def rendition_urls(renditions):
+    return {
+        width: {
+            extension: default_storage.url(name)
+            for extension, name in files.items()
+        }
+        for width, files in renditions.items()
+    }
+
+
+def downscale_upload(file):
+    """Уменьшает загруженную картинку в процессе пула и ждёт результата.
+
+    Картинка декодируется только в воркере, поэтому память процесса,
+    обрабатывающего запрос, не растёт вместе с её разрешением.
+    """
+    on_disk = hasattr(file, 'temporary_file_path')
+    with tempfile.TemporaryDirectory() as directory:
+        target = os.path.join(directory, 'target')
+        if on_disk:
+            source = file.temporary_file_path()
+        else:
+            source = os.path.join(directory, 'source')
+            with open(source, 'wb') as destination:
+                for chunk in file.chunks():
+                    destination.write(chunk)
+        args = (source, target, settings.POST_IMAGE_MAX_DIMENSION)
+        if settings.POST_IMAGE_RENDITIONS_ASYNC:
+            image_format = get_executor().submit(downscale, *args).result(
+                timeout=settings.POST_IMAGE_DOWNSCALE_TIMEOUT
+            )
+        else:
+            image_format = downscale(*args)
+        if on_disk:
+            # Перезаписываем тот же файл: открытый дескриптор загрузки
+            # увидит новое содержимое.
+            shutil.copyfile(target, source)
+        else:
+            with open(target, 'rb') as result:
+                file.file = BytesIO(result.read())
+        file.size = os.path.getsize(target)
+    file.content_type = Image.MIME[image_format]
+    file.seek(0)
+    return file
@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from posts import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет запросы, задержку и память всех маршрутов posts и api '
+        'на синтетических данных во временной базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--comments', type=int, default=100_000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Подписок на пользователя до удаления повторов.',
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--baseline', default=str(settings.BENCHMARK_BASELINE),
+        )
+        parser.add_argument(
+            '--update-baseline',
+            action='store_true',
+            help='Записать результаты как новые базовые замеры.',
+        )
+
+    def handle(self, *args, **options):
+        # Как у тестового раннера: без отладки и debug_toolbar.
+        environment = override_settings(
+            DEBUG=False,
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        )
+        environment.enable()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True
+        )
+        try:
+            self.stdout.write('Наполнение базы...')
+            benchmark.seed(
+                users=options['users'],
+                posts=options['posts'],
+                groups=options['groups'],
+                follows=options['follows'],
+                comments=options['comments'],
+                random_seed=options['seed'],
+            )
+            results = benchmark.run(
+                benchmark.build_context(), repeat=options['repeat']
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            environment.disable()
+        for key, result in results.items():
+            self.stdout.write(
+                f"{key:<32} {result['status']} "
+                f"запросов {result['queries']:>3} "
+                f"p50 {result['p50_ms']:>8.2f} мс "
+                f"p95 {result['p95_ms']:>8.2f} мс "
+                f"память {result['peak_kb']:>9.1f} КБ"
+            )
+        path = options['baseline']
+        if options['update_baseline']:
+            benchmark.save_baseline(path, results)
+            self.stdout.write(self.style.SUCCESS(f'Записано в {path}'))
+            return
+        try:
+            baseline = benchmark.load_baseline(path)
+        except FileNotFoundError:
+            raise CommandError(f'Нет базовых замеров: {path}')
+        problems = [
+            f'{key}: маршрут не замеряется'
+            for key in benchmark.uncovered_routes()
+        ]
+        problems.extend(benchmark.compare(results, baseline))
+        if problems:
+            for problem in problems:
+                self.stderr.write(problem)
+            raise CommandError(f'Регрессий: {len(problems)}')
+        self.stdout.write(self.style.SUCCESS('Регрессий нет'))
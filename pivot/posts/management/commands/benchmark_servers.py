@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+from posts import benchmark, server_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность WSGI и ASGI на чтениях лент '
+        'во временной базе с синтетическими данными.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2_000)
+        parser.add_argument('--posts', type=int, default=20_000)
+        parser.add_argument('--comments', type=int, default=20_000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--follows', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--requests', type=int, default=2000,
+            help='Запросов на каждый замер.',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, nargs='+', default=[1, 16, 64],
+        )
+
+    def handle(self, *args, **options):
+        environment = override_settings(
+            DEBUG=False,
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        )
+        environment.enable()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True
+        )
+        try:
+            self.stdout.write('Наполнение базы...')
+            benchmark.seed(
+                users=options['users'],
+                posts=options['posts'],
+                groups=options['groups'],
+                follows=options['follows'],
+                comments=options['comments'],
+                random_seed=options['seed'],
+            )
+            results = server_benchmark.run(
+                benchmark.build_context(),
+                total=options['requests'],
+                concurrency=options['concurrency'],
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            environment.disable()
+        for (interface, level), (rps, statuses) in results.items():
+            codes = ', '.join(
+                f'{status}: {count}'
+                for status, count in sorted(statuses.items())
+            )
+            self.stdout.write(
+                f'{interface:<5} параллельно {level:>4} '
+                f'{rps:>9.1f} запросов/с  ({codes})'
+            )
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from posts import db_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает профили SQLITE_PROFILES под конкурентными чтениями '
+        'страницы поста и записью комментариев из многих потоков.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiles', nargs='+', default=list(settings.SQLITE_PROFILES),
+        )
+        parser.add_argument('--workers', type=int, default=16)
+        parser.add_argument(
+            '--operations', type=int, default=50,
+            help='Запросов на поток.',
+        )
+        parser.add_argument(
+            '--write-share', type=float, default=0.3,
+            help='Доля запросов, добавляющих комментарий.',
+        )
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--posts', type=int, default=5_000)
+        parser.add_argument('--comments', type=int, default=5_000)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        seed_options = {
+            'users': options['users'],
+            'posts': options['posts'],
+            'groups': 10,
+            'follows': 10,
+            'comments': options['comments'],
+            'random_seed': options['seed'],
+        }
+        environment = override_settings(
+            DEBUG=False,
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        )
+        environment.enable()
+        try:
+            for profile in options['profiles']:
+                self.stdout.write(f'Профиль {profile}...')
+                result = db_benchmark.run_profile(
+                    profile,
+                    seed_options,
+                    workers=options['workers'],
+                    operations=options['operations'],
+                    write_share=options['write_share'],
+                )
+                self.stdout.write(
+                    f"  журнал {result['journal_mode']}, "
+                    f"{result['requests_per_s']} запросов/с, "
+                    f"чтений {result['reads']}, записей {result['writes']}, "
+                    f"ошибок {result['errors']}\n"
+                    f"  чтение p50 {result['read_p50_ms']} мс "
+                    f"p95 {result['read_p95_ms']} мс; "
+                    f"запись p50 {result['write_p50_ms']} мс "
+                    f"p95 {result['write_p95_ms']} мс"
+                )
+        finally:
+            environment.disable()
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from posts.images import build_now
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Строит уменьшенные копии картинок постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Перестроить копии и для постов, у которых они уже есть.',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='')
+        if not options['all']:
+            posts = posts.filter(renditions={})
+        built = 0
+        for post_id, name in posts.values_list('pk', 'image').iterator():
+            try:
+                build_now(post_id, name)
+            except OSError as error:
+                self.stderr.write(f'{name}: {error}')
+                continue
+            built += 1
+        self.stdout.write(self.style.SUCCESS(f'Обработано картинок: {built}'))
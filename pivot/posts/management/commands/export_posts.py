@@ -0,0 +1,37 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from posts import bulk
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты, комментарии или подписки в NDJSON или CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind', choices=tuple(bulk.FIELDS), default='posts',
+        )
+        parser.add_argument(
+            '--format', choices=bulk.FORMATS, default='ndjson',
+        )
+        parser.add_argument(
+            '--output', default='-', help='Файл или - для stdout.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        records = bulk.export_records(
+            options['kind'], chunk_size=options['chunk_size']
+        )
+        if options['output'] == '-':
+            bulk.write_records(
+                sys.stdout, options['format'], options['kind'], records
+            )
+            return
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as stream:
+            bulk.write_records(
+                stream, options['format'], options['kind'], records
+            )
+        self.stderr.write(f"Записано в {options['output']}")
@@ -0,0 +1,74 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from posts import bulk, caching
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает посты, комментарии или подписки из NDJSON или CSV '
+        'пачками без сигналов и пересчитывает производные данные.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл или - для stdin.')
+        parser.add_argument(
+            '--kind', choices=tuple(bulk.FIELDS), default='posts',
+        )
+        parser.add_argument(
+            '--format', choices=bulk.FORMATS,
+            help='По умолчанию определяется по расширению файла.',
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument(
+            '--no-rebuild',
+            action='store_true',
+            help=(
+                'Не пересчитывать счётчики, ленты и индекс: удобно при '
+                'загрузке нескольких файлов подряд.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or (
+            'csv' if Path(path).suffix.lower() == '.csv' else 'ndjson'
+        )
+        stream = (
+            sys.stdin if path == '-'
+            else open(path, encoding='utf-8', newline='')
+        )
+
+        def progress(loaded, rate):
+            self.stdout.write(f'Загружено {loaded} ({rate:.0f} строк/с)')
+
+        try:
+            loaded, scopes = bulk.import_records(
+                options['kind'],
+                bulk.read_records(stream, fmt),
+                batch_size=options['batch_size'],
+                progress=progress,
+            )
+        except (KeyError, ValueError, IntegrityError) as error:
+            raise CommandError(f'Ошибка в данных: {error!r}')
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        if options['no_rebuild']:
+            # Новые строки видны сразу, производные данные - после пересчёта.
+            caching.bump(*scopes)
+            self.stdout.write(
+                'Производные данные не пересчитаны: выполните загрузку '
+                'последнего файла без --no-rebuild.'
+            )
+        else:
+            self.stdout.write('Пересчёт счётчиков, лент и поиска...')
+            bulk.rebuild_denormalized()
+        if options['kind'] == 'posts':
+            self.stdout.write(
+                'Копии картинок строит manage.py build_renditions.'
+            )
+        self.stdout.write(self.style.SUCCESS(f'Загружено строк: {loaded}'))
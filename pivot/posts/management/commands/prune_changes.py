@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from posts.changes import prune
+
+
+class Command(BaseCommand):
+    help = 'Удаляет устаревшие строки журнала изменений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Сколько дней хранить строки (CHANGE_LOG_RETENTION_DAYS).',
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune(options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Удалено строк: {deleted}'))
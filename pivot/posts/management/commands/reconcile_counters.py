@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованные счётчики постов и подписок.'
+
+    def handle(self, *args, **options):
+        drift = reconcile()
+        for field, count in drift.items():
+            self.stdout.write(f'{field}: исправлено записей {count}')
+        self.stdout.write(self.style.SUCCESS('Счётчики сверены'))
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.3 on 2026-10-17 06:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_feeds(apps, schema_editor):
+    """Заполняет ленты по тем же правилам, что и feed.rebuild_feeds.
+
+    Посты авторов с FEED_FANOUT_FOLLOWERS_LIMIT подписчиками и больше
+    не раскладываются, остальным в ленту идут последние
+    FEED_BACKFILL_SIZE постов автора.
+    """
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    FeedEntry = apps.get_model('posts', 'FeedEntry')
+    fanout_limit = getattr(settings, 'FEED_FANOUT_FOLLOWERS_LIMIT', 1000)
+    backfill_size = getattr(settings, 'FEED_BACKFILL_SIZE', 200)
+    popular = set(
+        Follow.objects.order_by().values('author_id').annotate(
+            followers=models.Count('pk')
+        ).filter(followers__gte=fanout_limit).values_list(
+            'author_id', flat=True
+        )
+    )
+    for follow in Follow.objects.iterator():
+        if follow.author_id in popular:
+            continue
+        posts = Post.objects.filter(
+            author_id=follow.author_id
+        ).order_by('-pub_date').values_list('pk', 'pub_date')
+        FeedEntry.objects.bulk_create(
+            [
+                FeedEntry(
+                    user_id=follow.user_id,
+                    post_id=post_id,
+                    pub_date=pub_date,
+                )
+                for post_id, pub_date in posts[:backfill_size]
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата создания поста')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to='posts.post', verbose_name='Пост')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to=settings.AUTH_USER_MODEL, verbose_name='Подписчик')),
+            ],
+            options={
+                'verbose_name': 'Запись ленты',
+                'verbose_name_plural': 'Записи ленты',
+                'ordering': ['-pub_date', '-post_id'],
+                'indexes': [models.Index(fields=['user', '-pub_date', '-post'], name='feed_user_pub_date_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='feedentry',
+            constraint=models.UniqueConstraint(fields=('user', 'post'), name='unique_feed_entry'),
+        ),
+        migrations.RunPython(fill_feeds, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.3 on 2026-10-17 06:14
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Post = apps.get_model('posts', 'Post')
+    UserCounter = apps.get_model('posts', 'UserCounter')
+    users = User.objects.annotate(
+        posts_total=Count('posts', distinct=True),
+        followers_total=Count('following', distinct=True),
+        following_total=Count('follower', distinct=True),
+    )
+    UserCounter.objects.bulk_create(
+        [
+            UserCounter(
+                user_id=user.pk,
+                posts_count=user.posts_total,
+                followers_count=user.followers_total,
+                following_count=user.following_total,
+            )
+            for user in users
+        ],
+        batch_size=500,
+    )
+    posts = Post.objects.annotate(comments_total=Count('comments'))
+    for post in posts.filter(comments_total__gt=0):
+        Post.objects.filter(pk=post.pk).update(
+            comments_count=post.comments_total
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0003_post_pub_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counter', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('posts_count', models.IntegerField(default=0, verbose_name='Число постов')),
+                ('followers_count', models.IntegerField(default=0, verbose_name='Число подписчиков')),
+                ('following_count', models.IntegerField(default=0, verbose_name='Число подписок')),
+            ],
+            options={
+                'verbose_name': 'Счётчики пользователя',
+                'verbose_name_plural': 'Счётчики пользователей',
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Число комментариев'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.3 on 2026-10-17 06:22
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_follows(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    UserCounter = apps.get_model('posts', 'UserCounter')
+    duplicates = (
+        Follow.objects.values('user', 'author')
+        .annotate(first_id=Min('id'), total=Count('id'))
+        .filter(total__gt=1)
+    )
+    for duplicate in duplicates:
+        Follow.objects.filter(
+            user=duplicate['user'], author=duplicate['author'],
+        ).exclude(pk=duplicate['first_id']).delete()
+        UserCounter.objects.filter(pk=duplicate['author']).update(
+            followers_count=Follow.objects.filter(
+                author=duplicate['author']
+            ).count()
+        )
+        UserCounter.objects.filter(pk=duplicate['user']).update(
+            following_count=Follow.objects.filter(
+                user=duplicate['user']
+            ).count()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_post_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'pub_date'], name='comment_post_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-pub_date'], name='post_author_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', '-pub_date'], name='post_group_pub_date_idx'),
+        ),
+        migrations.RunPython(
+            remove_duplicate_follows, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(fields=('user', 'author'), name='unique_follow'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.3 on 2026-10-17 07:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('post', 'Пост'), ('comment', 'Комментарий')], max_length=16, verbose_name='Вид записи')),
+                ('object_id', models.BigIntegerField(verbose_name='id записи')),
+                ('deleted', models.BooleanField(default=False, verbose_name='Удалена')),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Время изменения')),
+            ],
+            options={
+                'verbose_name': 'Изменение',
+                'verbose_name_plural': 'Журнал изменений',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
 
 User = get_user_model()
 
@@ -23,6 +24,23 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    def with_feed_relations(self):
+        """Всё, что нужно для вывода поста в ленте, одним запросом."""
+        fields = [
+            'text',
+            'pub_date',
+            'image',
+            'renditions',
+            'author__username',
+            'author__first_name',
+            'author__last_name',
+            'group__title',
+            'group__slug',
+        ]
+        return self.select_related('author', 'group').only(*fields)
+
+
 class Post(PublicationDateModel):
     text = models.TextField(
         verbose_name='Текст поста',
@@ -49,14 +67,81 @@ class Post(PublicationDateModel):
         upload_to='posts/',
         blank=True,
     )
+    renditions = models.JSONField(
+        'Уменьшенные копии картинки',
+        default=dict,
+        blank=True,
+        editable=False,
+    )
+    comments_count = models.IntegerField(
+        'Число комментариев',
+        default=0,
+        editable=False,
+    )
+
+    objects = PostQuerySet.as_manager()
+
+    # Поля, которые меняются только точечными update(): счётчик и копии
+    # картинки, которые сохраняет воркер. Полный save() объекта,
+    # загруженного раньше, не должен затирать их старыми значениями.
+    UPDATE_ONLY_FIELDS = ('comments_count', 'renditions')
 
     def __str__(self):
         return self.text[:15]
 
+    def save(self, *args, **kwargs):
+        if (
+            not args
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+            and not self._state.adding
+        ):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name not in self.UPDATE_ONLY_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def image_sources(self):
+        """srcset для каждого формата и ссылка на самую крупную копию."""
+        if not self.renditions:
+            return None
+        widths = sorted(self.renditions, key=int)
+        sources = {
+            extension: ', '.join(
+                f'{default_storage.url(self.renditions[width][extension])} '
+                f'{width}w'
+                for width in widths
+            )
+            for extension in self.renditions[widths[0]]
+        }
+        sources['src'] = default_storage.url(
+            self.renditions[widths[-1]]['jpeg']
+        )
+        return sources
+
     class Meta:
         ordering = ['-pub_date']
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        indexes = [
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='post_pub_date_id_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=('group', '-pub_date'),
+                name='post_group_pub_date_idx',
+            ),
+        ]
 
 
 class Comment(PublicationDateModel):
@@ -86,6 +171,12 @@ class Comment(PublicationDateModel):
         ordering = ['pub_date']
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=('post', 'pub_date'),
+                name='comment_post_pub_date_idx',
+            ),
+        ]
 
 
 class Follow(models.Model):
@@ -101,3 +192,91 @@ class Follow(models.Model):
         on_delete=models.CASCADE,
         related_name='following',
     )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'author'),
+                name='unique_follow',
+            ),
+        ]
+
+
+class FeedEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Подписчик',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Пост',
+    )
+    pub_date = models.DateTimeField('Дата создания поста')
+
+    class Meta:
+        ordering = ['-pub_date', '-post_id']
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'post'),
+                name='unique_feed_entry',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=('user', '-pub_date', '-post'),
+                name='feed_user_pub_date_idx',
+            ),
+        ]
+
+
+class UserCounter(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='counter',
+        verbose_name='Пользователь',
+    )
+    posts_count = models.IntegerField('Число постов', default=0)
+    followers_count = models.IntegerField('Число подписчиков', default=0)
+    following_count = models.IntegerField('Число подписок', default=0)
+
+    class Meta:
+        verbose_name = 'Счётчики пользователя'
+        verbose_name_plural = 'Счётчики пользователей'
+
+    def __str__(self):
+        return str(self.user_id)
+
+
+class Change(models.Model):
+    """Строка журнала изменений постов и комментариев (posts.changes)."""
+    POST = 'post'
+    COMMENT = 'comment'
+    KINDS = [
+        (POST, 'Пост'),
+        (COMMENT, 'Комментарий'),
+    ]
+
+    kind = models.CharField('Вид записи', max_length=16, choices=KINDS)
+    object_id = models.BigIntegerField('id записи')
+    deleted = models.BooleanField('Удалена', default=False)
+    created = models.DateTimeField(
+        'Время изменения',
+        auto_now_add=True,
+        db_index=True,
+    )
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Изменение'
+        verbose_name_plural = 'Журнал изменений'
+
+    def __str__(self):
+        return f'{self.kind} {self.object_id}'
@@ -0,0 +1,139 @@
+import base64
+import binascii
+import hashlib
+from collections.abc import Sequence
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+def encode_cursor(direction, pub_date, pk):
+    raw = f'{direction}|{pub_date.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Возвращает (направление, дата, pk) или None для битого курсора."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        direction, pub_date, pk = raw.split('|')
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if direction not in (NEXT, PREVIOUS) or pub_date is None:
+        return None
+    return direction, pub_date, pk
+
+
+def approximate_count(queryset):
+    """Число объектов, закешированное на COUNT_CACHE_TIMEOUT секунд."""
+    key = 'posts:count:' + hashlib.md5(
+        str(queryset.query).encode()
+    ).hexdigest()
+    return cache.get_or_set(
+        key,
+        queryset.count,
+        getattr(settings, 'COUNT_CACHE_TIMEOUT', 60),
+    )
+
+
+class KeysetPage(Sequence):
+    is_keyset = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None,
+                 approximate_count=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.approximate_count = approximate_count
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Постраничный вывод по ключу (pub_date, id) без COUNT и OFFSET.
+
+    Страницы идут от новых объектов к старым, если не задан
+    ascending=True.
+    """
+
+    def __init__(self, queryset, per_page, ascending=False,
+                 with_count=False):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ascending = ascending
+        self.with_count = with_count
+
+    def _ordered(self, forward):
+        if forward != self.ascending:
+            return self.queryset.order_by('-pub_date', '-pk')
+        return self.queryset.order_by('pub_date', 'pk')
+
+    def _after(self, queryset, pub_date, pk, forward):
+        if forward != self.ascending:
+            return queryset.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+            )
+        return queryset.filter(
+            Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+        )
+
+    def _query(self, cursor):
+        position = decode_cursor(cursor) if cursor else None
+        forward = position is None or position[0] == NEXT
+        queryset = self._ordered(forward)
+        if position is not None:
+            queryset = self._after(queryset, *position[1:], forward)
+        return queryset[:self.per_page + 1], position, forward
+
+    def _page(self, objects, position, forward, count):
+        has_more = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+        if not forward:
+            objects.reverse()
+
+        next_cursor = previous_cursor = None
+        if objects:
+            first, last = objects[0], objects[-1]
+            if has_more or not forward:
+                next_cursor = encode_cursor(NEXT, last.pub_date, last.pk)
+            if (has_more and not forward) or (forward and position):
+                previous_cursor = encode_cursor(
+                    PREVIOUS, first.pub_date, first.pk
+                )
+        return KeysetPage(objects, next_cursor, previous_cursor, count)
+
+    def get_page(self, cursor=None):
+        queryset, position, forward = self._query(cursor)
+        objects = list(queryset)
+        count = approximate_count(self.queryset) if self.with_count else None
+        return self._page(objects, position, forward, count)
+
+    async def aget_page(self, cursor=None):
+        queryset, position, forward = self._query(cursor)
+        objects = [obj async for obj in queryset]
+        count = None
+        if self.with_count:
+            count = await sync_to_async(approximate_count)(self.queryset)
+        return self._page(objects, position, forward, count)
@@ -0,0 +1,61 @@
+"""Построение уменьшенных копий картинок.
+
+Модуль не зависит от Django: его функции выполняются в отдельных
+процессах пула.
+"""
+import os
+
+from PIL import Image
+
+FORMATS = {
+    'webp': 'WEBP',
+    'jpeg': 'JPEG',
+}
+QUALITY = 80
+
+
+def rendition_name(name, width, extension):
+    stem, _ = os.path.splitext(name)
+    return f'renditions/{stem}_{width}.{extension}'
+
+
+def build_renditions(media_root, name, widths, extensions):
+    """Сохраняет копии картинки name каждой ширины в каждом формате.
+
+    Возвращает словарь {ширина: {расширение: имя файла в MEDIA_ROOT}}.
+    """
+    renditions = {}
+    with Image.open(os.path.join(media_root, name)) as image:
+        largest = max(widths)
+        # Для JPEG декодер сразу уменьшает картинку в 2-8 раз.
+        image.draft('RGB', (largest, largest))
+        image = image.convert('RGB')
+        for width in sorted(widths):
+            copy = image.copy()
+            copy.thumbnail((width, image.height), Image.LANCZOS)
+            renditions[str(width)] = {}
+            for extension in extensions:
+                target = rendition_name(name, width, extension)
+                path = os.path.join(media_root, target)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                copy.save(path, FORMATS[extension], quality=QUALITY)
+                renditions[str(width)][extension] = target
+    return renditions
+
+
+def downscale(source, target, max_dimension):
+    """Уменьшает картинку так, чтобы её стороны не превышали max_dimension.
+
+    Формат сохраняется, если Pillow умеет в него писать, иначе JPEG.
+    Возвращает формат сохранённого файла.
+    """
+    with Image.open(source) as image:
+        image_format = image.format
+        image.draft(image.mode, (max_dimension, max_dimension))
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+        if image_format not in Image.SAVE:
+            image_format = 'JPEG'
+        if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        image.save(target, image_format, quality=QUALITY)
+    return image_format
@@ -0,0 +1,117 @@
+"""Полнотекстовый поиск по постам.
+
+На SQLite используется индекс FTS5 posts_post_fts, который обновляется
+сигналами при сохранении и удалении постов. На других СУБД поиск
+деградирует до icontains.
+"""
+import base64
+import binascii
+import re
+
+from django.db import connection
+
+from .models import Post
+from .pagination import KeysetPage, KeysetPaginator
+
+FTS_TABLE = 'posts_post_fts'
+TOKEN_RE = re.compile(r'\w+')
+
+
+def fts_enabled():
+    return connection.vendor == 'sqlite'
+
+
+def build_match(query):
+    """Превращает пользовательский запрос в безопасное выражение MATCH.
+
+    Все слова обязательны, последнее ищется как префикс.
+    """
+    tokens = TOKEN_RE.findall(query)
+    if not tokens:
+        return ''
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def index_post(post):
+    if fts_enabled():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT OR REPLACE INTO {FTS_TABLE}(rowid, text) '
+                'VALUES (%s, %s)',
+                [post.pk, post.text],
+            )
+
+
+def unindex_post(post_id):
+    if fts_enabled():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id]
+            )
+
+
+def rebuild_index():
+    if fts_enabled():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE}(rowid, text) '
+                'SELECT id, text FROM posts_post'
+            )
+
+
+def encode_search_cursor(score, pk):
+    raw = f'{score!r}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_search_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        score, pk = base64.urlsafe_b64decode(padded).decode().split('|')
+        return float(score), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def _ranked_ids(match, position, limit):
+    sql = (
+        f'SELECT rowid, score FROM (SELECT rowid, bm25({FTS_TABLE}) AS '
+        f'score FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)'
+    )
+    params = [match]
+    if position is not None:
+        sql += ' WHERE score > %s OR (score = %s AND rowid > %s)'
+        params += [position[0], position[0], position[1]]
+    sql += ' ORDER BY score, rowid LIMIT %s'
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def search_posts(query, cursor=None, per_page=10):
+    """Страница результатов поиска, от более релевантных к менее."""
+    if not fts_enabled():
+        posts = Post.objects.with_feed_relations().filter(
+            text__icontains=query.strip()
+        )
+        return KeysetPaginator(posts, per_page).get_page(cursor)
+    match = build_match(query)
+    if not match:
+        return KeysetPage([])
+    position = decode_search_cursor(cursor) if cursor else None
+    rows = _ranked_ids(match, position, per_page + 1)
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_search_cursor(rows[-1][1], rows[-1][0])
+    posts = Post.objects.with_feed_relations().in_bulk(
+        [pk for pk, _ in rows]
+    )
+    return KeysetPage(
+        [posts[pk] for pk, _ in rows if pk in posts],
+        next_cursor=next_cursor,
+    )
@@ -0,0 +1,177 @@
+"""Пропускная способность WSGI и ASGI на одном наборе запросов.
+
+Сервера в окружении нет, поэтому обработчики Django вызываются прямо в
+процессе: WSGIHandler - из пула потоков, как у gunicorn с потоками,
+ASGIHandler - из одного цикла событий, как у uvicorn. Сеть и разбор
+HTTP не входят в замер, сравнивается только сам Django.
+"""
+import asyncio
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import Client
+from django.test.client import FakePayload
+from django.test.utils import override_settings
+from django.urls import reverse
+
+URLCONFS = {'wsgi': 'pivot.urls', 'asgi': 'pivot.asgi_urls'}
+
+
+def workload(ctx):
+    """Чтения, ради которых есть асинхронные представления.
+
+    Возвращает пары (путь с запросом, cookie); у читателя своя сессия,
+    поэтому его страницы идут мимо кеша страниц.
+    """
+    client = Client()
+    client.force_login(ctx['reader'])
+    session = client.cookies[settings.SESSION_COOKIE_NAME]
+    reader = f'{settings.SESSION_COOKIE_NAME}={session.value}'
+    author = {'username': ctx['author'].username}
+    return [
+        (reverse('posts:index'), ''),
+        (reverse('posts:index') + '?page=3', ''),
+        (reverse('posts:profile', kwargs=author), ''),
+        (reverse('posts:post_detail', kwargs={'post_id': ctx['post'].pk}),
+         ''),
+        (reverse('posts:group_list', kwargs={'slug': ctx['group'].slug}),
+         ''),
+        ('/api/v1/posts/?limit=20&offset=40', ''),
+        (reverse('posts:index'), reader),
+        (reverse('posts:profile', kwargs=author), reader),
+        (reverse('posts:follow_index'), reader),
+    ]
+
+
+def _split(path):
+    path, _, query = path.partition('?')
+    accept = 'application/json' if path.startswith('/api/') else '*/*'
+    return path, query, accept
+
+
+def _wsgi_call(handler, path, cookie):
+    path, query, accept = _split(path)
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SCRIPT_NAME': '',
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': '127.0.0.1',
+        'HTTP_ACCEPT': accept,
+        'HTTP_COOKIE': cookie,
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': FakePayload(b''),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    statuses = []
+    response = handler(environ, lambda status, headers: statuses.append(
+        int(status.split()[0])
+    ))
+    try:
+        for _ in response:
+            pass
+    finally:
+        response.close()
+    return statuses[0]
+
+
+async def _asgi_call(handler, path, cookie):
+    path, query, accept = _split(path)
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'query_string': query.encode(),
+        'headers': [
+            (b'host', b'testserver'),
+            (b'accept', accept.encode()),
+            (b'cookie', cookie.encode()),
+        ],
+        'client': ('127.0.0.1', 0),
+        'server': ('testserver', 80),
+    }
+    received = asyncio.Event()
+    statuses = []
+
+    async def receive():
+        if received.is_set():
+            # Клиент не отключается, пока обработчик не ответит.
+            await asyncio.Future()
+        received.set()
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    await handler(scope, receive, send)
+    return statuses[0]
+
+
+def wsgi_throughput(requests, concurrency):
+    handler = WSGIHandler()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        started = time.perf_counter()
+        statuses = list(pool.map(
+            lambda request: _wsgi_call(handler, *request), requests
+        ))
+        elapsed = time.perf_counter() - started
+    return len(requests) / elapsed, Counter(statuses)
+
+
+def asgi_throughput(requests, concurrency):
+    handler = ASGIHandler()
+    limit = asyncio.Semaphore(concurrency)
+
+    async def call(request):
+        async with limit:
+            return await _asgi_call(handler, *request)
+
+    async def main():
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*map(call, requests))
+        return time.perf_counter() - started, statuses
+
+    elapsed, statuses = asyncio.run(main())
+    return len(requests) / elapsed, Counter(statuses)
+
+
+THROUGHPUT = {'wsgi': wsgi_throughput, 'asgi': asgi_throughput}
+
+
+def run(ctx, total=2000, concurrency=(1, 16, 64)):
+    """Запросы в секунду для каждого интерфейса и уровня параллельности.
+
+    Возвращает {(интерфейс, параллельность): (rps, статусы ответов)}.
+    """
+    paths = workload(ctx)
+    requests = [paths[index % len(paths)] for index in range(total)]
+    # Панель отладки только синхронная и под ASGI гоняла бы каждый
+    # запрос через поток.
+    middleware = [
+        name for name in settings.MIDDLEWARE
+        if not name.startswith('debug_toolbar.')
+    ]
+    results = {}
+    for interface, urlconf in URLCONFS.items():
+        with override_settings(ROOT_URLCONF=urlconf, MIDDLEWARE=middleware):
+            for level in concurrency:
+                results[interface, level] = THROUGHPUT[interface](
+                    requests, level
+                )
+    return results
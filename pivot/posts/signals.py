@@ -0,0 +1,159 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete,
+)
+from django.dispatch import receiver
+
+from . import caching, changes, counters, feed, images, search
+from .caching import bump_post_scopes
+from .models import Change, Comment, Follow, Group, Post, UserCounter
+
+User = get_user_model()
+
+# Поля пользователя, которые выводятся на страницах и в API.
+DISPLAYED_USER_FIELDS = ('username', 'first_name', 'last_name')
+
+
+def displayed_names(user):
+    return tuple(user.__dict__.get(field) for field in DISPLAYED_USER_FIELDS)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, update_fields=None,
+               **kwargs):
+    if raw:
+        return
+    if created:
+        UserCounter.objects.get_or_create(user=instance)
+    elif update_fields is None or set(update_fields) != {'last_login'}:
+        scopes = [
+            caching.GLOBAL_SCOPE, caching.author_scope(instance.username)
+        ]
+        if displayed_names(instance) != instance._initial_names:
+            # Имя видно и в группах, и под чужими постами с комментариями.
+            slugs = Group.objects.filter(posts__author=instance).values_list(
+                'slug', flat=True
+            ).distinct()
+            post_ids = Post.objects.filter(
+                comments__author=instance
+            ).values_list('pk', flat=True).distinct()
+            scopes.extend(caching.group_scope(slug) for slug in slugs)
+            scopes.extend(caching.post_scope(pk) for pk in post_ids)
+        caching.bump(*scopes)
+        if instance.username != instance._initial_username:
+            # Имя автора входит в вывод его постов и комментариев.
+            changes.record(Change.POST, instance.posts.values_list(
+                'pk', flat=True
+            ))
+            changes.record(Change.COMMENT, instance.comments.values_list(
+                'pk', flat=True
+            ))
+    instance._initial_username = instance.username
+    instance._initial_names = displayed_names(instance)
+
+
+@receiver(post_init, sender=User)
+def user_initialized(sender, instance, **kwargs):
+    instance._initial_username = instance.__dict__.get('username')
+    instance._initial_names = displayed_names(instance)
+
+
+@receiver(post_init, sender=Post)
+def post_initialized(sender, instance, **kwargs):
+    # Читаем из __dict__, чтобы не загружать отложенные поля.
+    instance._initial_group_id = instance.__dict__.get('group_id')
+    image = instance.__dict__.get('image')
+    instance._initial_image_name = getattr(image, 'name', image) or ''
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.change_user_counter(instance.author_id, 'posts_count', 1)
+        feed.fan_out_post(instance)
+    search.index_post(instance)
+    bump_post_scopes(instance)
+    changes.record(Change.POST, [instance.pk])
+    instance._initial_group_id = instance.group_id
+    if instance.image.name != instance._initial_image_name:
+        if not created:
+            images.reset_renditions(instance)
+        if instance.image:
+            images.schedule_renditions(instance)
+    instance._initial_image_name = instance.image.name or ''
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.change_user_counter(instance.author_id, 'posts_count', -1)
+    search.unindex_post(instance.pk)
+    bump_post_scopes(instance)
+    changes.record(Change.POST, [instance.pk], deleted=True)
+    images.delete_rendition_files(instance.renditions)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.change_comments_count(instance.post_id, 1)
+    caching.bump(caching.post_scope(instance.post_id))
+    changes.record(Change.COMMENT, [instance.pk])
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.change_comments_count(instance.post_id, -1)
+    caching.bump(caching.post_scope(instance.post_id))
+    changes.record(Change.COMMENT, [instance.pk], deleted=True)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        counters.change_user_counter(
+            instance.author_id, 'followers_count', 1
+        )
+        counters.change_user_counter(instance.user_id, 'following_count', 1)
+        feed.on_follow(instance)
+    caching.bump(
+        caching.author_scope(instance.author.username),
+        caching.follower_scope(instance.user_id),
+    )
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.change_user_counter(instance.author_id, 'followers_count', -1)
+    counters.change_user_counter(instance.user_id, 'following_count', -1)
+    feed.on_unfollow(instance)
+    caching.bump(
+        caching.author_scope(instance.author.username),
+        caching.follower_scope(instance.user_id),
+    )
+
+
+def group_post_scopes(group):
+    """Области страниц постов группы и их авторов: там видна группа."""
+    scopes = set()
+    for pk, username in group.posts.values_list('pk', 'author__username'):
+        scopes.add(caching.post_scope(pk))
+        scopes.add(caching.author_scope(username))
+    return scopes
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    scopes = getattr(instance, '_post_scopes', None)
+    if scopes is None:
+        scopes = group_post_scopes(instance)
+    caching.bump(
+        caching.GLOBAL_SCOPE, caching.group_scope(instance.slug), *scopes
+    )
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleting(sender, instance, **kwargs):
+    # SET_NULL снимет группу с постов через update() без сигналов.
+    instance._post_scopes = group_post_scopes(instance)
+    changes.record(Change.POST, instance.posts.values_list('pk', flat=True))
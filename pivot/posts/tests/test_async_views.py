@@ -0,0 +1,116 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import AsyncClient, Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Follow, Post
+# Модули, а не классы: иначе загрузчик второй раз запустит их тесты
+# отсюда.
+from posts.tests import test_comment_pages, test_conditional, test_views
+
+User = get_user_model()
+
+ASGI_URLS = override_settings(ROOT_URLCONF='pivot.asgi_urls')
+
+
+@ASGI_URLS
+class AsyncPostsViewTests(test_views.PostsViewTests):
+    """Те же проверки страниц для асинхронных представлений."""
+
+
+@ASGI_URLS
+class AsyncCommentPagesTests(test_comment_pages.CommentPagesTests):
+    pass
+
+
+@ASGI_URLS
+class AsyncConditionalGetTests(test_conditional.ConditionalGetTests):
+    pass
+
+
+@ASGI_URLS
+class AsgiHandlerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        Post.objects.bulk_create(
+            Post(text=f'Post number {number}', author=cls.author)
+            for number in range(12)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_views_are_async(self):
+        client = Client()
+        for name in ('index', 'profile', 'follow_index'):
+            with self.subTest(name=name):
+                kwargs = {'username': 'author'} if name == 'profile' else {}
+                match = client.get(reverse(f'posts:{name}', kwargs=kwargs))
+                self.assertEqual(
+                    match.resolver_match.func.__module__,
+                    'posts.async_views',
+                )
+        match = client.get('/api/v1/posts/').resolver_match
+        self.assertEqual(match.func.__module__, 'api.async_views')
+
+    async def test_pages_through_asgi_handler(self):
+        client = AsyncClient()
+        await sync_to_async(client.force_login)(self.reader)
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:index') + '?page=2',
+            reverse('posts:profile', kwargs={'username': 'author'}),
+            reverse('posts:follow_index'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = await client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('Server-Timing', response)
+        response = await client.get(reverse('posts:profile', kwargs={
+            'username': 'author',
+        }))
+        self.assertTrue(response.context['following'])
+
+    async def test_follow_index_redirects_anonymous(self):
+        response = await AsyncClient().get(reverse('posts:follow_index'))
+        self.assertRedirects(
+            response, '/auth/login/?next=/follow/',
+            fetch_redirect_response=False,
+        )
+
+    async def test_api_list_matches_viewset(self):
+        client = AsyncClient()
+        url = '/api/v1/posts/?limit=5&offset=5'
+        response = await client.get(url)
+        with self.settings(ROOT_URLCONF='pivot.urls'):
+            expected = await client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), expected.json())
+        self.assertEqual(
+            response['ETag'], expected['ETag'],
+            'Async and DRF lists should share validators',
+        )
+        response = await client.get(
+            url, headers={'If-None-Match': response['ETag']}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_api_list_without_limit(self):
+        response = await AsyncClient().get('/api/v1/posts/')
+        self.assertEqual(len(response.json()), 12)
+
+    async def test_api_list_falls_back_to_viewset(self):
+        response = await AsyncClient().post(
+            '/api/v1/posts/', {'text': 'New'}
+        )
+        self.assertEqual(response.status_code, 401)
+        response = await AsyncClient().get(
+            '/api/v1/posts/', headers={'Accept': 'text/html'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/html; charset=utf-8')
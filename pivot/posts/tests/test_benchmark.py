@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.test import TestCase, TransactionTestCase
+
+from posts import benchmark, server_benchmark
+
+
+class BenchmarkBaselineTests(TestCase):
+    def test_every_route_is_measured(self):
+        self.assertEqual(
+            benchmark.uncovered_routes(), [], 'Routes without a benchmark'
+        )
+
+    def test_compare_reports_regressions(self):
+        baseline = {
+            'posts:index': {
+                'status': 200, 'queries': 2, 'p50': 5.0, 'p95': 8.0,
+                'peak': 3.0,
+            },
+            benchmark.REFERENCE_ROUTE: {
+                'status': 200, 'queries': 1, 'p50': 1.0, 'p95': 1.5,
+                'peak': 1.0,
+            },
+        }
+        # Машина вдвое медленнее: доли от эталона не меняются.
+        results = {
+            'posts:index': {
+                'status': 200, 'queries': 3, 'p50_ms': 10.0,
+                'p95_ms': 40.0, 'peak_kb': 300.0,
+            },
+            benchmark.REFERENCE_ROUTE: {
+                'status': 200, 'queries': 0, 'p50_ms': 2.0,
+                'p95_ms': 3.0, 'peak_kb': 100.0,
+            },
+        }
+        problems = benchmark.compare(results, baseline)
+        self.assertEqual(len(problems), 3, problems)
+        self.assertIn('запросов 0 вместо 1, обновите', problems[0])
+        self.assertIn('запросов 3 вместо 2', problems[1])
+        self.assertTrue(problems[2].startswith('posts:index: p95 20.0'))
+
+    def test_baseline_has_no_absolute_timings(self):
+        baseline = benchmark.load_baseline(settings.BENCHMARK_BASELINE)
+        for key, expected in baseline.items():
+            with self.subTest(key=key):
+                self.assertEqual(
+                    set(expected),
+                    {'status', 'queries', *benchmark.METRIC_TOLERANCE},
+                )
+
+
+class BaselineQueriesTests(TransactionTestCase):
+    """Число запросов маршрутов совпадает с базовыми замерами.
+
+    Без транзакции теста, как в команде benchmark: иначе BEGIN и COMMIT
+    пишущих маршрутов не попадают в счёт.
+    """
+
+    def test_query_counts_match_baseline(self):
+        benchmark.seed(
+            users=40, posts=300, groups=3, follows=5, comments=200
+        )
+        results = benchmark.run(benchmark.build_context(), repeat=1)
+        baseline = benchmark.load_baseline(settings.BENCHMARK_BASELINE)
+        self.assertEqual(
+            benchmark.compare(results, baseline, ('status', 'queries')),
+            [],
+            'Benchmark regressions',
+        )
+
+
+class ServerBenchmarkTests(TransactionTestCase):
+    """Обработчики обоих интерфейсов отвечают на всю нагрузку без ошибок."""
+
+    def test_wsgi_and_asgi_serve_workload(self):
+        benchmark.seed(users=20, posts=100, groups=2, follows=3, comments=50)
+        results = server_benchmark.run(
+            benchmark.build_context(), total=36, concurrency=(1, 4)
+        )
+        self.assertEqual(
+            set(results), {(interface, level)
+                           for interface in ('wsgi', 'asgi')
+                           for level in (1, 4)},
+        )
+        for key, (rps, statuses) in results.items():
+            with self.subTest(key=key):
+                self.assertGreater(rps, 0)
+                self.assertEqual(statuses, {200: 36}, 'Unexpected statuses')
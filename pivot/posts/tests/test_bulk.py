@@ -0,0 +1,163 @@
+import io
+import shutil
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from posts import bulk
+from posts.models import (
+    Comment, FeedEntry, Follow, Group, Post, UserCounter,
+)
+from posts.search import search_posts
+
+User = get_user_model()
+
+
+class BulkImportExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = Path(tempfile.mkdtemp())
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.author = User.objects.create(username='author')
+        self.reader = User.objects.create(username='reader')
+        group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        self.post = Post.objects.create(
+            text='Котики и собаки', author=self.author, group=group
+        )
+        Post.objects.filter(pk=self.post.pk).update(
+            pub_date=datetime(2020, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc)
+        )
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий'
+        )
+        Follow.objects.create(user=self.reader, author=self.author)
+
+    def export(self, kind, fmt):
+        path = self.directory / f'{kind}.{fmt}'
+        call_command(
+            'export_posts', kind=kind, format=fmt, output=str(path),
+            stderr=io.StringIO(),
+        )
+        return path
+
+    def assert_round_trip(self, fmt):
+        paths = [
+            self.export(kind, fmt)
+            for kind in ('posts', 'comments', 'follows')
+        ]
+        pub_date = Post.objects.get().pub_date
+        Post.objects.all().delete()
+        Follow.objects.all().delete()
+        Group.objects.all().delete()
+        for path, kind in zip(paths, ('posts', 'comments', 'follows')):
+            call_command(
+                'import_posts', str(path), kind=kind, stdout=io.StringIO(),
+            )
+        post = Post.objects.select_related('group').get()
+        self.assertEqual(post.pk, self.post.pk)
+        self.assertEqual(post.pub_date, pub_date)
+        self.assertEqual(post.group.slug, 'group')
+        self.assertEqual(post.comments_count, 1)
+        counter = UserCounter.objects.get(user=self.author)
+        self.assertEqual(counter.followers_count, 1)
+        self.assertEqual(counter.posts_count, 1)
+        self.assertTrue(
+            FeedEntry.objects.filter(user=self.reader, post=post).exists()
+        )
+        self.assertEqual(list(search_posts('котики')), [post])
+
+    def test_ndjson_round_trip(self):
+        self.assert_round_trip('ndjson')
+
+    def test_csv_round_trip(self):
+        self.assert_round_trip('csv')
+
+    def test_follow_import_invalidates_follower_api_lists(self):
+        other = User.objects.create(username='other')
+        Post.objects.create(text='Пост другого автора', author=other)
+        client = APIClient()
+        client.force_authenticate(self.reader)
+        urls = ['/api/v1/follow/', '/api/v1/feed/?limit=10']
+        etags = [client.get(url)['ETag'] for url in urls]
+        path = self.directory / 'new_follows.ndjson'
+        path.write_text('{"user": "reader", "author": "other"}\n')
+        call_command('import_posts', str(path), kind='follows',
+                     stdout=io.StringIO())
+        for url, etag in zip(urls, etags):
+            with self.subTest(url=url):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200,
+                                 'Imported follows should change the ETag')
+
+    def test_import_keeps_auto_now_add_for_other_saves(self):
+        field = Post._meta.get_field('pub_date')
+        created = []
+
+        def progress(done, rate):
+            self.assertTrue(field.auto_now_add)
+            created.append(
+                Post.objects.create(text='Рядом', author=self.author)
+            )
+
+        old = '2001-02-03T04:05:06+00:00'
+        bulk.import_records('posts', [
+            {'author': 'author', 'text': 'Старый', 'pub_date': old},
+        ], progress=progress)
+        self.assertEqual(Post.objects.get(text='Старый').pub_date.isoformat(),
+                         old)
+        created[0].refresh_from_db()
+        self.assertGreater(created[0].pub_date.year, 2001)
+
+    def test_rebuild_invalidates_pages_of_earlier_no_rebuild_runs(self):
+        paths = []
+        for name in ('first', 'second'):
+            path = self.directory / f'{name}.ndjson'
+            path.write_text(
+                f'{{"author": "{name}", "text": "Пост {name}"}}\n'
+            )
+            paths.append(path)
+        call_command('import_posts', str(paths[0]), no_rebuild=True,
+                     stdout=io.StringIO())
+        url = reverse('posts:profile', kwargs={'username': 'first'})
+        etag = self.client.get(url)['ETag']
+        call_command('import_posts', str(paths[1]), stdout=io.StringIO())
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200,
+                         'Final rebuild should refresh earlier imports')
+        self.assertEqual(response.context['posts_number'], 1)
+
+    def test_import_creates_missing_users_and_reports_progress(self):
+        records = [
+            {'author': f'legacy{number % 3}', 'text': f'Пост {number}'}
+            for number in range(5)
+        ]
+        calls = []
+        loaded, scopes = bulk.import_records(
+            'posts', records, batch_size=2,
+            progress=lambda done, rate: calls.append(done),
+        )
+        self.assertEqual(loaded, 5)
+        self.assertEqual(calls, [2, 4, 5])
+        self.assertEqual(
+            User.objects.filter(username__startswith='legacy').count(), 3
+        )
+        self.assertIn('author:legacy1', scopes)
+        # Сигналы не вызывались: индекс обновит rebuild_denormalized.
+        self.assertEqual(len(search_posts('Пост')), 0)
+        bulk.rebuild_denormalized()
+        self.assertEqual(len(search_posts('Пост')), 5)
@@ -0,0 +1,114 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from posts import bulk, changes
+from posts.models import Change, Comment, Group, Post
+
+User = get_user_model()
+
+
+class ChangeLogTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='',
+        )
+        cls.post = Post.objects.create(
+            text='Text', author=cls.author, group=cls.group,
+        )
+
+    def since(self, cursor, limit=100):
+        return changes.changes_since(cursor, limit)
+
+    def test_signals_record_creates_edits_and_deletes(self):
+        cursor = changes.latest_cursor()
+        comment = Comment.objects.create(
+            text='Comment', author=self.author, post=self.post,
+        )
+        comment_id = comment.pk
+        self.post.text = 'Edited'
+        self.post.save()
+        comment.delete()
+        latest, new_cursor, has_more = self.since(cursor)
+        self.assertEqual(latest, {
+            (Change.COMMENT, comment_id): True,
+            (Change.POST, self.post.pk): False,
+        })
+        self.assertEqual(new_cursor, changes.latest_cursor())
+        self.assertFalse(has_more)
+
+    def test_post_delete_records_comment_tombstones(self):
+        comment = Comment.objects.create(
+            text='Comment', author=self.author, post=self.post,
+        )
+        cursor = changes.latest_cursor()
+        post_id = self.post.pk
+        self.post.delete()
+        self.assertEqual(self.since(cursor)[0], {
+            (Change.COMMENT, comment.pk): True,
+            (Change.POST, post_id): True,
+        })
+
+    def test_group_delete_and_author_rename_touch_posts(self):
+        cursor = changes.latest_cursor()
+        self.group.delete()
+        self.assertEqual(self.since(cursor)[0],
+                         {(Change.POST, self.post.pk): False})
+        cursor = changes.latest_cursor()
+        self.author.save()
+        self.assertEqual(self.since(cursor)[0], {},
+                         'Saving without a rename should not touch posts')
+        self.author.username = 'renamed'
+        self.author.save()
+        self.assertEqual(self.since(cursor)[0],
+                         {(Change.POST, self.post.pk): False})
+
+    def test_limit_and_has_more(self):
+        cursor = changes.latest_cursor()
+        for number in range(3):
+            Post.objects.create(text=f'Post {number}', author=self.author)
+        latest, cursor, has_more = self.since(cursor, limit=2)
+        self.assertEqual(len(latest), 2)
+        self.assertTrue(has_more)
+        latest, cursor, has_more = self.since(cursor, limit=2)
+        self.assertEqual(len(latest), 1)
+        self.assertFalse(has_more)
+        self.assertEqual(self.since(cursor), ({}, cursor, False))
+
+    def test_prune_keeps_latest_row_and_expires_old_cursors(self):
+        Post.objects.create(text='Second', author=self.author)
+        latest = changes.latest_cursor()
+        Change.objects.update(created=timezone.now() - timedelta(days=40))
+        out = StringIO()
+        call_command('prune_changes', stdout=out)
+        self.assertIn(f'Удалено строк: {latest - 1}', out.getvalue())
+        self.assertEqual(
+            list(Change.objects.values_list('id', flat=True)), [latest]
+        )
+        self.assertEqual(self.since(latest - 1)[0],
+                         {(Change.POST, Post.objects.first().pk): False})
+        with self.assertRaises(changes.CursorExpired):
+            self.since(latest - 2)
+
+    def test_prune_respects_retention(self):
+        Post.objects.create(text='Second', author=self.author)
+        self.assertEqual(changes.prune(), 0)
+        total = Change.objects.count()
+        self.assertEqual(
+            changes.prune(now=timezone.now() + timedelta(days=31)), total - 1
+        )
+
+    def test_bulk_import_records_changes(self):
+        cursor = changes.latest_cursor()
+        loaded, _ = bulk.import_records('posts', [
+            {'author': 'author', 'group': '', 'text': 'Imported'},
+        ])
+        post = Post.objects.get(text='Imported')
+        self.assertEqual(self.since(cursor)[0],
+                         {(Change.POST, post.pk): False})
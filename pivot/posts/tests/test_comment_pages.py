@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from posts.models import Comment, Post
+from posts.views import COMMENTS_PER_PAGE
+
+User = get_user_model()
+
+
+class CommentPagesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.post = Post.objects.create(text='Пост', author=cls.author)
+        for number in range(COMMENTS_PER_PAGE + 5):
+            commenter = User.objects.create(username=f'commenter{number}')
+            Comment.objects.create(
+                post=cls.post, author=commenter, text=f'Комментарий {number}'
+            )
+        cls.detail_url = reverse(
+            'posts:post_detail', kwargs={'post_id': cls.post.pk}
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_detail_shows_first_page_and_load_more(self):
+        response = self.client.get(self.detail_url)
+        comments = response.context['comments']
+        self.assertEqual(len(comments), COMMENTS_PER_PAGE)
+        self.assertEqual(comments[0].text, 'Комментарий 0')
+        self.assertContains(response, 'data-load-more')
+
+        response = self.client.get(
+            reverse('posts:post_comments', kwargs={'post_id': self.post.pk}),
+            {'cursor': comments.next_cursor},
+        )
+        self.assertEqual(
+            [comment.text for comment in response.context['comments']],
+            [f'Комментарий {number}' for number in range(20, 25)],
+        )
+        self.assertNotContains(response, 'data-load-more')
+
+    def test_detail_queries_do_not_depend_on_comment_count(self):
+        with CaptureQueriesContext(connection) as before:
+            self.client.get(self.detail_url)
+        for number in range(30):
+            Comment.objects.create(
+                post=self.post, author=self.author, text=f'Ещё {number}'
+            )
+        cache.clear()
+        with self.assertNumQueries(len(before)):
+            self.client.get(self.detail_url)
+
+    def test_fragment_for_missing_post(self):
+        response = self.client.get(
+            reverse('posts:post_comments', kwargs={'post_id': 0})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_api_comments_are_cursor_paginated(self):
+        response = APIClient().get(
+            f'/api/v1/posts/{self.post.pk}/comments/'
+        )
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(
+            response.data['results'][0]['text'], 'Комментарий 0'
+        )
+        self.assertIn('cursor=', response.data['next'])
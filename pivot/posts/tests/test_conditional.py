@@ -0,0 +1,165 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+        cls.post = Post.objects.create(text='Пост', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_pages_answer_not_modified_without_queries(self):
+        urls_budgets = {
+            reverse('posts:index'): 0,
+            reverse('posts:profile', kwargs={'username': 'author'}): 0,
+            # Имя автора для областей страницы поста.
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}): 1,
+        }
+        for url, budget in urls_budgets.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                etag = response['ETag']
+                with self.assertNumQueries(budget):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+
+    def test_change_within_a_second_is_not_hidden(self):
+        url = reverse('posts:index')
+        response = self.client.get(url)
+        self.assertNotIn('Last-Modified', response,
+                         'Second-precision dates would hide quick changes')
+        Post.objects.create(text='Новый пост', author=self.author)
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_changes_invalidate_validators(self):
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        etag = self.client.get(url)['ETag']
+        Comment.objects.create(post=self.post, author=self.reader, text='Hi')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_group_change_invalidates_its_post_pages(self):
+        group = Group.objects.create(title='Группа', slug='group')
+        post = Post.objects.create(text='В группе', author=self.author,
+                                   group=group)
+        urls = [
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}),
+            reverse('posts:profile', kwargs={'username': 'author'}),
+        ]
+        etags = [self.client.get(url)['ETag'] for url in urls]
+        group.slug = 'renamed'
+        group.save()
+        for url, etag in zip(urls, etags):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertContains(response, '/group/renamed/')
+        etags = [self.client.get(url)['ETag'] for url in urls]
+        group.delete()
+        for url, etag in zip(urls, etags):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertNotContains(response, '/group/renamed/')
+
+    def test_name_change_invalidates_pages_showing_it(self):
+        group = Group.objects.create(title='Группа', slug='group')
+        Post.objects.create(text='В группе', author=self.reader, group=group)
+        Comment.objects.create(post=self.post, author=self.reader, text='Hi')
+        api = APIClient()
+        urls = [
+            (self.client, reverse('posts:group_list',
+                                  kwargs={'slug': 'group'})),
+            (self.client, reverse('posts:post_detail',
+                                  kwargs={'post_id': self.post.pk})),
+            (api, f'/api/v1/posts/{self.post.pk}/comments/'),
+        ]
+        etags = [client.get(url)['ETag'] for client, url in urls]
+        reader = User.objects.get(pk=self.reader.pk)
+        reader.first_name = 'Читатель'
+        reader.save()
+        for (client, url), etag in zip(urls, etags):
+            with self.subTest(url=url):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200,
+                                 'Stale author name should not be served')
+
+    def test_validators_depend_on_user(self):
+        url = reverse('posts:index')
+        etag = self.client.get(url)['ETag']
+        self.client.force_login(self.reader)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_login_rotates_validators_with_csrf_token(self):
+        self.reader.set_password('password')
+        self.reader.save()
+        client = Client(enforce_csrf_checks=True)
+
+        def post(url, data):
+            token = client.cookies['csrftoken'].value
+            return client.post(url, {**data, 'csrfmiddlewaretoken': token})
+
+        def login():
+            client.get(reverse('users:login'))
+            post(reverse('users:login'),
+                 {'username': 'reader', 'password': 'password'})
+
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        login()
+        etag = client.get(url)['ETag']
+        post(reverse('users:logout'), {})
+        login()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200,
+                         'Page with a rotated CSRF token should be rebuilt')
+        response = client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.pk}),
+            {'text': 'После входа',
+             'csrfmiddlewaretoken': response.context['csrf_token']},
+        )
+        self.assertEqual(response.status_code, 302)
+
+    def test_api_lists(self):
+        client = APIClient()
+        client.force_authenticate(self.reader)
+        urls = [
+            '/api/v1/posts/?limit=10',
+            '/api/v1/groups/',
+            f'/api/v1/posts/{self.post.pk}/comments/',
+            '/api/v1/follow/',
+            '/api/v1/feed/?limit=10',
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                etag = client.get(url)['ETag']
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+    def test_api_feed_follows_subscriptions(self):
+        client = APIClient()
+        client.force_authenticate(self.reader)
+        url = '/api/v1/feed/?limit=10'
+        etag = client.get(url)['ETag']
+        Follow.objects.create(user=self.reader, author=self.author)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
@@ -0,0 +1,81 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.forms import PostForm
+from posts.models import Comment, Follow, Post, UserCounter
+
+User = get_user_model()
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='testuser')
+        cls.author = User.objects.create(username='author')
+        cls.post = Post.objects.create(text='Text', author=cls.author)
+
+    def counter(self, user):
+        return UserCounter.objects.get(user=user)
+
+    def test_counters_follow_writes(self):
+        post = Post.objects.create(text='Second', author=self.author)
+        self.assertEqual(self.counter(self.author).posts_count, 2)
+        comment = Comment.objects.create(
+            text='Comment', author=self.user, post=post
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        comment.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+
+        follow = Follow.objects.create(user=self.user, author=self.author)
+        self.assertEqual(self.counter(self.author).followers_count, 1)
+        self.assertEqual(self.counter(self.user).following_count, 1)
+        follow.delete()
+        self.assertEqual(self.counter(self.author).followers_count, 0)
+
+        post.delete()
+        self.assertEqual(self.counter(self.author).posts_count, 1)
+
+    def test_stale_save_keeps_comments_count(self):
+        stale = Post.objects.get(pk=self.post.pk)
+        Comment.objects.create(text='Comment', author=self.user,
+                               post=self.post)
+        form = PostForm({'text': 'Edited'}, instance=stale)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text, 'Edited')
+        self.assertEqual(self.post.comments_count, 1,
+                         'Editing a stale post should keep the counter')
+
+    def test_reconcile_fixes_drift(self):
+        UserCounter.objects.filter(user=self.author).update(posts_count=7)
+        UserCounter.objects.filter(user=self.user).delete()
+        out = StringIO()
+        call_command('reconcile_counters', stdout=out)
+        self.assertEqual(self.counter(self.author).posts_count, 1)
+        self.assertEqual(self.counter(self.user).posts_count, 0)
+        self.assertIn('posts_count: исправлено записей 1', out.getvalue())
+
+    def test_pages_do_not_run_aggregates(self):
+        client = Client()
+        urls = [
+            reverse('posts:profile', kwargs={'username': 'author'}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    client.get(url)
+                self.assertFalse(
+                    any('COUNT(' in query['sql'] for query in queries),
+                    'Page should read counters instead of COUNT(*)',
+                )
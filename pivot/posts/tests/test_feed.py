@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from posts.feed import get_feed
+from posts.models import FeedEntry, Follow, Post
+
+User = get_user_model()
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create(username='reader')
+        cls.author = User.objects.create(username='author')
+        cls.other = User.objects.create(username='other')
+        cls.old_post = Post.objects.create(text='Old post', author=cls.author)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_follow_backfills_feed(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertTrue(
+            FeedEntry.objects.filter(
+                user=self.reader, post=self.old_post
+            ).exists(),
+            'Follow do not backfill posts of the author',
+        )
+
+    def test_new_post_is_fanned_out(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(text='New post', author=self.author)
+        Post.objects.create(text='Not followed', author=self.other)
+        self.assertEqual(
+            list(get_feed(self.reader)),
+            [post, self.old_post],
+            'Feed has wrong posts or ordering',
+        )
+
+    def test_unfollow_and_delete_clean_feed(self):
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(text='New post', author=self.author)
+        post.delete()
+        self.assertEqual(list(get_feed(self.reader)), [self.old_post])
+        follow.delete()
+        self.assertFalse(
+            FeedEntry.objects.filter(user=self.reader).exists(),
+            'Unfollow do not remove feed entries',
+        )
+
+    @override_settings(FEED_FANOUT_FOLLOWERS_LIMIT=2)
+    def test_popular_author_is_read_on_demand(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.other, author=self.author)
+        post = Post.objects.create(text='Popular post', author=self.author)
+        self.assertFalse(
+            FeedEntry.objects.filter(post=post).exists(),
+            'Posts of popular authors should not be fanned out',
+        )
+        self.assertEqual(list(get_feed(self.reader)), [post, self.old_post])
+
+    def test_follow_index_and_api_use_feed(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(list(response.context['page_obj']), [self.old_post])
+
+        api_client = APIClient()
+        api_client.force_authenticate(self.reader)
+        response = api_client.get('/api/v1/feed/?limit=10')
+        self.assertEqual(
+            [item['id'] for item in response.data['results']],
+            [self.old_post.pk],
+        )
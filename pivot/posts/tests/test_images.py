@@ -0,0 +1,123 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from posts import images
+from posts.models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_jpeg(size=(1200, 800)):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, 'JPEG')
+    return SimpleUploadedFile(
+        name='big.jpg',
+        content=buffer.getvalue(),
+        content_type='image/jpeg',
+    )
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT,
+    POST_IMAGE_RENDITIONS_ASYNC=False,
+)
+class RenditionsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='testuser')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def create_post(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(
+                text='With image', author=self.user, image=make_jpeg()
+            )
+        post.refresh_from_db()
+        return post
+
+    def test_renditions_are_built_after_commit(self):
+        post = self.create_post()
+        self.assertEqual(set(post.renditions), {'360', '960'})
+        for files in post.renditions.values():
+            self.assertEqual(set(files), {'webp', 'jpeg'})
+        with Image.open(
+            os.path.join(TEMP_MEDIA_ROOT, post.renditions['360']['webp'])
+        ) as image:
+            self.assertEqual(image.size, (360, 240))
+
+    def test_pages_and_api_use_renditions(self):
+        post = self.create_post()
+        response = Client().get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        )
+        self.assertContains(response, '<picture>')
+        self.assertContains(response, post.renditions['960']['webp'])
+        self.assertNotContains(response, f'src="{post.image.url}"')
+
+        response = APIClient().get(f'/api/v1/posts/{post.pk}/')
+        self.assertTrue(
+            response.data['renditions']['360']['jpeg'].endswith(
+                post.renditions['360']['jpeg']
+            )
+        )
+
+    def rendition_paths(self, post):
+        return [
+            os.path.join(TEMP_MEDIA_ROOT, name)
+            for files in post.renditions.values() for name in files.values()
+        ]
+
+    def test_new_image_resets_renditions(self):
+        post = self.create_post()
+        old_paths = self.rendition_paths(post)
+        post.image = make_jpeg((100, 100))
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        self.assertFalse(
+            any(os.path.exists(path) for path in old_paths),
+            'Renditions of the replaced image should be deleted',
+        )
+        post.refresh_from_db()
+        self.assertEqual(set(post.renditions), {'360', '960'},
+                         'The new image should get its own renditions')
+
+    def test_stale_save_keeps_renditions(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            post = Post.objects.create(
+                text='With image', author=self.user, image=make_jpeg()
+            )
+        stale = Post.objects.get(pk=post.pk)
+        for callback in callbacks:
+            callback()
+        stale.text = 'Edited'
+        stale.save()
+        post.refresh_from_db()
+        self.assertEqual(post.text, 'Edited')
+        self.assertEqual(set(post.renditions), {'360', '960'},
+                         'Editing a stale post should keep renditions')
+
+    def test_renditions_for_replaced_image_are_dropped(self):
+        post = self.create_post()
+        paths = self.rendition_paths(post)
+        with self.captureOnCommitCallbacks(execute=True):
+            images.store_renditions(post.pk, 'posts/other.jpg',
+                                    post.renditions)
+        self.assertFalse(any(os.path.exists(path) for path in paths))
+        post.refresh_from_db()
+        self.assertTrue(post.renditions)
@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+from posts.pagination import KeysetPaginator, decode_cursor
+
+User = get_user_model()
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='testuser')
+        Post.objects.bulk_create(
+            Post(text=f'Post number {number}', author=cls.user)
+            for number in range(25)
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        cache.clear()
+
+    def test_pages_go_forward_and_back(self):
+        expected = list(Post.objects.order_by('-pub_date', '-pk'))
+        paginator = KeysetPaginator(Post.objects.all(), 10)
+        first = paginator.get_page()
+        second = paginator.get_page(first.next_cursor)
+        third = paginator.get_page(second.next_cursor)
+        self.assertEqual(list(first), expected[:10])
+        self.assertEqual(list(second), expected[10:20])
+        self.assertEqual(list(third), expected[20:])
+        self.assertFalse(first.has_previous())
+        self.assertFalse(third.has_next())
+
+        back = paginator.get_page(third.previous_cursor)
+        self.assertEqual(list(back), expected[10:20])
+        back = paginator.get_page(back.previous_cursor)
+        self.assertEqual(list(back), expected[:10])
+        self.assertFalse(back.has_previous())
+
+    def test_broken_cursor_returns_first_page(self):
+        self.assertIsNone(decode_cursor('not-a-cursor'))
+        page = KeysetPaginator(Post.objects.all(), 10).get_page('garbage')
+        self.assertEqual(page[0], Post.objects.order_by('-pub_date')[0])
+
+    @override_settings(POSTS_KEYSET_PAGINATION=True)
+    def test_index_uses_keyset_pagination(self):
+        response = self.guest_client.get(reverse('posts:index'))
+        page_obj = response.context['page_obj']
+        self.assertTrue(page_obj.is_keyset)
+        self.assertEqual(page_obj.approximate_count, 25)
+        self.assertEqual(len(page_obj), 10)
+        response = self.guest_client.get(
+            reverse('posts:index') + f'?cursor={page_obj.next_cursor}'
+        )
+        self.assertEqual(len(response.context['page_obj']), 10)
+        self.assertContains(response, 'Предыдущая')
@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from posts.models import Follow, Group, Post
+
+User = get_user_model()
+
+
+class QueryBudgetTests(TestCase):
+    """Число запросов на страницу не зависит от числа постов на ней."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create(username='reader')
+        cls.group = Group.objects.create(
+            title='This is title',
+            slug='testgroup',
+            description='test desctription',
+        )
+        for number in range(12):
+            author = User.objects.create(
+                username=f'author{number}',
+                first_name=f'Name{number}',
+            )
+            Follow.objects.create(user=cls.reader, author=author)
+            Post.objects.create(
+                text=f'Post number {number}',
+                author=author,
+                group=cls.group,
+            )
+        cls.author = author
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.auth_client = Client()
+        self.auth_client.force_login(self.reader)
+        cache.clear()
+
+    def test_guest_list_pages_query_budget(self):
+        urls_budgets = {
+            reverse('posts:index'): 2,
+            reverse('posts:group_list', kwargs={'slug': 'testgroup'}): 3,
+            reverse('posts:profile', kwargs={'username': 'author11'}): 2,
+        }
+        for url, budget in urls_budgets.items():
+            with self.subTest(url=url):
+                with self.assertNumQueries(budget):
+                    self.guest_client.get(url)
+
+    def test_follow_index_query_budget(self):
+        # Сессия, пользователь, популярные авторы, COUNT и страница.
+        with self.assertNumQueries(5):
+            self.auth_client.get(reverse('posts:follow_index'))
+
+    @override_settings(API_PAGINATION={'posts': 'uncounted'})
+    def test_api_posts_query_budget(self):
+        with self.assertNumQueries(1):
+            APIClient().get('/api/v1/posts/?limit=10')
@@ -0,0 +1,109 @@
+import re
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+# «SCAN table» без индекса — полный проход по таблице.
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+# Список групп целиком нужен форме поста и /api/v1/groups/.
+SCAN_ALLOWED = {'posts_group'}
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite')
+class QueryPlanTests(TestCase):
+    """Запросы страниц и API не читают таблицы целиком."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create(username='reader')
+        cls.author = User.objects.create(username='author')
+        cls.group = Group.objects.create(
+            title='This is title',
+            slug='testgroup',
+            description='test desctription',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for number in range(12):
+            post = Post.objects.create(
+                text=f'Post number {number}',
+                author=cls.author,
+                group=cls.group,
+            )
+        cls.post = post
+        Comment.objects.create(post=post, author=cls.reader, text='Hi')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(self.reader)
+
+    def assertNoFullScans(self, queries):
+        scans = []
+        with connection.cursor() as cursor:
+            for query in queries:
+                sql = query['sql']
+                if not sql.lstrip().upper().startswith('SELECT'):
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                for row in cursor.fetchall():
+                    match = FULL_SCAN.match(row[-1])
+                    if match and match[1] not in SCAN_ALLOWED:
+                        scans.append(f'{match[1]}: {sql}')
+        self.assertEqual(scans, [], 'Queries scan whole tables')
+
+    def test_views_use_indexes(self):
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'testgroup'}),
+            reverse('posts:profile', kwargs={'username': 'author'}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            reverse('posts:post_create'),
+            reverse('posts:follow_index'),
+            reverse('posts:search') + '?q=number',
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as context:
+                    self.client.get(url)
+                self.assertNoFullScans(context.captured_queries)
+
+    def test_api_uses_indexes(self):
+        urls = [
+            '/api/v1/posts/?limit=10',
+            f'/api/v1/posts/{self.post.pk}/',
+            f'/api/v1/posts/{self.post.pk}/comments/',
+            '/api/v1/groups/',
+            '/api/v1/follow/',
+            '/api/v1/feed/?limit=10',
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as context:
+                    self.api_client.get(url)
+                self.assertNoFullScans(context.captured_queries)
+
+    def test_follow_actions_use_indexes(self):
+        User.objects.create(username='other')
+        urls = [
+            reverse('posts:profile_follow', kwargs={'username': 'other'}),
+            reverse('posts:profile_unfollow', kwargs={'username': 'other'}),
+            reverse('posts:add_comment', kwargs={'post_id': self.post.pk}),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as context:
+                    self.client.post(url, {'text': 'Comment'})
+                self.assertNoFullScans(context.captured_queries)
@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from posts.models import Post
+from posts.search import build_match, search_posts
+
+User = get_user_model()
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='testuser')
+        cls.best = Post.objects.create(
+            text='Котики котики котики', author=cls.user
+        )
+        cls.good = Post.objects.create(
+            text='Про котиков и собак, а также про погоду и новости',
+            author=cls.user,
+        )
+        cls.other = Post.objects.create(text='Про погоду', author=cls.user)
+
+    def test_build_match_escapes_query(self):
+        self.assertEqual(build_match('"hello" OR world'),
+                         '"hello" "OR" "world"*')
+        self.assertEqual(build_match('  *** '), '')
+
+    def test_results_are_ranked_and_paginated(self):
+        Post.objects.create(text='котики снова', author=self.user)
+        first = search_posts('котик', per_page=2)
+        self.assertEqual(first[0], self.best)
+        self.assertTrue(first.has_next())
+        second = search_posts('котик', first.next_cursor, per_page=2)
+        self.assertEqual(len(second), 1)
+        self.assertFalse(second.has_next())
+        found = {post.pk for post in list(first) + list(second)}
+        self.assertNotIn(self.other.pk, found)
+
+    def test_index_follows_edits_and_deletes(self):
+        self.other.text = 'Теперь про котиков'
+        self.other.save()
+        self.assertIn(self.other, list(search_posts('котиков')))
+        self.best.delete()
+        self.assertEqual(len(search_posts('котики')), 0)
+
+    def test_search_page_and_api(self):
+        response = Client().get(reverse('posts:search'), {'q': 'погод'})
+        self.assertEqual(
+            {post.pk for post in response.context['page_obj']},
+            {self.good.pk, self.other.pk},
+        )
+        response = APIClient().get('/api/v1/posts/', {'search': 'котики'})
+        self.assertEqual(
+            [item['id'] for item in response.data['results']],
+            [self.best.pk],
+        )
@@ -0,0 +1,101 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import RequestDataTooBig
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts.forms import PostForm
+from posts.models import Post
+from posts.uploads import LimitedTemporaryFileUploadHandler
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_image(size, image_format='PNG', name='image.png'):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'green').save(buffer, image_format)
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/png')
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT,
+    POST_IMAGE_RENDITIONS_ASYNC=False,
+)
+class BoundedUploadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='testuser')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def form(self, image):
+        return PostForm({'text': 'Text'}, files={'image': image})
+
+    @override_settings(POST_IMAGE_MAX_UPLOAD_SIZE=100)
+    def test_too_large_file_is_rejected(self):
+        form = self.form(make_image((50, 50)))
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors.as_data()['image'][0].code,
+                         'file_too_large')
+
+    @override_settings(POST_IMAGE_MAX_PIXELS=100)
+    def test_too_many_pixels_is_rejected(self):
+        form = self.form(make_image((20, 20)))
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors.as_data()['image'][0].code,
+                         'too_many_pixels')
+
+    def test_not_an_image_is_rejected(self):
+        form = self.form(SimpleUploadedFile('fake.png', b'not an image'))
+        self.assertFalse(form.is_valid())
+
+    @override_settings(POST_IMAGE_MAX_DIMENSION=100)
+    def test_huge_image_is_downscaled(self):
+        client = Client()
+        client.force_login(self.user)
+        # 0 - загрузка во временный файл, иначе - в память.
+        for memory_size in (0, 1024 * 1024):
+            with self.subTest(memory_size=memory_size):
+                with override_settings(
+                    FILE_UPLOAD_MAX_MEMORY_SIZE=memory_size
+                ):
+                    client.post(reverse('posts:post_create'), {
+                        'text': f'Downscaled {memory_size}',
+                        'image': make_image((400, 200)),
+                    })
+                post = Post.objects.get(text=f'Downscaled {memory_size}')
+                with Image.open(post.image.path) as image:
+                    self.assertEqual(image.size, (100, 50))
+
+    @override_settings(POST_IMAGE_MAX_UPLOAD_SIZE=10)
+    def test_handler_stops_reading_over_limit(self):
+        handler = LimitedTemporaryFileUploadHandler()
+        handler.new_file('image', 'image.png', 'image/png', None)
+        handler.receive_data_chunk(b'x' * 10, 0)
+        with self.assertRaises(RequestDataTooBig):
+            handler.receive_data_chunk(b'x' * 5, 10)
+        with self.assertRaises(RequestDataTooBig):
+            handler.new_file('image', 'image.png', 'image/png', 30)
+
+    @override_settings(POST_IMAGE_MAX_UPLOAD_SIZE=100,
+                       FILE_UPLOAD_MAX_MEMORY_SIZE=0)
+    def test_oversized_upload_is_rejected_before_post_is_created(self):
+        client = Client()
+        client.force_login(self.user)
+        response = client.post(reverse('posts:post_create'), {
+            'text': 'Oversized',
+            'image': make_image((50, 50)),
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Post.objects.filter(text='Oversized').exists())
@@ -386,24 +386,30 @@ class PostsViewTests(TestCase):
                          'This comment should not be second')
 
     def test_index_cache(self):
-        form_data = {
-            'text': 'Post that would be deleted',
-            'group': self.group.pk,
-        }
-        self.auth_client.post(
-            reverse('posts:post_create'),
-            data=form_data,
-            follow=True,
+        response_before = self.guest_client.get(reverse('posts:index'))
+        with self.assertNumQueries(0):
+            response_cached = self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(response_cached.content, response_before.content)
+
+        post = Post.objects.create(
+            text='Post that would be deleted',
+            author=self.user,
+            group=self.group,
         )
-        post = Post.objects.filter(text=form_data['text'])[0]
-        response_before_delete = self.auth_client.get(reverse('posts:index'))
+        response_after_create = self.guest_client.get(reverse('posts:index'))
+        self.assertContains(response_after_create, post.text)
         post.delete()
-        response_after_delete = self.auth_client.get(reverse('posts:index'))
+        response_after_delete = self.guest_client.get(reverse('posts:index'))
         self.assertEqual(response_after_delete.content,
-                         response_before_delete.content)
-        cache.clear()
-        response_after_clear = self.auth_client.get(reverse('posts:index'))
-        self.assertNotEqual(response_after_delete, response_after_clear)
+                         response_before.content)
+
+    def test_post_detail_cache_follows_comments(self):
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        self.guest_client.get(url)
+        Comment.objects.create(
+            text='Fresh comment', author=self.stranger_user, post=self.post
+        )
+        self.assertContains(self.guest_client.get(url), 'Fresh comment')
 
     def test_auth_client_follow(self):
         self.auth_client.get(reverse(
@@ -0,0 +1,90 @@
+from django import forms
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig, ValidationError
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+from .images import downscale_upload
+
+INVALID_IMAGE_MESSAGE = (
+    'Загрузите правильное изображение. Файл не является изображением '
+    'или повреждён.'
+)
+
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загрузку во временный файл, но не больше лимита.
+
+    Как только файл превышает POST_IMAGE_MAX_UPLOAD_SIZE (или заявленная
+    длина уже больше), разбор тела прерывается с ответом 400: остаток
+    запроса не читается, а пост без картинки не создаётся.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        if (self.content_length or 0) > settings.POST_IMAGE_MAX_UPLOAD_SIZE:
+            self.reject()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.POST_IMAGE_MAX_UPLOAD_SIZE:
+            self.reject()
+        super().receive_data_chunk(raw_data, start)
+
+    def reject(self):
+        self.file.close()
+        raise RequestDataTooBig(
+            'Uploaded file exceeds POST_IMAGE_MAX_UPLOAD_SIZE.'
+        )
+
+
+def inspect_image(file):
+    """Проверяет загрузку по размеру и заголовку, не декодируя картинку.
+
+    Возвращает ширину, высоту и формат изображения.
+    """
+    if file.size > settings.POST_IMAGE_MAX_UPLOAD_SIZE:
+        raise ValidationError(
+            'Файл слишком большой: %(size)s, допустимо не больше %(max)s.',
+            code='file_too_large',
+            params={
+                'size': filesizeformat(file.size),
+                'max': filesizeformat(settings.POST_IMAGE_MAX_UPLOAD_SIZE),
+            },
+        )
+    file.seek(0)
+    try:
+        with Image.open(file) as image:
+            width, height = image.size
+            image_format = image.format
+    except (OSError, Image.DecompressionBombError):
+        raise ValidationError(INVALID_IMAGE_MESSAGE, code='invalid_image')
+    finally:
+        file.seek(0)
+    if width * height > settings.POST_IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            'Изображение %(width)sx%(height)s слишком большое.',
+            code='too_many_pixels',
+            params={'width': width, 'height': height},
+        )
+    return width, height, image_format
+
+
+class BoundedImageField(forms.ImageField):
+    """Поле картинки с ограничением размера файла и разрешения.
+
+    Слишком крупные изображения уменьшаются в процессе-воркере до
+    POST_IMAGE_MAX_DIMENSION по большей стороне.
+    """
+
+    def to_python(self, data):
+        file = forms.FileField.to_python(self, data)
+        if file is None:
+            return None
+        width, height, image_format = inspect_image(file)
+        file.content_type = Image.MIME.get(image_format)
+        if max(width, height) > settings.POST_IMAGE_MAX_DIMENSION:
+            file = downscale_upload(file)
+        return file
@@ -1,28 +1,42 @@
 from django.urls import path
 
 
-from . import views
+from . import async_views, views
 
 app_name = 'posts'
 
-urlpatterns = [
-    path('', views.index, name='index'),
-    path('group/<slug:slug>/', views.group_posts, name='group_list'),
-    path('profile/<str:username>/', views.profile, name='profile'),
-    path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
-    path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
-    path('create/', views.post_create, name='post_create'),
-    path('posts/<int:post_id>/comment/',
-         views.add_comment, name='add_comment'),
-    path('follow/', views.follow_index, name='follow_index'),
-    path(
-        'profile/<str:username>/follow/',
-        views.profile_follow,
-        name='profile_follow'
-    ),
-    path(
-        'profile/<str:username>/unfollow/',
-        views.profile_unfollow,
-        name='profile_unfollow'
-    ),
-]
+
+def _urlpatterns(read_views):
+    """Маршруты приложения; страницы только для чтения берутся из read_views.
+
+    Под ASGI вместо posts.views подставляется posts.async_views.
+    """
+    return [
+        path('', read_views.index, name='index'),
+        path('group/<slug:slug>/', read_views.group_posts, name='group_list'),
+        path('profile/<str:username>/', read_views.profile, name='profile'),
+        path('posts/<int:post_id>/', read_views.post_detail,
+             name='post_detail'),
+        path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
+        path('create/', views.post_create, name='post_create'),
+        path('posts/<int:post_id>/comments/',
+             read_views.post_comments, name='post_comments'),
+        path('posts/<int:post_id>/comment/',
+             views.add_comment, name='add_comment'),
+        path('follow/', read_views.follow_index, name='follow_index'),
+        path('search/', views.search, name='search'),
+        path(
+            'profile/<str:username>/follow/',
+            views.profile_follow,
+            name='profile_follow'
+        ),
+        path(
+            'profile/<str:username>/unfollow/',
+            views.profile_unfollow,
+            name='profile_unfollow'
+        ),
+    ]
+
+
+urlpatterns = _urlpatterns(views)
+async_urlpatterns = _urlpatterns(async_views)
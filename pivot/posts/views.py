@@ -1,84 +1,203 @@
+from django.http import Http404
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.cache import cache_page
 
+from django.conf import settings
 from django.core.paginator import Paginator
-from .models import Post, Group, Follow
+from .models import Comment, Post, Group, Follow
 from .forms import PostForm, CommentForm
+from .caching import (
+    GLOBAL_SCOPE, author_scope, cached_page, group_scope, post_scope,
+)
+from .counters import get_user_counter
+from .feed import get_feed
+from .pagination import KeysetPaginator
+from .search import search_posts
 
 
 POSTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
 
 User = get_user_model()
 
+# Запросы и контексты страниц только для чтения общие с posts.async_views:
+# там остаётся лишь их выполнение через асинхронный ORM.
 
-def get_page_object(request, objects, posts_per_page):
-    paginator = Paginator(objects, posts_per_page)
-    page_number = request.GET.get('page')
-    return paginator.get_page(page_number)
 
+def get_paginator(request, objects, posts_per_page):
+    cursor = request.GET.get('cursor')
+    if cursor is not None or settings.POSTS_KEYSET_PAGINATION:
+        return KeysetPaginator(
+            objects,
+            posts_per_page,
+            with_count=settings.POSTS_KEYSET_APPROXIMATE_COUNT,
+        )
+    return Paginator(objects, posts_per_page)
 
-# @cache_page(20, key_prefix='index_page')
-def index(request):
-    post_list = Post.objects.all()
-    page_obj = get_page_object(request, post_list, POSTS_PER_PAGE)
-    context = {
+
+def add_page_range(paginator, page_obj):
+    page_obj.elided_page_range = paginator.get_elided_page_range(
+        page_obj.number
+    )
+    return page_obj
+
+
+def get_page_object(request, objects, posts_per_page, count=None):
+    paginator = get_paginator(request, objects, posts_per_page)
+    if isinstance(paginator, KeysetPaginator):
+        return paginator.get_page(request.GET.get('cursor'))
+    if count is not None:
+        # Число объектов уже известно из счётчиков, COUNT(*) не нужен.
+        paginator.count = count
+    page_obj = paginator.get_page(request.GET.get('page'))
+    return add_page_range(paginator, page_obj)
+
+
+def post_author_username(post_id):
+    return Post.objects.filter(pk=post_id).values_list(
+        'author__username', flat=True
+    )
+
+
+def post_detail_scopes(post_id):
+    username = post_author_username(post_id).first()
+    return [post_scope(post_id), author_scope(username)]
+
+
+def comments_paginator(post_id):
+    """Комментарии поста от старых к новым, по COMMENTS_PER_PAGE."""
+    comments = Comment.objects.filter(post_id=post_id).select_related(
+        'author'
+    ).only('text', 'pub_date', 'post', 'author__username')
+    return KeysetPaginator(comments, COMMENTS_PER_PAGE, ascending=True)
+
+
+def get_comments_page(post_id, cursor=None):
+    return comments_paginator(post_id).get_page(cursor)
+
+
+def profile_authors():
+    return User.objects.select_related('counter')
+
+
+def detail_posts():
+    return Post.objects.select_related('author__counter', 'group')
+
+
+def following_query(user, author):
+    return Follow.objects.filter(user=user, author=author)
+
+
+def index_context(page_obj):
+    return {
         'page_obj': page_obj,
         'index': True,
     }
-    return render(request, 'posts/index.html', context)
 
 
-def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    page_obj = get_page_object(request, posts, POSTS_PER_PAGE)
-    context = {
+def group_context(group, page_obj):
+    return {
         'group': group,
         'page_obj': page_obj,
     }
-    return render(request, 'posts/group_list.html', context)
 
 
-def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
-    posts_number = posts.count()
-    page_obj = get_page_object(request, posts, POSTS_PER_PAGE)
-    following = False
-    if request.user.is_authenticated:
-        following = Follow.objects.filter(
-            user=request.user,
-            author=author
-        ).exists()
-    context = {
+def profile_context(author, page_obj, posts_number, following):
+    return {
         'author': author,
         'page_obj': page_obj,
         'posts_number': posts_number,
         'following': following,
     }
-    return render(request, 'posts/profile.html', context)
 
 
-def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    group = post.group
-    author = post.author
-    comments = post.comments.all()
-    author_posts_number = author.posts.count()
-    comments_form = CommentForm()
-    context = {
+def post_detail_context(post, comments, author_posts_number):
+    return {
         'post': post,
-        'author': author,
-        'group': group,
+        'author': post.author,
+        'group': post.group,
         'comments': comments,
         'author_posts_number': author_posts_number,
-        'comments_form': comments_form,
+        'comments_form': CommentForm(),
     }
+
+
+def comments_context(post_id, comments):
+    return {
+        'post_id': post_id,
+        'comments': comments,
+    }
+
+
+def follow_context(page_obj):
+    return {
+        'page_obj': page_obj,
+        'follow': True,
+    }
+
+
+@cached_page(lambda: [GLOBAL_SCOPE])
+def index(request):
+    post_list = Post.objects.with_feed_relations()
+    page_obj = get_page_object(request, post_list, POSTS_PER_PAGE)
+    return render(request, 'posts/index.html', index_context(page_obj))
+
+
+@cached_page(lambda slug: [group_scope(slug)])
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    posts = group.posts.with_feed_relations()
+    page_obj = get_page_object(request, posts, POSTS_PER_PAGE)
+    return render(request, 'posts/group_list.html',
+                  group_context(group, page_obj))
+
+
+@cached_page(lambda username: [author_scope(username)])
+def profile(request, username):
+    author = get_object_or_404(profile_authors(), username=username)
+    posts = author.posts.with_feed_relations()
+    posts_number = get_user_counter(author).posts_count
+    page_obj = get_page_object(
+        request, posts, POSTS_PER_PAGE, count=posts_number
+    )
+    following = (request.user.is_authenticated
+                 and following_query(request.user, author).exists())
+    context = profile_context(author, page_obj, posts_number, following)
+    return render(request, 'posts/profile.html', context)
+
+
+@cached_page(post_detail_scopes)
+def post_detail(request, post_id):
+    post = get_object_or_404(detail_posts(), pk=post_id)
+    comments = get_comments_page(post.pk)
+    author_posts_number = get_user_counter(post.author).posts_count
+    context = post_detail_context(post, comments, author_posts_number)
     return render(request, 'posts/post_detail.html', context)
 
 
+@cached_page(lambda post_id: [post_scope(post_id)])
+def post_comments(request, post_id):
+    """Следующая порция комментариев для кнопки «Показать ещё»."""
+    comments = get_comments_page(post_id, request.GET.get('cursor'))
+    if not comments and not Post.objects.filter(pk=post_id).exists():
+        raise Http404
+    return render(request, 'includes/comments.html',
+                  comments_context(post_id, comments))
+
+
+def search(request):
+    query = request.GET.get('q', '')
+    page_obj = search_posts(
+        query, request.GET.get('cursor'), POSTS_PER_PAGE
+    )
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
 def post_create(request):
     form = PostForm(
@@ -134,23 +253,17 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    authors = Follow.objects.filter(user=request.user).values('author')
-    posts = Post.objects.filter(author__in=authors)
+    posts = get_feed(request.user).with_feed_relations()
     page_obj = get_page_object(request, posts, POSTS_PER_PAGE)
-    context = {
-        'page_obj': page_obj,
-        'follow': True,
-    }
-    return render(request, 'posts/follow.html', context)
+    return render(request, 'posts/follow.html', follow_context(page_obj))
 
 
 @login_required
 def profile_follow(request, username):
     user = request.user
     author = get_object_or_404(User, username=username)
-    is_exist = Follow.objects.filter(user=user, author=author).exists()
-    if user != author and not is_exist:
-        Follow.objects.create(user=user, author=author)
+    if user != author:
+        Follow.objects.get_or_create(user=user, author=author)
     return redirect('posts:profile', username=username)
 
 